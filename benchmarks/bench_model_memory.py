@@ -0,0 +1,174 @@
+"""Resident memory per worker process with private vs memory-mapped models.
+
+Trains one forest, publishes it like a retrain does, then starts `--workers`
+processes per mode that load it, score a batch and report their memory while
+all of them are alive (so shared pages are split between them in PSS):
+
+    pickle   - unpickle the sklearn model and read the compiled forest into
+               private memory (how every worker loaded the model before)
+    mmap     - ModelRegistry(explain=False): only the compiled forest, mapped
+               read-only from the page cache (scoring workers, `score` CLI)
+    explain  - ModelRegistry(): mapped forest plus the sklearn model, with a
+               SHAP explainer built on the sklearn model
+    api      - ModelRegistry(explain=False) with the SHAP explainer built from
+               the mapped forest, as the API workers run
+    server_pickle - the `server` stack's LoanEligibilityModel with its sklearn
+               classifier unpickled into every worker (how it loaded before)
+    server   - LoanEligibilityModel scoring with the FlatForest mapped from
+               the artifact
+
+    python benchmarks/bench_model_memory.py --workers 4 --trees 300
+
+Memory figures come from /proc/self/smaps_rollup (Linux); elsewhere only the
+peak RSS is reported.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from statistics import median
+from typing import Any, Dict, List
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, ROOT)
+
+from credisense.compiled_forest import CompiledForest, compiled_path  # noqa: E402
+from credisense.ml_model import ModelRegistry, explainable  # noqa: E402
+from credisense.model_store import publish_model  # noqa: E402
+
+MODES = ("pickle", "mmap", "explain", "api", "server_pickle", "server")
+N_FEATURES = 11
+
+
+def memory_mb() -> Dict[str, float]:
+    """RSS, PSS and private memory of this process in MB."""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            kb = {line.split(":")[0]: int(line.split()[1]) for line in f if line.split()[-1] == "kB"}
+    except OSError:
+        import resource
+
+        # ru_maxrss is in kB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"rss": peak / (1024 * 1024 if sys.platform == "darwin" else 1024)}
+    return {
+        "rss": kb["Rss"] / 1024,
+        "pss": kb.get("Pss", 0) / 1024,
+        "private": (kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0)) / 1024,
+    }
+
+
+def server_path(model_path: str) -> str:
+    return os.path.join(os.path.dirname(model_path), "server", "model.joblib")
+
+
+def _load(mode: str, model_path: str):
+    if mode.startswith("server"):
+        from server.ml_model.model import LoanEligibilityModel
+
+        if mode == "server_pickle":
+            served = LoanEligibilityModel(server_path(model_path), mmap_mode=None)
+            return None, served.model
+        return None, LoanEligibilityModel(server_path(model_path)).forest
+    if mode == "pickle":
+        import joblib
+
+        forest = CompiledForest.load(compiled_path(model_path), mmap_mode=None)[0]
+        # the SHAP layout was not part of the export these workers used to load
+        forest.shap = {}
+        return joblib.load(model_path), forest
+    model, scorer, _ = ModelRegistry(model_path, explain=(mode == "explain")).snapshot()
+    return model, scorer
+
+
+def _explain(mode: str, model, scorer, X):
+    if mode in ("explain", "api"):
+        from credisense.explainability import explain_batch
+
+        explain_batch(explainable(model, scorer), X[:10])
+
+
+def _worker(mode: str, model_path: str, rows: int, barrier, results):
+    X = np.random.default_rng(1).random((rows, N_FEATURES))
+    # import everything the load needs first, so the baseline excludes libraries
+    import joblib  # noqa: F401
+    import shap  # noqa: F401
+    import sklearn.ensemble  # noqa: F401
+
+    before = memory_mb()
+    start = time.perf_counter()
+    model, scorer = _load(mode, model_path)
+    load_seconds = time.perf_counter() - start
+    scorer.predict_proba(X)
+    if model is not None:
+        model.predict_proba(X[:100])
+    _explain(mode, model, scorer, X)
+    barrier.wait()
+    after = memory_mb()
+    results.put({"load_seconds": load_seconds, **{k: after[k] - before.get(k, 0.0) for k in after}})
+    barrier.wait()
+
+
+def train(model_path: str, trees: int, rows: int) -> int:
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(0)
+    X = rng.random((rows, N_FEATURES))
+    y = (X[:, 0] + 0.3 * rng.random(rows) > 0.6).astype(int)
+    pipe = Pipeline([("scaler", StandardScaler()), ("clf", RandomForestClassifier(n_estimators=trees, random_state=0, n_jobs=-1))])
+    publish_model(pipe.fit(X, y), model_path)
+    # the server artifact holds the same forest (inputs arrive already preprocessed)
+    from server.ml_model.model import save_artifact
+
+    os.makedirs(os.path.dirname(server_path(model_path)), exist_ok=True)
+    save_artifact(server_path(model_path), None, pipe.named_steps["clf"])
+    return os.path.getsize(model_path)
+
+
+def run(workers: int = 4, trees: int = 200, train_rows: int = 20000, score_rows: int = 5000, modes=MODES, workdir: str = None) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(workdir or tmp, "models", "model.joblib")
+        pickle_bytes = train(model_path, trees, train_rows)
+        ctx = multiprocessing.get_context("spawn")
+        report: Dict[str, Any] = {
+            "workers": workers,
+            "pickle_mb": pickle_bytes / 2**20,
+            "compiled_mb": os.path.getsize(compiled_path(model_path)) / 2**20,
+            "modes": {},
+        }
+        for mode in modes:
+            barrier, results = ctx.Barrier(workers), ctx.Queue()
+            procs = [ctx.Process(target=_worker, args=(mode, model_path, score_rows, barrier, results)) for _ in range(workers)]
+            for p in procs:
+                p.start()
+            per_worker: List[Dict[str, float]] = [results.get(timeout=600) for _ in procs]
+            for p in procs:
+                p.join()
+            report["modes"][mode] = {k: median(r[k] for r in per_worker) for k in per_worker[0]}
+            summary = ", ".join(f"{k} {v:.3f}" if k == "load_seconds" else f"{k} {v:.1f} MB" for k, v in report["modes"][mode].items())
+            print(f"{mode:<13} per worker: {summary}", file=sys.stderr)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-worker memory with private vs memory-mapped models")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--train-rows", type=int, default=20000)
+    parser.add_argument("--score-rows", type=int, default=5000)
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated subset of " + ",".join(MODES))
+    args = parser.parse_args(argv)
+    report = run(args.workers, args.trees, args.train_rows, args.score_rows, [m for m in args.modes.split(",") if m])
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
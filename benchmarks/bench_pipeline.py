@@ -0,0 +1,243 @@
+"""Microbenchmarks for every stage of the predict pipeline.
+
+Runs each stage on synthetic applicants of several sizes inside a temporary
+directory (its own DB and model), writes the timings as JSON and optionally
+compares them with a saved baseline:
+
+    python benchmarks/bench_pipeline.py --out bench.json
+    python benchmarks/bench_pipeline.py --baseline bench.json --threshold 0.2
+
+The comparison exits with status 1 when any stage's median time per call is
+more than `threshold` slower than in the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from statistics import median
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from credisense import database, ml_model, training  # noqa: E402
+from credisense.advisory import generate_advice, generate_advice_batch  # noqa: E402
+from credisense.explainability import clear_explainer_cache, explain_batch, explain_model  # noqa: E402
+from credisense.pdf_report import generate_pdf  # noqa: E402
+from credisense.preprocessing import COLS_OUT, encode_features, preprocess, preprocess_batch  # noqa: E402
+
+DEFAULT_SIZES = (1, 100, 10000)
+# Larger inputs make these stages take minutes without telling us more
+MAX_ROWS = {"explain_model": 1000, "retrain_if_needed": 10000}
+# Training records in the model every other stage uses
+TRAIN_ROWS = 2000
+
+EMPLOYMENT = ("salaried", "self-employed", "unemployed", "other")
+
+
+def make_applicants(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic applicants with realistic ranges."""
+    rng = np.random.default_rng(seed)
+    income = rng.lognormal(10.5, 0.6, n).round(2)
+    return [
+        {
+            "income": float(income[i]),
+            "loan_amount": float(rng.uniform(10000, 1500000)),
+            "cibil_score": float(rng.integers(300, 900)),
+            "previous_loans": int(rng.integers(0, 6)),
+            "missed_emis": int(rng.poisson(0.4)),
+            "employment_type": EMPLOYMENT[int(rng.integers(0, len(EMPLOYMENT)))],
+            "debt_to_income": float(rng.uniform(0, 0.9)),
+            "age": int(rng.integers(21, 65)),
+            "dependents": int(rng.integers(0, 5)),
+        }
+        for i in range(n)
+    ]
+
+
+def time_call(fn: Callable[[], Any], min_time: float = 0.2, repeat: int = 5) -> Dict[str, float]:
+    """Time `fn` like timeit: `repeat` rounds, each long enough to be measurable."""
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    number = max(1, int((min_time / repeat) / first)) if first > 0 else 1000
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - start) / number)
+    return {"median_s": median(per_call), "min_s": min(per_call), "number": number, "repeat": repeat}
+
+
+class Bench:
+    """Stages to time, bound to a scratch directory with its own DB and model.
+
+    Training and `load_model` read their paths from module globals, so those
+    point into `workdir` until `close()` (or the end of a `with` block).
+    """
+
+    def __init__(self, workdir: str):
+        self.workdir = workdir
+        self.db = os.path.join(workdir, "bench.db")
+        model_dir = os.path.join(workdir, "models")
+        serving = os.path.join(workdir, "serving", "model.joblib")
+        self._saved = [(m, a, getattr(m, a)) for m, a in ((training, "MODEL_DIR"), (training, "MODEL_PATH"), (ml_model, "MODEL_PATH"))]
+        training.MODEL_DIR = model_dir
+        training.MODEL_PATH = os.path.join(model_dir, "model.joblib")
+        ml_model.MODEL_PATH = serving
+        try:
+            database.init_db(self.db)
+            for app in make_applicants(TRAIN_ROWS, seed=1):
+                database.add_training_record(app, db_path=self.db)
+            training.retrain_if_needed(self.db, batch_threshold=0)
+            # Serve a copy so the retrain benchmark does not replace the model the other stages load
+            os.makedirs(os.path.dirname(serving), exist_ok=True)
+            shutil.copyfile(training.MODEL_PATH, serving)
+            self.model, self.scorer, self.version = ml_model.ModelRegistry(serving).snapshot()
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """Restore the model paths the benchmark replaced."""
+        for module, attr, value in self._saved:
+            setattr(module, attr, value)
+        self._saved = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stages(self, n: int) -> Dict[str, Callable[[], Any]]:
+        apps = make_applicants(n, seed=n)
+        X = preprocess_batch(apps)
+        xv = X.values
+        one = apps[0]
+        x1 = encode_features(one)
+        shap = explain_model(self.model, x1, feature_names=COLS_OUT, version=self.version)
+        pdf_path = os.path.join(self.workdir, "report.pdf")
+        train_db = os.path.join(self.workdir, f"train-{n}.db")
+        database.init_db(train_db)
+        for app in apps if n >= 2 else make_applicants(2):
+            database.add_training_record(app, db_path=train_db)
+
+        stages = {
+            "preprocess": lambda: preprocess_batch(apps),
+            "predict": lambda: ml_model.predict_batch(self.scorer, xv),
+            "predict_sklearn": lambda: ml_model.predict_batch(self.model, xv),
+            "explain_model": lambda: explain_batch(self.model, X, feature_names=COLS_OUT, version=self.version),
+            "generate_advice": lambda: generate_advice_batch(apps),
+            "insert_scored_applicants": lambda: database.insert_scored_applicants(
+                ((a, "Eligible", 0.5, shap) for a in apps), self.db
+            ),
+            "retrain_if_needed": lambda: training.retrain_if_needed(train_db, batch_threshold=0),
+        }
+        if n == 1:
+            # Single-request paths as /predict uses them
+            stages.update(
+                {
+                    "preprocess_single": lambda: preprocess(one),
+                    "encode_features": lambda: encode_features(one),
+                    "load_model": ml_model.load_model,
+                    "predict_single": lambda: ml_model.predict(self.scorer, x1),
+                    "explain_model_single": lambda: explain_model(self.model, x1, feature_names=COLS_OUT, version=self.version),
+                    "explain_model_cold": lambda: (clear_explainer_cache(), explain_model(self.model, x1, feature_names=COLS_OUT)),
+                    "generate_advice_single": lambda: generate_advice(one),
+                    "generate_pdf": lambda: generate_pdf(one, {"label": "Eligible", "probability": 0.5}, shap, ["advice"], pdf_path),
+                    "insert_applicant_prediction": lambda: database.insert_prediction(
+                        database.insert_applicant(one, self.db), "Eligible", 0.5, shap, self.db
+                    ),
+                }
+            )
+        return stages
+
+
+def run_benchmarks(
+    sizes=DEFAULT_SIZES, only: Optional[List[str]] = None, min_time: float = 0.2, repeat: int = 5, workdir: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run every stage for every size and return the JSON-serializable report."""
+    import sklearn
+
+    with tempfile.TemporaryDirectory() as tmp, Bench(workdir or tmp) as bench:
+        results = {}
+        for n in sizes:
+            for name, fn in bench.stages(n).items():
+                if only and name not in only:
+                    continue
+                if n > MAX_ROWS.get(name, n):
+                    continue
+                res = time_call(fn, min_time=min_time, repeat=repeat)
+                res.update(stage=name, rows=n, per_row_s=res["median_s"] / n)
+                results[f"{name}[n={n}]"] = res
+                print(f"{name:<28} n={n:<6} {res['median_s'] * 1e3:10.3f} ms/call", file=sys.stderr)
+        database.close_connections()
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "sizes": list(sizes),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """Return one row per benchmark present in both reports; `regressed` marks slowdowns beyond `threshold`."""
+    rows = []
+    for key, cur in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if base is None or not base.get("median_s"):
+            continue
+        ratio = cur["median_s"] / base["median_s"]
+        rows.append({"benchmark": key, "baseline_s": base["median_s"], "current_s": cur["median_s"], "ratio": ratio, "regressed": ratio > 1 + threshold})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the CrediSense predict pipeline")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated row counts")
+    parser.add_argument("--only", help="Comma-separated stage names to run")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Approximate seconds spent per benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Compare with this results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        sizes=[int(s) for s in args.sizes.split(",") if s],
+        only=args.only.split(",") if args.only else None,
+        min_time=args.min_time,
+        repeat=args.repeat,
+    )
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(report, json.load(f), args.threshold)
+        for r in rows:
+            flag = "REGRESSION" if r["regressed"] else ""
+            print(f"{r['benchmark']:<40} {r['baseline_s'] * 1e3:10.3f} -> {r['current_s'] * 1e3:10.3f} ms  x{r['ratio']:.2f} {flag}", file=sys.stderr)
+        if any(r["regressed"] for r in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
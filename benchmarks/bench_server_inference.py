@@ -0,0 +1,84 @@
+"""Per-request inference cost of the server stack, before and after the
+preprocessor was persisted with the model.
+
+Before: every request refitted a fresh ColumnTransformer on its own row and
+then ran the forest twice (`predict` and `predict_proba`). After: the artifact
+written by `ModelTrainer` is loaded once and each request only runs
+`transform` and one `predict_proba`.
+
+    python benchmarks/bench_server_inference.py --requests 200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Dict
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_pipeline import make_applicants, time_call  # noqa: E402
+from server.database.database import Database  # noqa: E402
+from server.ml_model.model import LoanEligibilityModel  # noqa: E402
+from server.preprocessing.data_preprocessing import DataPreprocessor  # noqa: E402
+from server.training.model_training import ModelTrainer  # noqa: E402
+
+TRAIN_ROWS = 2000
+
+
+def _server_record(a: Dict[str, Any]) -> Dict[str, Any]:
+    # The server schema names the ratio `debt_to_income_ratio`
+    r = dict(a, debt_to_income_ratio=a["debt_to_income"])
+    del r["debt_to_income"]
+    return r
+
+
+def run(train_rows: int = TRAIN_ROWS, min_time: float = 0.5, repeat: int = 5, workdir: str = None) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = workdir or tmp
+        db_path = os.path.join(workdir, "server.db")
+        model_path = os.path.join(workdir, "model.joblib")
+        db = Database(db_path)
+        for a in make_applicants(train_rows, seed=1):
+            db.insert_training_record(_server_record(a), int(a["cibil_score"] > 600 and a["missed_emis"] == 0))
+        db.close()
+        trainer = ModelTrainer(db_path, model_path, n_jobs=1)
+        trainer.train_from_db()
+        trainer.close()
+
+        served = LoanEligibilityModel(model_path)
+        row = pd.DataFrame([_server_record(make_applicants(1, seed=2)[0])])
+        X = served.transform(row)
+
+        def before():
+            # old per-request path: refit preprocessing on the request, two forest passes
+            DataPreprocessor().preprocess(row)
+            served.model.predict(X)
+            served.model.predict_proba(X)
+
+        def after():
+            served.predict(row)
+
+        results = {name: time_call(fn, min_time=min_time, repeat=repeat) for name, fn in (("before", before), ("after", after))}
+    return {
+        "before_ms": results["before"]["median_s"] * 1e3,
+        "after_ms": results["after"]["median_s"] * 1e3,
+        "speedup": results["before"]["median_s"] / results["after"]["median_s"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-request inference of the server stack")
+    parser.add_argument("--train-rows", type=int, default=TRAIN_ROWS)
+    parser.add_argument("--min-time", type=float, default=0.5, help="Approximate seconds spent per variant")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.train_rows, args.min_time, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Load test for the FastAPI app.
+
+    cd src && uvicorn credisense.app:app --port 8000
+    locust -f benchmarks/locustfile.py --host http://localhost:8000 --headless -u 50 -r 10 -t 1m --csv bench
+
+Each simulated user mostly scores single applicants, sometimes a batch of
+`BATCH_SIZE`, and re-scores a previous applicant to exercise the prediction
+cache when it is enabled.
+"""
+import random
+
+from locust import HttpUser, between, task
+
+BATCH_SIZE = 50
+EMPLOYMENT = ("salaried", "self-employed", "unemployed", "other")
+
+
+def make_applicant():
+    return {
+        "income": round(random.lognormvariate(10.5, 0.6), 2),
+        "loan_amount": round(random.uniform(10000, 1500000), 2),
+        "cibil_score": random.randint(300, 900),
+        "previous_loans": random.randint(0, 5),
+        "missed_emis": random.choice((0, 0, 0, 1, 2)),
+        "employment_type": random.choice(EMPLOYMENT),
+        "debt_to_income": round(random.uniform(0, 0.9), 3),
+        "age": random.randint(21, 64),
+        "dependents": random.randint(0, 4),
+    }
+
+
+class CrediSenseUser(HttpUser):
+    wait_time = between(0.05, 0.5)
+
+    def on_start(self):
+        self.seen = []
+
+    @task(10)
+    def predict(self):
+        applicant = make_applicant()
+        self.seen.append(applicant)
+        del self.seen[:-20]
+        self.client.post("/predict", json=applicant)
+
+    @task(3)
+    def rescore(self):
+        if self.seen:
+            self.client.post("/predict", json=random.choice(self.seen), name="/predict (repeat)")
+
+    @task(1)
+    def predict_batch(self):
+        self.client.post("/predict/batch", json=[make_applicant() for _ in range(BATCH_SIZE)])
+
+    @task(1)
+    def health(self):
+        self.client.get("/health")
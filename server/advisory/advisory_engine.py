@@ -1,14 +1,62 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+OPS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+# Each rule fires when all [field, op, threshold] conditions hold. 'prediction'
+# is the model probability passed alongside the input. Fields missing from the
+# input never fire a rule; 'debt_to_income' is accepted for debt_to_income_ratio.
+RULES = {
+    'aliases': {'debt_to_income_ratio': ['debt_to_income']},
+    'rules': [
+        {'when': [['cibil_score', '<', 650]], 'message': "Improve your CIBIL score above 650."},
+        {'when': [['debt_to_income_ratio', '>', 0.4]], 'message': "Reduce your debt-to-income ratio below 40%."},
+        {'when': [['missed_emis', '>', 0]], 'message': "Clear your missed EMIs to improve your creditworthiness."},
+        {'when': [['prediction', '<', 0.5]], 'message': "Consider adding a co-applicant to strengthen your application."},
+    ],
+}
+
+
 class AdvisoryEngine:
+    def __init__(self, rules=None, rules_path=None):
+        if rules_path is not None:
+            with open(rules_path) as f:
+                rules = json.load(f)
+        rules = rules or RULES
+        self.aliases = rules.get('aliases', {})
+        self.rules = [
+            ([(field, OPS[op], float(threshold)) for field, op, threshold in rule['when']], rule['message'])
+            for rule in rules['rules']
+        ]
+
+    def _column(self, df, field):
+        values = np.full(len(df), np.nan)
+        for name in [field] + self.aliases.get(field, []):
+            if name in df.columns:
+                col = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+                values = np.where(np.isnan(values), col, values)
+        return values
+
+    def generate_advice_batch(self, input_data, predictions):
+        """Advice for every row of a DataFrame (or list of dicts) given its predicted probabilities."""
+        df = input_data if isinstance(input_data, pd.DataFrame) else pd.DataFrame(list(input_data))
+        df = df.assign(prediction=np.asarray(predictions, dtype=float).reshape(-1))
+        columns = {}
+        fired = np.ones((len(self.rules), len(df)), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            for i, (conditions, _) in enumerate(self.rules):
+                for field, op, threshold in conditions:
+                    if field not in columns:
+                        columns[field] = self._column(df, field)
+                    fired[i] &= op(columns[field], threshold)
+        return [[self.rules[i][1] for i in np.flatnonzero(row)] for row in fired.T]
+
     def generate_advice(self, input_data, prediction):
-        advice = []
-
-        if input_data['cibil_score'] < 650:
-            advice.append("Improve your CIBIL score above 650.")
-        if input_data['debt_to_income_ratio'] > 0.4:
-            advice.append("Reduce your debt-to-income ratio below 40%.")
-        if input_data['missed_emis'] > 0:
-            advice.append("Clear your missed EMIs to improve your creditworthiness.")
-        if prediction < 0.5:
-            advice.append("Consider adding a co-applicant to strengthen your application.")
-
-        return advice
\ No newline at end of file
+        return self.generate_advice_batch([input_data], [prediction])[0]
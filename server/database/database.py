@@ -1,7 +1,73 @@
 import sqlite3
 import json
+import numpy as np
 import pandas as pd
 
+# Typed training_data columns; any other feature is stored in the JSON `extra` column
+TRAINING_NUMERIC_COLUMNS = [
+    ('income', 'REAL'),
+    ('loan_amount', 'REAL'),
+    ('debt_to_income_ratio', 'REAL'),
+    ('cibil_score', 'REAL'),
+    ('age', 'INTEGER'),
+    ('dependents', 'INTEGER'),
+    ('previous_loans', 'INTEGER'),
+    ('missed_emis', 'INTEGER'),
+]
+TRAINING_TEXT_COLUMNS = ['employment_type', 'property_area']
+TRAINING_FIELDS = [c for c, _ in TRAINING_NUMERIC_COLUMNS] + TRAINING_TEXT_COLUMNS
+_NUMERIC_FIELDS = {c for c, _ in TRAINING_NUMERIC_COLUMNS}
+
+# Rows per block yielded by Database.iter_training_arrays
+TRAINING_CHUNK_ROWS = 10000
+
+
+def _training_block(columns, rows):
+    cols = list(zip(*rows))
+    arrays = {}
+    for c, values in zip(columns, cols):
+        if c in _NUMERIC_FIELDS:
+            try:
+                arrays[c] = np.array(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                # non-numeric text kept by SQLite's flexible typing
+                arrays[c] = np.array(values, dtype=object)
+        elif c == 'label':
+            arrays[c] = np.array(values)
+        else:
+            arrays[c] = np.array(values, dtype=object)
+    return arrays
+
+
+def training_dataframe(arrays, drop_missing=True) -> pd.DataFrame:
+    """Build the training DataFrame (features, expanded `extra`, `loan_approved`) from column arrays.
+
+    With `drop_missing`, features never supplied in any row are left out, as
+    with the old JSON records.
+    """
+    data = {}
+    for c in TRAINING_FIELDS:
+        if c not in arrays:
+            continue
+        col = arrays[c]
+        if col.dtype == object:
+            missing = np.array([v is None for v in col], dtype=bool)
+            if drop_missing and missing.all():
+                continue
+            col = col.copy()
+            col[missing] = np.nan
+        elif drop_missing and np.isnan(col).all():
+            continue
+        data[c] = col
+    df = pd.DataFrame(data)
+    extras = arrays.get('extra')
+    if extras is not None and any(e is not None for e in extras):
+        extra_df = pd.DataFrame([json.loads(e) if e else {} for e in extras])
+        df = pd.concat([df, extra_df.drop(columns=[c for c in extra_df.columns if c in df.columns])], axis=1)
+    if 'label' in arrays:
+        df['loan_approved'] = arrays['label']
+    return df
+
 
 class Database:
     def __init__(self, db_path):
@@ -23,23 +89,25 @@ class Database:
                 )
             ''')
 
-            self.connection.execute('''
-                CREATE TABLE IF NOT EXISTS training_data (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    features_json TEXT,
-                    label INTEGER,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS idx_applicants_timestamp ON applicants (timestamp, id)')
+
+            self.migrate_training_data()
+            self.connection.execute(self._training_table_sql('training_data'))
 
             self.connection.execute('''
                 CREATE TABLE IF NOT EXISTS retraining_logs (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
                     records_used INTEGER,
-                    model_path TEXT
+                    model_path TEXT,
+                    wall_seconds REAL,
+                    trees_added INTEGER
                 )
             ''')
+            log_cols = [r['name'] for r in self.connection.execute('PRAGMA table_info(retraining_logs)')]
+            for col, kind in (('wall_seconds', 'REAL'), ('trees_added', 'INTEGER')):
+                if col not in log_cols:
+                    self.connection.execute(f'ALTER TABLE retraining_logs ADD COLUMN {col} {kind}')
 
             self.connection.execute('''
                 CREATE TABLE IF NOT EXISTS batch_tracker (
@@ -53,6 +121,45 @@ class Database:
             if cur.fetchone()['c'] == 0:
                 self.connection.execute('INSERT INTO batch_tracker (id, count) VALUES (1, 0)')
 
+    @staticmethod
+    def _training_table_sql(table):
+        cols = [f'{c} {t}' for c, t in TRAINING_NUMERIC_COLUMNS] + [f'{c} TEXT' for c in TRAINING_TEXT_COLUMNS]
+        return f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                {', '.join(cols)},
+                extra TEXT,
+                label INTEGER,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        '''
+
+    def migrate_training_data(self):
+        """Rebuild a legacy `features_json` training_data table with typed columns.
+
+        Returns the number of migrated rows, or 0 if the table is already typed.
+        """
+        with self.connection:
+            cols = [r['name'] for r in self.connection.execute('PRAGMA table_info(training_data)')]
+            if 'features_json' not in cols:
+                return 0
+            if not self.connection.in_transaction:
+                self.connection.execute('BEGIN IMMEDIATE')
+            extracts = ', '.join(
+                f"CASE WHEN json_valid(features_json) THEN json_extract(features_json, '$.{c}') END" for c in TRAINING_FIELDS
+            )
+            paths = ', '.join(f"'$.{c}'" for c in TRAINING_FIELDS)
+            self.connection.execute('ALTER TABLE training_data RENAME TO training_data_legacy')
+            self.connection.execute(self._training_table_sql('training_data'))
+            cur = self.connection.execute(
+                f'INSERT INTO training_data (id, {", ".join(TRAINING_FIELDS)}, extra, label, created_at) '
+                f'SELECT id, {extracts}, '
+                f"CASE WHEN json_valid(features_json) THEN NULLIF(json_remove(features_json, {paths}), '{{}}') ELSE features_json END, "
+                f'label, created_at FROM training_data_legacy ORDER BY id'
+            )
+            self.connection.execute('DROP TABLE training_data_legacy')
+            return cur.rowcount
+
     # Applicants
     def insert_applicant(self, input_data, prediction, probability, shap_summary):
         with self.connection:
@@ -66,26 +173,97 @@ class Database:
             rows = self.connection.execute('SELECT * FROM applicants').fetchall()
             return [dict(r) for r in rows]
 
+    def fetch_applicants_page(self, after_id=0, limit=100, start=None, end=None):
+        """Return up to `limit` applicants with `id > after_id` (optionally `start <= timestamp < end`) and the next `after_id`.
+
+        Keyset pagination: a page costs the same however far into the table it
+        is. The next `after_id` is None on the last page.
+        """
+        where, params = ['id > ?'], [int(after_id)]
+        if start is not None:
+            where.append('timestamp >= ?')
+            params.append(start)
+        if end is not None:
+            where.append('timestamp < ?')
+            params.append(end)
+        rows = self.connection.execute(
+            f'SELECT * FROM applicants WHERE {" AND ".join(where)} ORDER BY id LIMIT ?', params + [int(limit) + 1]
+        ).fetchall()
+        more = len(rows) > limit
+        rows = [dict(r) for r in rows[:limit]]
+        return rows, (rows[-1]['id'] if more else None)
+
     # Training data interface
     def insert_training_record(self, features: dict, label: int):
+        values = []
+        for c in TRAINING_FIELDS:
+            v = features.get(c)
+            values.append(v if v is None or isinstance(v, (int, float, str)) else json.dumps(v))
+        extra = {k: v for k, v in features.items() if k not in TRAINING_FIELDS}
         with self.connection:
             self.connection.execute(
-                'INSERT INTO training_data (features_json, label) VALUES (?, ?)',
-                (json.dumps(features), int(label))
+                f'INSERT INTO training_data ({", ".join(TRAINING_FIELDS)}, extra, label) '
+                f'VALUES ({", ".join("?" * (len(TRAINING_FIELDS) + 2))})',
+                values + [json.dumps(extra) if extra else None, int(label)]
             )
             # increment batch tracker
             self.increment_batch_count(1)
 
+    def fetch_training_arrays(self):
+        """Return training_data as a dict of NumPy columns built straight from the cursor.
+
+        Numeric features are float64 (NaN for NULL), text features are object
+        arrays, `label` is int64 (object if NULLs are present) and `extra` holds the raw overflow JSON (or None).
+        """
+        chunks = list(self.iter_training_arrays(chunk_rows=None))
+        if not chunks:
+            return {}
+        if len(chunks) == 1:
+            return chunks[0]
+        return {c: np.concatenate([chunk[c] for chunk in chunks]) for c in chunks[0]}
+
+    def iter_training_arrays(self, chunk_rows=TRAINING_CHUNK_ROWS, columns=None):
+        """Yield training_data in blocks of at most `chunk_rows` rows (None = one block).
+
+        Each block is a dict of NumPy columns as in `fetch_training_arrays`,
+        restricted to `columns` (default: every feature plus `extra` and
+        `label`). Rows are read with `fetchmany`, so memory stays bounded by
+        the block size however large the table is.
+        """
+        columns = list(columns) if columns is not None else TRAINING_FIELDS + ['extra', 'label']
+        unknown = [c for c in columns if c not in TRAINING_FIELDS + ['extra', 'label']]
+        if unknown:
+            raise ValueError(f'Unknown training_data columns: {unknown}')
+        cur = self.connection.cursor()
+        # plain tuples; sqlite3.Row is only convenient for single rows
+        cur.row_factory = None
+        cur.execute(f'SELECT {", ".join(columns)} FROM training_data ORDER BY id')
+        try:
+            while True:
+                rows = cur.fetchmany(chunk_rows) if chunk_rows else cur.fetchall()
+                if not rows:
+                    return
+                yield _training_block(columns, rows)
+                if not chunk_rows:
+                    return
+        finally:
+            cur.close()
+
+    def iter_training_dataframes(self, chunk_rows=TRAINING_CHUNK_ROWS, columns=None):
+        """Yield training_data as DataFrames of at most `chunk_rows` rows.
+
+        Blocks are built like `fetch_training_dataframe`, except that every
+        projected feature column is kept (NaN when missing) so all blocks share
+        the same typed columns; `extra` fields are expanded per block.
+        """
+        for block in self.iter_training_arrays(chunk_rows, columns):
+            yield training_dataframe(block, drop_missing=False)
+
     def fetch_training_dataframe(self) -> pd.DataFrame:
-        with self.connection:
-            rows = self.connection.execute('SELECT features_json, label FROM training_data').fetchall()
-            records = [json.loads(r['features_json']) for r in rows]
-            labels = [r['label'] for r in rows]
-            if len(records) == 0:
-                return pd.DataFrame()
-            df = pd.DataFrame(records)
-            df['loan_approved'] = labels
-            return df
+        arrays = self.fetch_training_arrays()
+        if not arrays:
+            return pd.DataFrame()
+        return training_dataframe(arrays)
 
     # Batch tracker
     def get_batch_count(self) -> int:
@@ -101,12 +279,28 @@ class Database:
         with self.connection:
             self.connection.execute('UPDATE batch_tracker SET count = 0 WHERE id = 1')
 
+    def claim_batch_count(self, batch_threshold):
+        """Atomically take the batch count and reset it to 0 if it reached `batch_threshold`; None otherwise."""
+        with self.connection:
+            # BEGIN IMMEDIATE takes the write lock before reading, so only one process can claim a batch
+            if not self.connection.in_transaction:
+                self.connection.execute('BEGIN IMMEDIATE')
+            count = int(self.connection.execute('SELECT count FROM batch_tracker WHERE id = 1').fetchone()['count'])
+            if count < batch_threshold:
+                return None
+            self.connection.execute('UPDATE batch_tracker SET count = 0 WHERE id = 1')
+            return count
+
+    def release_batch_count(self, count):
+        # Give back a claimed count whose retrain failed
+        self.increment_batch_count(count)
+
     # Retraining logs
-    def log_retraining(self, records_used: int, model_path: str):
+    def log_retraining(self, records_used: int, model_path: str, wall_seconds: float = None, trees_added: int = None):
         with self.connection:
             self.connection.execute(
-                'INSERT INTO retraining_logs (records_used, model_path) VALUES (?, ?)',
-                (records_used, model_path)
+                'INSERT INTO retraining_logs (records_used, model_path, wall_seconds, trees_added) VALUES (?, ?, ?, ?)',
+                (records_used, model_path, wall_seconds, trees_added)
             )
 
     def close(self):
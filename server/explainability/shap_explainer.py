@@ -1,11 +1,26 @@
+import threading
 import shap
 import numpy as np
 
+_lock = threading.Lock()
+# (raw model, TreeExplainer) for the most recently wrapped model
+_cached = (None, None)
+
+
+def _tree_explainer(raw_model):
+    # Building a TreeExplainer walks the whole forest; do it once per model
+    global _cached
+    with _lock:
+        if _cached[0] is not raw_model:
+            _cached = (raw_model, shap.TreeExplainer(raw_model))
+        return _cached[1]
+
+
 class SHAPExplainer:
     def __init__(self, model):
         # Accept either a raw model or a wrapper that holds the model
         raw_model = getattr(model, 'model', model)
-        self.explainer = shap.TreeExplainer(raw_model)
+        self.explainer = _tree_explainer(raw_model)
 
     def explain(self, data):
         # Ensure data is numpy array or DataFrame
@@ -0,0 +1,81 @@
+import numpy as np
+
+
+class FlatForest:
+    """A fitted RandomForestClassifier as a handful of flat numpy arrays.
+
+    All trees share one node table (`feature`, `threshold`, `left`, `right`,
+    per-node class probabilities in `value`); `roots` holds each tree's first
+    node and leaves point to themselves, so `predict_proba` walks every row
+    through every tree in `depth` vectorized steps. Unlike sklearn's tree
+    objects, which copy their nodes when unpickled, these are plain arrays:
+    `joblib.load(..., mmap_mode='r')` maps them, and worker processes loading
+    the same artifact share one copy from the page cache.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.depth = int(depth)
+
+    @classmethod
+    def from_model(cls, model):
+        """Flatten a fitted RandomForestClassifier; None for any other model."""
+        from sklearn.ensemble import RandomForestClassifier
+
+        if not isinstance(model, RandomForestClassifier) or not hasattr(model, 'estimators_'):
+            return None
+        if getattr(model, 'n_outputs_', 1) != 1:
+            return None
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset, depth = 0, 0
+        for est in model.estimators_:
+            tree = est.tree_
+            own = np.arange(offset, offset + tree.node_count)
+            is_leaf = tree.children_left == -1
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, own, tree.children_left + offset))
+            rights.append(np.where(is_leaf, own, tree.children_right + offset))
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            norm = value.sum(axis=1, keepdims=True)
+            norm[norm == 0.0] = 1.0
+            values.append(value / norm)
+            roots.append(offset)
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+        return cls(
+            np.concatenate(features).astype(np.intp),
+            np.concatenate(thresholds),
+            np.concatenate(lefts).astype(np.intp),
+            np.concatenate(rights).astype(np.intp),
+            np.concatenate(values),
+            np.asarray(roots, dtype=np.intp),
+            np.asarray(model.classes_),
+            depth,
+        )
+
+    def predict_proba(self, X):
+        # sklearn compares float32 inputs with float64 thresholds; do the same
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.depth):
+            go_left = np.take_along_axis(X, self.feature[node], axis=1) <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        # Trees are summed in order, as RandomForestClassifier does
+        proba = self.value[node[:, 0]].copy()
+        for t in range(1, len(self.roots)):
+            proba += self.value[node[:, t]]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
@@ -1,8 +1,93 @@
+import glob
+import os
+import uuid
 import joblib
+from server.ml_model.flat_forest import FlatForest
+
+# Keys of the artifact written by ModelTrainer: the fitted DataPreprocessor,
+# the classifier flattened for scoring and the file holding the sklearn classifier
+ARTIFACT_FORMAT = 2
+# sklearn classifier files kept next to an artifact (older ones are removed)
+KEEP_MODEL_FILES = 2
+
+
+def _model_files(path):
+    root, _ = os.path.splitext(path)
+    return glob.glob(f'{glob.escape(root)}.*.sklearn.joblib')
+
+
+def _dump(obj, path):
+    # Write and fsync under a temporary name, then rename over `path`
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        joblib.dump(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def save_artifact(path, preprocessor, model):
+    """Save the fitted preprocessor and classifier together as one artifact.
+
+    A random forest is stored as a `FlatForest`, whose arrays are mapped when
+    the artifact is loaded; the sklearn classifier (only needed for SHAP) goes
+    to its own `<name>.<id>.sklearn.joblib` file, written before the artifact
+    that names it. Every file is written and fsynced under a temporary name
+    and renamed into place, so a process loading the model never sees a
+    partial pickle.
+    """
+    forest = FlatForest.from_model(model)
+    artifact = {'format': ARTIFACT_FORMAT, 'preprocessor': preprocessor, 'forest': forest}
+    if forest is None:
+        artifact['model'] = model
+    else:
+        root, _ = os.path.splitext(path)
+        model_file = f'{root}.{uuid.uuid4().hex[:12]}.sklearn.joblib'
+        _dump(model, model_file)
+        artifact['model_file'] = os.path.basename(model_file)
+    _dump(artifact, path)
+    # keep the previous classifier for processes still serving the old artifact
+    for old in sorted(_model_files(path), key=os.path.getmtime)[:-KEEP_MODEL_FILES]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
 
 class LoanEligibilityModel:
-    def __init__(self, model_path):
-        self.model = joblib.load(model_path)
+    def __init__(self, model_path, mmap_mode='r'):
+        # Numpy arrays stored in the artifact (the flat forest) are mapped
+        # read-only and shared between worker processes
+        artifact = joblib.load(model_path, mmap_mode=mmap_mode)
+        self._model_file = None
+        self._model = None
+        self.forest = None
+        if isinstance(artifact, dict) and ('model' in artifact or 'forest' in artifact):
+            self.preprocessor = artifact.get('preprocessor')
+            self.forest = artifact.get('forest')
+            self._model = artifact.get('model')
+            if artifact.get('model_file'):
+                self._model_file = os.path.join(os.path.dirname(os.path.abspath(model_path)), artifact['model_file'])
+        else:
+            # Bare classifier (older artifacts): inputs must already be preprocessed
+            self.preprocessor = None
+            self._model = artifact
+
+    @property
+    def model(self):
+        """The sklearn classifier, unpickled on first use (SHAP needs it; scoring does not)."""
+        if self._model is None and self._model_file is not None:
+            self._model = joblib.load(self._model_file)
+        return self._model
+
+    def transform(self, data):
+        # Inference only applies the statistics fitted at training time
+        if self.preprocessor is None:
+            return data
+        return self.preprocessor.transform(data)
 
     def predict(self, data):
-        return self.model.predict(data), self.model.predict_proba(data)[:, 1]
\ No newline at end of file
+        # One forest pass: the predicted class is the argmax of the probabilities
+        scorer = self.forest if self.forest is not None else self.model
+        proba = scorer.predict_proba(self.transform(data))
+        return scorer.classes_.take(proba.argmax(axis=1)), proba[:, 1]
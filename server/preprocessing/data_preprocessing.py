@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
@@ -10,7 +11,7 @@ class DataPreprocessor:
         self.numeric_features = ['income', 'loan_amount', 'debt_to_income_ratio', 'cibil_score', 'age', 'dependents', 'previous_loans', 'missed_emis']
         self.categorical_features = ['employment_type', 'property_area']
 
-        # Transformers are created on demand in preprocess based on available columns
+        # Transformers are created on demand in fit based on available columns
         self.numeric_transformer = Pipeline(steps=[
             ('imputer', SimpleImputer(strategy='mean')),
             ('scaler', StandardScaler())
@@ -21,30 +22,76 @@ class DataPreprocessor:
             ('onehot', OneHotEncoder(handle_unknown='ignore'))
         ])
 
-        # placeholder; actual ColumnTransformer will be built in preprocess
+        # Set by fit: the fitted ColumnTransformer and the columns it was fitted on
         self.preprocessor = None
+        self.fitted_numeric = []
+        self.fitted_categorical = []
 
-    def preprocess(self, data):
-        # Accept dict-like input for tests and convert to DataFrame
+    @staticmethod
+    def _frame(data):
+        # Accept a dict of columns, a single record or a list of records
         if isinstance(data, dict):
-            data = pd.DataFrame(data)
-        # If a DataFrame is provided, build the ColumnTransformer for available cols
-        if isinstance(data, pd.DataFrame):
-            present_num = [c for c in self.numeric_features if c in data.columns]
-            present_cat = [c for c in self.categorical_features if c in data.columns]
-
-            transformers = []
-            if present_num:
-                transformers.append(('num', self.numeric_transformer, present_num))
-            if present_cat:
-                transformers.append(('cat', self.categorical_transformer, present_cat))
-
-            if not transformers:
-                # Nothing to transform; return raw values
-                return data.values
+            if all(np.ndim(v) == 0 for v in data.values()):
+                return pd.DataFrame([data])
+            return pd.DataFrame(data)
+        if isinstance(data, list) and data and isinstance(data[0], dict):
+            return pd.DataFrame(data)
+        return data
+
+    @property
+    def is_fitted(self):
+        return self.preprocessor is not None
+
+    def fit(self, data):
+        """Fit imputers, scaler and encoder on training data (columns present in `data`)."""
+        data = self._frame(data)
+        self.fitted_numeric = [c for c in self.numeric_features if c in data.columns]
+        self.fitted_categorical = [c for c in self.categorical_features if c in data.columns]
+
+        transformers = []
+        if self.fitted_numeric:
+            transformers.append(('num', self.numeric_transformer, self.fitted_numeric))
+        if self.fitted_categorical:
+            transformers.append(('cat', self.categorical_transformer, self.fitted_categorical))
+        if not transformers:
+            raise ValueError('No known feature columns to fit the preprocessor on')
 
-            self.preprocessor = ColumnTransformer(transformers=transformers)
-            return self.preprocessor.fit_transform(data)
+        self.preprocessor = ColumnTransformer(transformers=transformers)
+        self.preprocessor.fit(data)
+        return self
 
-        # If input is array-like, assume preprocessor has been fit and transform
-        return self.preprocessor.transform(data)
\ No newline at end of file
+    def fit_transform(self, data):
+        return self.fit(data).transform(data)
+
+    def transform(self, data):
+        """Transform with the fitted statistics; never refits.
+
+        Columns seen during fit but missing from `data` are passed as missing
+        values so the fitted imputers fill them; unknown columns are ignored.
+        """
+        if not self.is_fitted:
+            raise ValueError('DataPreprocessor is not fitted; call fit() on training data first')
+        data = self._frame(data)
+        if not isinstance(data, pd.DataFrame):
+            return self.preprocessor.transform(data)
+        frame = {}
+        for c in self.fitted_numeric:
+            frame[c] = pd.to_numeric(data[c], errors='coerce') if c in data.columns else np.nan
+        for c in self.fitted_categorical:
+            # None is not a missing value to SimpleImputer; NaN is
+            frame[c] = data[c].astype(object).where(data[c].notna(), np.nan) if c in data.columns else np.nan
+        frame = pd.DataFrame(frame, index=data.index)
+        for c in self.fitted_categorical:
+            frame[c] = frame[c].astype(object)
+        return self.preprocessor.transform(frame)
+
+    def preprocess(self, data):
+        # Fits on the first data it is given (training) and only transforms afterwards
+        data = self._frame(data)
+        if isinstance(data, pd.DataFrame) and not self.is_fitted:
+            present = [c for c in self.numeric_features + self.categorical_features if c in data.columns]
+            if not present:
+                # Nothing to transform; return raw values
+                return data.values
+            return self.fit_transform(data)
+        return self.transform(data)
@@ -1,14 +1,19 @@
+import io
 import sys
 import os
+import tempfile
+from contextlib import redirect_stdout
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import unittest
+import numpy as np
 from server.preprocessing.data_preprocessing import DataPreprocessor  # type: ignore
 from server.ml_model.model import LoanEligibilityModel  # type: ignore
 from server.explainability.shap_explainer import SHAPExplainer  # type: ignore
 from server.advisory.advisory_engine import AdvisoryEngine  # type: ignore
 from server.database.database import Database  # type: ignore
 from server.pdf_generator.pdf_generator import PDFGenerator  # type: ignore
+from server.training.model_training import ModelTrainer, main as training_main, reservoir_sample, try_lock  # type: ignore
 
 # NOTE: Editor linters may not resolve the `server` package if the workspace
 # root is set to the `server` folder. Use the provided `run_tests.py` runner
@@ -37,6 +42,42 @@ class TestPipeline(unittest.TestCase):
         self.assertIsNotNone(prediction)
         self.assertIsNotNone(probability)
 
+    def test_trained_artifact_transforms_without_refit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'server.db')
+            model_path = os.path.join(tmp, 'model.joblib')
+            db = Database(db_path)
+            for i in range(40):
+                record = {'income': 2000 + 300 * i, 'loan_amount': 50000 + 9000 * i, 'cibil_score': 400 + 12 * i,
+                          'employment_type': ['Salaried', 'Self-Employed'][i % 2]}
+                db.insert_training_record(record, int(i >= 20))
+            db.close()
+            trainer = ModelTrainer(db_path, model_path, n_jobs=1, chunk_rows=16, max_rows=30)
+            info = trainer.train_from_db()
+            trainer.close()
+            self.assertEqual((info['records_used'], info['records_total']), (30, 40))
+
+            model = LoanEligibilityModel(model_path)
+            # scoring uses the flat forest mapped from the artifact; the sklearn classifier is not loaded
+            self.assertIsInstance(model.forest.value, np.memmap)
+            self.assertFalse(model.forest.value.flags.writeable)
+            self.assertIsNone(model._model)
+            scaler = model.preprocessor.preprocessor.named_transformers_['num'].named_steps['scaler']
+            mean = scaler.mean_.copy()
+            # a single row (with a missing and an unseen feature) is transformed with the training statistics
+            prediction, probability = model.predict({'income': 9000, 'cibil_score': 750, 'employment_type': 'Retired'})
+            self.assertEqual(len(prediction), 1)
+            self.assertTrue((scaler.mean_ == mean).all())
+            expected = model.model.predict_proba(model.preprocessor.transform([{'income': 9000, 'cibil_score': 750, 'employment_type': 'Retired'}]))[:, 1]
+            self.assertEqual(probability.tolist(), expected.tolist())
+
+            # retraining keeps only the newest sklearn classifier files
+            trainer = ModelTrainer(db_path, model_path, n_jobs=1)
+            for _ in range(2):
+                trainer.train_from_db()
+            trainer.close()
+            self.assertEqual(len([n for n in os.listdir(tmp) if n.endswith('.sklearn.joblib')]), 2)
+
     def test_shap_explanation(self):
         model_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dummy_model.joblib'))
         model = LoanEligibilityModel(model_path)
@@ -57,12 +98,97 @@ class TestPipeline(unittest.TestCase):
         advice = advisory.generate_advice(input_data, prediction)
         self.assertGreater(len(advice), 0)
 
+    def test_advisory_engine_batch(self):
+        advisory = AdvisoryEngine()
+        rows = [
+            {'cibil_score': 600, 'debt_to_income_ratio': 0.5, 'missed_emis': 2},
+            {'cibil_score': 720, 'debt_to_income': 0.6, 'missed_emis': 0},
+            {'cibil_score': 800},
+        ]
+        batch = advisory.generate_advice_batch(rows, [0.4, 0.9, 0.7])
+        self.assertEqual(batch, [advisory.generate_advice(r, p) for r, p in zip(rows, [0.4, 0.9, 0.7])])
+        self.assertEqual(len(batch[0]), 4)
+        self.assertEqual(batch[1], ["Reduce your debt-to-income ratio below 40%."])
+        self.assertEqual(batch[2], [])
+
     def test_database(self):
         db = Database(':memory:')
         db.insert_applicant('input_data', 'prediction', 0.8, 'shap_summary')
         applicants = db.fetch_all_applicants()
         self.assertEqual(len(applicants), 1)
 
+    def test_applicants_keyset_pages(self):
+        db = Database(':memory:')
+        for i in range(5):
+            db.insert_applicant({'i': i}, 'Eligible', 0.5, {})
+        page, after = db.fetch_applicants_page(limit=2)
+        ids = [r['id'] for r in page]
+        while after is not None:
+            page, after = db.fetch_applicants_page(after_id=after, limit=2)
+            ids += [r['id'] for r in page]
+        self.assertEqual(ids, [1, 2, 3, 4, 5])
+
+    def test_training_data_typed_columns(self):
+        db = Database(':memory:')
+        db.insert_training_record({'income': 5000, 'employment_type': 'Salaried', 'co_applicant': 'yes'}, 1)
+        db.insert_training_record({'income': 8000, 'debt_to_income_ratio': 0.2}, 0)
+        arrays = db.fetch_training_arrays()
+        self.assertEqual(arrays['income'].tolist(), [5000.0, 8000.0])
+        df = db.fetch_training_dataframe()
+        self.assertEqual(sorted(df.columns), ['co_applicant', 'debt_to_income_ratio', 'employment_type', 'income', 'loan_approved'])
+        self.assertEqual(df['loan_approved'].tolist(), [1, 0])
+
+    def test_training_data_streams_in_chunks(self):
+        db = Database(':memory:')
+        for i in range(25):
+            db.insert_training_record({'income': 1000 + i, 'employment_type': 'Salaried' if i % 2 else None, 'co_applicant': i}, i % 2)
+        blocks = list(db.iter_training_arrays(chunk_rows=10, columns=['income', 'label']))
+        self.assertEqual([len(b['income']) for b in blocks], [10, 10, 5])
+        self.assertEqual(sorted(blocks[0]), ['income', 'label'])
+        whole = db.fetch_training_arrays()
+        self.assertEqual(np.concatenate([b['income'] for b in blocks]).tolist(), whole['income'].tolist())
+        frames = list(db.iter_training_dataframes(chunk_rows=10))
+        self.assertEqual(sum(len(f) for f in frames), 25)
+        self.assertIn('property_area', frames[0].columns)
+        self.assertEqual(frames[2]['co_applicant'].tolist(), [20, 21, 22, 23, 24])
+
+        sample, seen = reservoir_sample(db.iter_training_arrays(chunk_rows=4), max_rows=8, seed=0)
+        self.assertEqual((seen, len(sample['income'])), (25, 8))
+        self.assertEqual(len(set(sample['income'].tolist())), 8)
+        self.assertTrue(set(sample['income'].tolist()) <= set(whole['income'].tolist()))
+        full, _ = reservoir_sample(db.iter_training_arrays(chunk_rows=4), max_rows=None)
+        self.assertEqual(full['income'].tolist(), whole['income'].tolist())
+
+    def test_retrain_claims_batch_once_under_lock(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'server.db')
+            model_path = os.path.join(tmp, 'model.joblib')
+            db = Database(db_path)
+            for i in range(12):
+                db.insert_training_record({'income': 1000 * i, 'cibil_score': 500 + 30 * i}, int(i >= 6))
+            self.assertIsNone(db.claim_batch_count(20))
+            self.assertEqual(db.claim_batch_count(10), 12)
+            self.assertIsNone(db.claim_batch_count(10))
+            db.release_batch_count(12)
+            db.close()
+
+            trainer = ModelTrainer(db_path, model_path, n_jobs=1)
+            with try_lock(model_path + '.lock') as locked:
+                self.assertTrue(locked)
+                # another process holds the retrain lock: skipped, nothing claimed
+                self.assertIsNone(trainer.retrain_if_needed(batch_threshold=10))
+                self.assertEqual(trainer.last_status, 'busy')
+                out = io.StringIO()
+                with redirect_stdout(out):
+                    training_main(['--db', db_path, '--model', model_path, '--force', '--n-jobs', '1'])
+                self.assertIn('Another retrain is in progress', out.getvalue())
+            self.assertEqual(trainer.db.get_batch_count(), 12)
+            self.assertIsNotNone(trainer.retrain_if_needed(batch_threshold=10))
+            self.assertEqual(trainer.last_status, 'trained')
+            self.assertEqual(trainer.db.get_batch_count(), 0)
+            self.assertEqual([n for n in os.listdir(tmp) if n.endswith('.tmp')], [])
+            trainer.close()
+
     def test_pdf_generation(self):
         pdf_gen = PDFGenerator()
         pdf_gen.generate_pdf('details', 'prediction', 'shap_summary', ['advice1', 'advice2'], 'test_report.pdf')
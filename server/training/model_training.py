@@ -1,66 +1,169 @@
 import os
-import joblib
+import time
 import numpy as np
 import argparse
+from contextlib import contextmanager
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
-from server.database.database import Database
+from server.database.database import TRAINING_CHUNK_ROWS, Database, training_dataframe
+from server.ml_model.model import save_artifact
 from server.preprocessing.data_preprocessing import DataPreprocessor
 
 
+try:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+@contextmanager
+def try_lock(path):
+    """Yield True while holding an exclusive cross-process lock on `path`, False if another process has it."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a+') as f:
+        try:
+            _lock_file(f)
+        except OSError:
+            yield False
+            return
+        # closing the file releases the lock
+        yield True
+
+
+def reservoir_sample(blocks, max_rows, seed=42):
+    """Return `(sample, rows_seen)`: a uniform sample of at most `max_rows` rows from column-array blocks.
+
+    Algorithm R applied a block at a time, so only the sample and one block
+    are held in memory. With `max_rows=None` every row is kept.
+    """
+    rng = np.random.default_rng(seed)
+    sample, seen = None, 0
+    for block in blocks:
+        n = len(next(iter(block.values())))
+        start = 0
+        size = 0 if sample is None else len(next(iter(sample.values())))
+        if max_rows is None or size < max_rows:
+            # fill phase: take rows until the reservoir is full
+            start = n if max_rows is None else min(n, max_rows - size)
+            head = {c: v[:start] for c, v in block.items()}
+            sample = head if sample is None else {c: np.concatenate([sample[c], head[c]]) for c in sample}
+        if start < n:
+            # row i (0-based, global) replaces slot j ~ U[0, i] when j < max_rows
+            slots = rng.integers(0, seen + np.arange(start, n) + 1)
+            keep = slots < max_rows
+            rows = np.arange(start, n)[keep]
+            for c, values in block.items():
+                if values.dtype != sample[c].dtype:
+                    sample[c] = sample[c].astype(object)
+                # later rows win on repeated slots, as in the sequential algorithm
+                sample[c][slots[keep]] = values[rows]
+        seen += n
+    return sample, seen
+
+
 class ModelTrainer:
-    def __init__(self, db_path: str, model_path: str):
+    def __init__(self, db_path: str, model_path: str, n_jobs: int = -1, chunk_rows: int = TRAINING_CHUNK_ROWS, max_rows: int = None):
         self.db_path = db_path
         self.model_path = model_path
+        # Cores used to fit trees (-1 = all)
+        self.n_jobs = n_jobs
+        # Training data is streamed in blocks of `chunk_rows`; tables larger than
+        # `max_rows` are uniformly subsampled to that many rows (None = use all)
+        self.chunk_rows = chunk_rows
+        self.max_rows = max_rows
         self.db = Database(db_path)
         self.preprocessor = DataPreprocessor()
+        # Outcome of the last train_from_db/retrain_if_needed call:
+        # 'trained', 'below_threshold' or 'busy' (another process holds the retrain lock)
+        self.last_status = None
 
     def train_from_db(self):
+        """Train regardless of the batch count (see `_train`).
+
+        Returns None without training if another process is retraining right now
+        (`last_status` is then 'busy').
+        """
+        return self._locked_retrain(0)
+
+    def retrain_if_needed(self, batch_threshold: int = 30):
+        return self._locked_retrain(batch_threshold)
+
+    def _locked_retrain(self, batch_threshold):
+        # One retrain at a time across processes; the batch is claimed atomically
+        # so two workers passing the threshold together do not both train
+        with try_lock(self.model_path + '.lock') as locked:
+            if not locked:
+                self.last_status = 'busy'
+                return None
+            claimed = self.db.claim_batch_count(batch_threshold)
+            if claimed is None:
+                self.last_status = 'below_threshold'
+                return None
+            try:
+                info = self._train()
+            except BaseException:
+                self.db.release_batch_count(claimed)
+                raise
+            self.last_status = 'trained'
+            return info
+
+    def _train(self):
         """Load training data from SQLite, preprocess, train model and save it.
 
-        Returns: dict with training info (records_used, model_path)
+        The fitted preprocessor is saved with the classifier in one artifact, so
+        `LoanEligibilityModel` can transform requests without refitting.
+
+        Rows are streamed from the database in `chunk_rows` blocks and
+        subsampled to `max_rows`, so memory is bounded by the sample size
+        rather than the table size.
+
+        Returns: dict with training info (records_used, records_total, model_path)
         """
-        df = self.db.fetch_training_dataframe()
-        if df.empty:
+        start = time.perf_counter()
+        sample, records_total = reservoir_sample(self.db.iter_training_arrays(self.chunk_rows), self.max_rows)
+        if sample is None:
             raise ValueError("No training data available in the database")
+        df = training_dataframe(sample)
 
         # Separate features and label
         y = df['loan_approved'].astype(int)
         X = df.drop(columns=['loan_approved'])
 
-        # Preprocess: fit the preprocessor on training data
-        X_preprocessed = self.preprocessor.preprocess(X)
+        # Preprocess: fit the preprocessor on training data (refit on every retrain)
+        self.preprocessor = DataPreprocessor()
+        X_preprocessed = self.preprocessor.fit_transform(X)
 
         # Train/test split
         X_train, X_test, y_train, y_test = train_test_split(X_preprocessed, y, test_size=0.2, random_state=42)
 
         # Train model (RandomForest for demo)
-        model = RandomForestClassifier(n_estimators=100, random_state=42)
+        model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=self.n_jobs)
         model.fit(X_train, y_train)
 
         # Ensure target directory exists
         os.makedirs(os.path.dirname(self.model_path) or '.', exist_ok=True)
-        joblib.dump(model, self.model_path)
+        save_artifact(self.model_path, self.preprocessor, model)
 
         # Log retraining
         records_used = len(df)
-        self.db.log_retraining(records_used, self.model_path)
-        # Reset batch counter after successful retrain
-        self.db.reset_batch_count()
+        wall_seconds = time.perf_counter() - start
+        self.db.log_retraining(records_used, self.model_path, wall_seconds=wall_seconds, trees_added=model.n_estimators)
 
-        return {"records_used": records_used, "model_path": self.model_path}
-
-    def retrain_if_needed(self, batch_threshold: int = 30):
-        count = self.db.get_batch_count()
-        if count >= batch_threshold:
-            return self.train_from_db()
-        return None
+        return {"records_used": records_used, "records_total": records_total, "model_path": self.model_path, "wall_seconds": wall_seconds}
 
     def close(self):
         self.db.close()
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Training runner: train model from SQLite training_data')
     parser.add_argument('--db', default=os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'server.db')),
                         help='Path to SQLite DB')
@@ -68,19 +171,23 @@ def main():
                         help='Path to save trained model')
     parser.add_argument('--force', action='store_true', help='Force retraining regardless of batch count')
     parser.add_argument('--threshold', type=int, default=30, help='Batch size threshold to trigger retraining')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Cores used to fit trees (-1 = all)')
+    parser.add_argument('--chunk-rows', type=int, default=TRAINING_CHUNK_ROWS, help='Rows read from the database per block')
+    parser.add_argument('--max-rows', type=int, default=None, help='Train on a uniform sample of at most this many rows')
 
-    args = parser.parse_args()
-    trainer = ModelTrainer(args.db, args.model)
+    args = parser.parse_args(argv)
+    trainer = ModelTrainer(args.db, args.model, n_jobs=args.n_jobs, chunk_rows=args.chunk_rows, max_rows=args.max_rows)
     try:
         if args.force:
             info = trainer.train_from_db()
-            print('Forced retrain complete:', info)
         else:
-            result = trainer.retrain_if_needed(batch_threshold=args.threshold)
-            if result is None:
-                print(f'Batch count below threshold ({args.threshold}); no retraining performed.')
-            else:
-                print('Retraining performed:', result)
+            info = trainer.retrain_if_needed(batch_threshold=args.threshold)
+        if trainer.last_status == 'busy':
+            print('Another retrain is in progress; no retraining performed.')
+        elif trainer.last_status == 'below_threshold':
+            print(f'Batch count below threshold ({args.threshold}); no retraining performed.')
+        else:
+            print('Forced retrain complete:' if args.force else 'Retraining performed:', info)
     finally:
         trainer.close()
 
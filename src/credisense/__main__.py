@@ -0,0 +1,21 @@
+import importlib
+import sys
+
+# `python -m credisense <command> [args]`; each command's module is imported only when it runs
+COMMANDS = {
+    "score": "credisense.score",
+    "reports": "credisense.reports",
+    "migrate": "credisense.migrate",
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(f"usage: python -m credisense {{{','.join(COMMANDS)}}} [args]", file=sys.stderr)
+        sys.exit(2)
+    importlib.import_module(COMMANDS[argv[0]]).main(argv[1:])
+
+
+if __name__ == "__main__":
+    main()
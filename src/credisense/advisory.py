@@ -1,38 +1,194 @@
-from typing import List, Dict
+import json
+import os
+from typing import Any, Dict, List, Optional
 
+import numpy as np
+import pandas as pd
+
+# Comparison operators a rule condition may use
+OPS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+# Values computed from input fields, as (inputs, function); rules refer to them like any other field
+DERIVED = {
+    "loan_to_income": (("loan_amount", "income"), lambda c: c["loan_amount"] / (c["income"] + 1)),
+}
+
+# Rules are intentionally simple and transparent. A rule fires when all of its
+# `when` conditions ([field, op, threshold]) hold; messages are returned in
+# table order, or `default` when no rule fires. Missing or empty fields count as
+# `default` in their field spec (0 here), and `aliases` are alternative input names.
+DEFAULT_RULES: Dict[str, Any] = {
+    "fields": {
+        "cibil_score": {"default": 0},
+        "debt_to_income": {"default": 0, "aliases": ["debt_to_income_ratio"]},
+        "missed_emis": {"default": 0, "integer": True},
+        "loan_amount": {"default": 0},
+        "income": {"default": 0},
+    },
+    "rules": [
+        {
+            "id": "cibil_low",
+            "when": [["cibil_score", "<", 650]],
+            "message": "Improve your CIBIL score: pay bills on time and reduce credit utilization.",
+        },
+        {
+            "id": "cibil_fair",
+            "when": [["cibil_score", ">=", 650], ["cibil_score", "<", 700]],
+            "message": "Increase your CIBIL score to 700+ for better offers.",
+        },
+        {
+            "id": "high_dti",
+            "when": [["debt_to_income", ">", 0.4]],
+            "message": "Reduce your debt-to-income ratio by lowering debt or increasing income.",
+        },
+        {
+            "id": "missed_emis",
+            "when": [["missed_emis", ">", 0]],
+            "message": "Clear missed EMIs and maintain consistent repayments to improve risk profile.",
+        },
+        {
+            # EMI burden heuristic
+            "id": "emi_burden",
+            "when": [["income", ">", 0], ["loan_to_income", ">", 0.5]],
+            "message": "Consider reducing requested loan amount to lower EMI burden.",
+        },
+        {
+            # Suggest co-applicant
+            "id": "co_applicant",
+            "when": [["income", "<", 20000], ["loan_amount", ">", 500000]],
+            "message": "Adding a co-applicant with stable income could improve approval odds.",
+        },
+    ],
+    "default": "No major issues detected — maintain current profile and repayment discipline.",
+}
 
-def generate_advice(applicant: Dict) -> List[str]:
-    """Return list of advice strings based on simple rule engine.
 
-    Rules are intentionally simple and transparent.
+class RuleSet:
+    """A rule table compiled for evaluation over whole batches.
+
+    Conditions are checked once per rule as boolean masks over all rows, so
+    the cost per batch is a handful of NumPy comparisons rather than a Python
+    if-chain per applicant.
     """
-    adv = []
-    cibil = float(applicant.get("cibil_score", 0) or 0)
-    dti = float(applicant.get("debt_to_income", 0) or 0)
-    missed = int(applicant.get("missed_emis", 0) or 0)
-    loan_amount = float(applicant.get("loan_amount", 0) or 0)
-    income = float(applicant.get("income", 0) or 0)
 
-    if cibil < 650:
-        adv.append("Improve your CIBIL score: pay bills on time and reduce credit utilization.")
-    elif cibil < 700:
-        adv.append("Increase your CIBIL score to 700+ for better offers.")
+    def __init__(self, table: Dict[str, Any]):
+        self.fields: Dict[str, Dict[str, Any]] = table.get("fields", {})
+        self.default: Optional[str] = table.get("default")
+        self.rules = []
+        for rule in table["rules"]:
+            conditions = []
+            for field, op, threshold in rule["when"]:
+                if op not in OPS:
+                    raise ValueError(f"rule {rule.get('id')!r}: unknown operator {op!r}")
+                if field not in self.fields and field not in DERIVED:
+                    raise ValueError(f"rule {rule.get('id')!r}: unknown field {field!r}")
+                conditions.append((field, OPS[op], float(threshold)))
+            self.rules.append((rule.get("id"), conditions, rule["message"]))
+        self.messages = [message for _, _, message in self.rules]
+        if len(self.rules) > 63:
+            raise ValueError("at most 63 rules are supported")
+        self._by_code: Dict[int, List[str]] = {}
+
+    def _column(self, data, name: str) -> np.ndarray:
+        spec = self.fields[name]
+        default = spec.get("default")
+        default = np.nan if default is None else float(default)
+        names = [name] + list(spec.get("aliases", []))
+        if isinstance(data, pd.DataFrame):
+            values = np.full(len(data), np.nan)
+            # The first name present wins; aliases only fill rows where it is missing
+            for col in (data[k] for k in names if k in data.columns):
+                if pd.api.types.is_numeric_dtype(col):
+                    col = col.to_numpy(dtype=np.float64, na_value=np.nan)
+                else:
+                    col = pd.to_numeric(col.replace("", np.nan), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+                values = np.where(np.isnan(values), col, values)
+        else:
+            raw = [d.get(name) for d in data] if len(names) == 1 else [_pick(d, names) for d in data]
+            try:
+                # Fast path: every value is a number, numeric string or None
+                values = np.array(raw, dtype=np.float64)
+            except (TypeError, ValueError):
+                values = np.fromiter((_number(v) for v in raw), dtype=np.float64, count=len(raw))
+        values = np.where(np.isnan(values), default, values)
+        if spec.get("integer"):
+            values = np.trunc(values)
+        return values
+
+    def masks(self, data) -> np.ndarray:
+        """Return a `(n_rules, n_rows)` boolean array of which rules fire for which rows."""
+        n = len(data)
+        cols: Dict[str, np.ndarray] = {name: self._column(data, name) for name in self.fields}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for name, (inputs, fn) in DERIVED.items():
+                if all(dep in cols for dep in inputs):
+                    cols[name] = fn(cols)
+            out = np.ones((len(self.rules), n), dtype=bool)
+            for i, (_, conditions, _) in enumerate(self.rules):
+                for field, op, threshold in conditions:
+                    out[i] &= op(cols[field], threshold)
+        return out
+
+    def _messages_for(self, code: int) -> List[str]:
+        messages = self._by_code.get(code)
+        if messages is None:
+            messages = [m for i, m in enumerate(self.messages) if code >> i & 1]
+            if not messages and self.default is not None:
+                messages = [self.default]
+            self._by_code[code] = messages
+        return messages
+
+    def evaluate(self, data) -> List[List[str]]:
+        """Return the advice list for every row of `data` (DataFrame or list of dicts)."""
+        fired = self.masks(data)
+        # One integer per row encoding which rules fired; message lists are built once per pattern
+        codes = (fired.astype(np.int64) << np.arange(len(self.rules), dtype=np.int64)[:, None]).sum(axis=0)
+        patterns, row_pattern = np.unique(codes, return_inverse=True)
+        lists = [self._messages_for(code) for code in patterns.tolist()]
+        return [lists[i].copy() for i in row_pattern.tolist()]
 
-    if dti > 0.4:
-        adv.append("Reduce your debt-to-income ratio by lowering debt or increasing income.")
 
-    if missed > 0:
-        adv.append("Clear missed EMIs and maintain consistent repayments to improve risk profile.")
+def _pick(d: Dict, names: List[str]):
+    for k in names:
+        v = d.get(k)
+        if v is not None:
+            return v
+    return None
 
-    # EMI burden heuristic
-    if income > 0 and loan_amount / (income + 1) > 0.5:
-        adv.append("Consider reducing requested loan amount to lower EMI burden.")
 
-    # Suggest co-applicant
-    if income < 20000 and loan_amount > 500000:
-        adv.append("Adding a co-applicant with stable income could improve approval odds.")
+def _number(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
 
-    if not adv:
-        adv.append("No major issues detected — maintain current profile and repayment discipline.")
 
-    return adv
+def load_rules(path: str) -> RuleSet:
+    """Compile a rule table stored as JSON (same layout as `DEFAULT_RULES`)."""
+    with open(path, encoding="utf-8") as f:
+        return RuleSet(json.load(f))
+
+
+# Compiled once per process; CREDISENSE_ADVISORY_RULES points at a JSON table to override
+_rules_path = os.environ.get("CREDISENSE_ADVISORY_RULES")
+RULES = load_rules(_rules_path) if _rules_path else RuleSet(DEFAULT_RULES)
+
+
+def generate_advice_batch(applicants, rules: Optional[RuleSet] = None) -> List[List[str]]:
+    """Return advice for each applicant (DataFrame or list of dicts), in input order."""
+    return (rules or RULES).evaluate(applicants)
+
+
+def generate_advice(applicant: Dict) -> List[str]:
+    """Return list of advice strings based on simple rule engine.
+
+    Thin wrapper over `generate_advice_batch` for a single applicant.
+    """
+    return generate_advice_batch([applicant])[0]
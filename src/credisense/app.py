@@ -1,66 +1,301 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from .preprocessing import preprocess
-from .ml_model import load_model, predict
-from .explainability import explain_model
-from .advisory import generate_advice
-from .database import init_db, insert_applicant, insert_prediction, add_training_record
-from .training import retrain_if_needed
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
+from typing import Any, List, Optional
+from .preprocessing import COLS_OUT, encode_features, preprocess_batch
+from .ml_model import explainable, predict, predict_batch, registry
+from .explainability import explain_batch, explain_model
+from .advisory import generate_advice, generate_advice_batch
+from .database import (
+    MAX_PAGE_SIZE,
+    init_db,
+    insert_applicant,
+    insert_prediction,
+    insert_scored_applicants,
+    add_training_record,
+    get_batch_count,
+    fetch_applicant_predictions,
+    fetch_predictions_page,
+    iter_prediction_records,
+)
+from .jobs import RetrainManager
+from .metrics import metrics
+from .batching import MicroBatcher
+from .persistence import WriteBehindWriter
+from .prediction_cache import PredictionCache, feature_key
+from .reports import ReportService
+from .schemas import Applicant
+import json
 import os
 
 app = FastAPI(title="CrediSense Backend")
 
+# Records needed before /training/add triggers a retrain
+RETRAIN_BATCH_THRESHOLD = 30
 
-class Applicant(BaseModel):
-    income: float = 0
-    loan_amount: float = 0
-    cibil_score: float = 0
-    previous_loans: int = 0
-    missed_emis: int = 0
-    employment_type: str = "salaried"
-    debt_to_income: float = 0
-    age: int = 30
-    dependents: int = 0
+retrain_jobs = RetrainManager()
+
+# Request coalescing for /predict; enabled by setting CREDISENSE_BATCH_WINDOW_MS
+_batch_window = os.environ.get("CREDISENSE_BATCH_WINDOW_MS")
+batcher = (
+    MicroBatcher(window_ms=float(_batch_window), max_batch_size=int(os.environ.get("CREDISENSE_BATCH_MAX_SIZE", "64")))
+    if _batch_window
+    else None
+)
+
+# Write-behind persistence for /predict; CREDISENSE_WRITE_BEHIND=async|sync enables it
+_write_behind = os.environ.get("CREDISENSE_WRITE_BEHIND")
+writer = (
+    WriteBehindWriter(durability=_write_behind, max_queue=int(os.environ.get("CREDISENSE_WRITE_QUEUE_SIZE", "10000")))
+    if _write_behind
+    else None
+)
+
+# Score/explanation cache for repeat applicants; CREDISENSE_PREDICTION_CACHE_MB enables it
+_cache_mb = os.environ.get("CREDISENSE_PREDICTION_CACHE_MB")
+prediction_cache = (
+    PredictionCache(
+        max_bytes=int(float(_cache_mb) * 1024 * 1024),
+        ttl_seconds=float(os.environ.get("CREDISENSE_PREDICTION_CACHE_TTL", "0")) or None,
+        live_version=lambda: registry.version,
+    )
+    if _cache_mb
+    else None
+)
+
+# PDF reports are rendered in worker processes started on first use
+report_service = ReportService(max_workers=int(os.environ.get("CREDISENSE_REPORT_WORKERS", "2")))
+
+# Set once startup (including the warm-up) has finished; reported by /ready
+ready = False
+
+# A typical applicant scored during warm-up; the Applicant defaults fill the rest
+WARMUP_APPLICANT = {"income": 50000, "loan_amount": 200000, "cibil_score": 700}
+
+
+def warm_up():
+    """Load the model and SHAP explainer and score one dummy applicant.
+
+    Runs before readiness is reported so the first real request does not pay
+    for unpickling the model, importing SHAP or building the explainer. Nothing
+    is written to the database or recorded in the metrics and prediction cache.
+    """
+    applicant = Applicant(**WARMUP_APPLICANT)
+    x = encode_features(applicant)
+    model, scorer, version = registry.snapshot()
+    predict(scorer, x)
+    explain_model(explainable(model, scorer), x, feature_names=COLS_OUT, version=version)
+    generate_advice(applicant.dict())
+    return version
 
 
 @app.on_event("startup")
 def startup():
+    global ready
     # Ensure DB exists
     init_db()
+    if os.environ.get("CREDISENSE_WARMUP", "1") != "0":
+        warm_up()
+    ready = True
+
+
+@app.on_event("shutdown")
+def shutdown():
+    if batcher is not None:
+        batcher.close()
+    if writer is not None:
+        writer.close()
+    retrain_jobs.shutdown(wait=True)
+    report_service.shutdown(wait=True)
 
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    _, version = registry.get_with_version()
+    return {"status": "ok", "model_version": version}
+
+
+@app.get("/ready")
+def readiness():
+    # Liveness is /health; this only turns 200 once the warm-up has run
+    if not ready:
+        raise HTTPException(status_code=503, detail="Warming up")
+    return {"status": "ready", "model_version": registry.version}
+
+
+@app.get("/batching/stats")
+def batching_stats():
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+
+@app.get("/write-behind/stats")
+def write_behind_stats():
+    if writer is None:
+        return {"enabled": False}
+    return {"enabled": True, **writer.stats()}
+
+
+@app.get("/prediction-cache/stats")
+def prediction_cache_stats():
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
 
 
 @app.post("/predict")
 def predict_endpoint(applicant: Applicant):
     app_dict = applicant.dict()
-    # store applicant
-    aid = insert_applicant(app_dict)
+    # store applicant (deferred to the write-behind queue when enabled)
+    if writer is None:
+        with metrics.time("predict", "db_insert"):
+            aid = insert_applicant(app_dict)
 
-    X = preprocess(app_dict)
-    model = load_model()
-    label, proba = predict(model, X.values[0])
-    shap_summary = explain_model(model, X, feature_names=X.columns.tolist())
-    advice = generate_advice(app_dict)
+    with metrics.time("predict", "preprocess"):
+        x = encode_features(applicant)
+    with metrics.time("predict", "model_load"):
+        model, scorer, version = registry.snapshot()
+    key = feature_key(x) if prediction_cache is not None else None
+    cached = prediction_cache.get(key, version) if key is not None else None
+    if cached is None:
+        with metrics.time("predict", "inference"):
+            label, proba = batcher.submit(scorer, x) if batcher is not None else predict(scorer, x)
+        with metrics.time("predict", "explain"):
+            shap_summary = explain_model(explainable(model, scorer), x, feature_names=COLS_OUT, version=version)
+        if key is not None:
+            prediction_cache.put(key, version, (label, proba, shap_summary))
+    else:
+        label, proba, shap_summary = cached
+    with metrics.time("predict", "advice"):
+        advice = generate_advice(app_dict)
 
-    insert_prediction(aid, label, proba, shap_summary)
+    with metrics.time("predict", "db_write"):
+        if writer is None:
+            insert_prediction(aid, label, proba, shap_summary)
+        else:
+            writer.record(app_dict, label, proba, shap_summary)
 
     return {"label": label, "probability": proba, "shap": shap_summary, "advice": advice}
 
 
+@app.post("/predict/batch")
+def predict_batch_endpoint(applicants: List[Any]):
+    """Score many applicants in one pass.
+
+    Each item is validated independently; invalid items get an `error` entry
+    and do not affect the rest. Results are returned in input order.
+    """
+    results: List[Any] = [None] * len(applicants)
+    valid = []
+    for i, item in enumerate(applicants):
+        try:
+            valid.append((i, Applicant.parse_obj(item).dict()))
+        except ValidationError as e:
+            results[i] = {"error": json.loads(e.json())}
+
+    if valid:
+        app_dicts = [d for _, d in valid]
+        with metrics.time("predict_batch", "preprocess"):
+            X = preprocess_batch(app_dicts)
+        with metrics.time("predict_batch", "model_load"):
+            model, scorer, version = registry.snapshot()
+        keys = [feature_key(row) for row in X.values] if prediction_cache is not None else None
+        scored = [prediction_cache.get(k, version) for k in keys] if keys is not None else [None] * len(X)
+        # Only rows missing from the cache go through the model and SHAP
+        missing = [j for j, hit in enumerate(scored) if hit is None]
+        if missing:
+            X_miss = X.iloc[missing]
+            with metrics.time("predict_batch", "inference"):
+                fresh = predict_batch(scorer, X_miss.values)
+            with metrics.time("predict_batch", "explain"):
+                fresh_shap = explain_batch(explainable(model, scorer), X_miss, feature_names=COLS_OUT, version=version)
+            for j, (label, proba), shap in zip(missing, fresh, fresh_shap):
+                scored[j] = (label, proba, shap)
+                if keys is not None:
+                    prediction_cache.put(keys[j], version, scored[j])
+        with metrics.time("predict_batch", "advice"):
+            advice = generate_advice_batch(app_dicts)
+
+        with metrics.time("predict_batch", "db_write"):
+            insert_scored_applicants((d, label, proba, shap) for d, (label, proba, shap) in zip(app_dicts, scored))
+
+        for (i, _), (label, proba, shap), adv in zip(valid, scored, advice):
+            results[i] = {"label": label, "probability": proba, "shap": shap, "advice": adv}
+
+    return {"results": results}
+
+
 @app.post("/training/add")
 def add_training(applicant: dict):
-    # Add a training record (raw payload) and trigger retraining if threshold reached
-    add_training_record(applicant)
-    retrained = retrain_if_needed()
-    return {"accepted": True, "retrained": retrained}
+    # Add a training record (raw payload); retraining runs in the background once the threshold is reached
+    with metrics.time("training_add", "db_insert"):
+        add_training_record(applicant)
+    metrics.inc("credisense_records_ingested", help="Training records added through /training/add")
+    job = None
+    if get_batch_count() >= RETRAIN_BATCH_THRESHOLD:
+        job = retrain_jobs.submit(batch_threshold=RETRAIN_BATCH_THRESHOLD)
+    return {"accepted": True, "retrain_job": job.id if job is not None else None}
 
 
 @app.post("/retrain/force")
 def retrain_force():
     # Force retrain regardless of batch count
-    did = retrain_if_needed(batch_threshold=0)
-    return {"retrained": did}
+    job = retrain_jobs.submit(batch_threshold=0)
+    return {"job_id": job.id, "state": job.state}
+
+
+@app.get("/retrain/jobs/{job_id}")
+def retrain_job_status(job_id: int):
+    job = retrain_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown retrain job")
+    return job.to_dict()
+
+
+@app.get("/reports/{prediction_id}")
+def prediction_report(prediction_id: int):
+    path = report_service.report_for_prediction(prediction_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Unknown prediction")
+    return FileResponse(path, media_type="application/pdf", filename=f"report-{prediction_id}.pdf")
+
+
+@app.get("/metrics")
+def metrics_endpoint():
+    # Prometheus scrape target: per-stage latency histograms, counters and the serving model version
+    metrics.set_info("credisense_model", help="Model version currently served", version=registry.version or "")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/applicants/{applicant_id}/predictions")
+def applicant_predictions(applicant_id: int, after: int = 0, limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE)):
+    # Pass `next_after` back as `after` to get the following page
+    items, next_after = fetch_applicant_predictions(applicant_id, after_id=after, limit=limit)
+    return {"items": items, "next_after": next_after}
+
+
+@app.get("/predictions")
+def predictions_page(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Predictions with `start <= created_at < end`, oldest first; pass `next_cursor` back as `cursor`."""
+    try:
+        items, next_cursor = fetch_predictions_page(start, end, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@app.get("/predictions/export")
+def export_predictions(start: Optional[str] = None, end: Optional[str] = None):
+    """Stream every prediction in the window as NDJSON, one keyset page at a time."""
+
+    def lines():
+        for records in iter_prediction_records(start, end, chunk_rows=MAX_PAGE_SIZE):
+            yield "".join(json.dumps(r, default=str) + "\n" for r in records)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,123 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .ml_model import predict_batch
+
+# Upper bounds of the batch-size histogram buckets
+_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-applicant predictions into one model call.
+
+    Forest inference has a fixed per-call cost that dwarfs the per-row cost, so
+    requests arriving together are stacked into one matrix and scored with a
+    single `predict_batch`. A background thread takes the first queued request,
+    then keeps collecting until `window_ms` has passed since that request was
+    queued or `max_batch_size` rows are collected. With `window_ms=0` it only
+    drains what is already queued and never adds latency.
+    """
+
+    def __init__(self, window_ms: float = 2.0, max_batch_size: int = 64, predict_fn=predict_batch):
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self._predict = predict_fn
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._size_hist = [0] * (len(_SIZE_BUCKETS) + 1)
+        self._wait_sum = 0.0
+        self._wait_max = 0.0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    t = threading.Thread(target=self._run, name="credisense-microbatch", daemon=True)
+                    t.start()
+                    self._thread = t
+
+    def submit(self, model, x) -> Tuple[str, float]:
+        """Queue one feature row for `model` and block until its `(label, probability)` is ready."""
+        self._ensure_started()
+        fut: Future = Future()
+        self._queue.put((model, np.asarray(x, dtype=np.float64).ravel(), time.perf_counter(), fut))
+        return fut.result()
+
+    def close(self):
+        """Stop the worker after it has answered everything already queued."""
+        t = self._thread
+        if t is not None:
+            self._queue.put(None)
+            t.join()
+            self._thread = None
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = first[2] + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Any]):
+        started = time.perf_counter()
+        # group by model object so a hot reload inside the window never mixes models
+        groups: Dict[int, List[Any]] = {}
+        for item in batch:
+            groups.setdefault(id(item[0]), []).append(item)
+        for items in groups.values():
+            try:
+                results = self._predict(items[0][0], np.vstack([it[1] for it in items]))
+            except Exception as e:
+                for it in items:
+                    it[3].set_exception(e)
+                continue
+            for it, res in zip(items, results):
+                it[3].set_result(res)
+
+        waits = [started - it[2] for it in batch]
+        size = len(batch)
+        bucket = next((i for i, ub in enumerate(_SIZE_BUCKETS) if size <= ub), len(_SIZE_BUCKETS))
+        with self._stats_lock:
+            self._batches += 1
+            self._items += size
+            self._size_hist[bucket] += 1
+            self._wait_sum += sum(waits)
+            self._wait_max = max(self._wait_max, max(waits))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batch-size and queue-wait statistics since start."""
+        with self._stats_lock:
+            labels = [str(ub) for ub in _SIZE_BUCKETS] + ["+Inf"]
+            return {
+                "window_ms": self.window * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+                "batch_size_histogram": dict(zip(labels, self._size_hist)),
+                "mean_queue_wait_ms": 1000.0 * self._wait_sum / self._items if self._items else 0.0,
+                "max_queue_wait_ms": 1000.0 * self._wait_max,
+            }
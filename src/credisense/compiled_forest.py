@@ -0,0 +1,352 @@
+import io
+import os
+import struct
+import zipfile
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Bump when the on-disk layout changes; older files are ignored and recompiled
+FORMAT_VERSION = 2
+
+
+# Array data in the npz starts on this boundary so memory-mapped arrays are aligned
+_ALIGN = 64
+# Arrays smaller than this are read into memory rather than mapped
+_MMAP_MIN_BYTES = 4096
+
+
+def compiled_path(model_path: str) -> str:
+    """Location of the compiled arrays exported next to a pickled model."""
+    root, _ = os.path.splitext(model_path)
+    return root + ".forest.npz"
+
+
+def _ordered(x: np.ndarray) -> np.ndarray:
+    """Map float64 values to int64 keys with the same ordering."""
+    bits = x.view(np.int64)
+    return np.where(bits < 0, -(bits & np.int64(0x7FFFFFFFFFFFFFFF)), bits)
+
+
+def _unordered(keys: np.ndarray) -> np.ndarray:
+    bits = np.where(keys < 0, (-keys) | np.int64(-0x8000000000000000), keys)
+    return bits.astype(np.int64).view(np.float64)
+
+
+def _fold_thresholds(threshold: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Return raw-input thresholds equivalent to sklearn's scaled float32 test.
+
+    A fitted tree sends a row left when `float32((x - mean) / scale) <= t`.
+    That test is monotone in `x`, so it equals `x <= c` where `c` is the largest
+    float64 for which it holds; `c` is found by bisecting over the ordered bit
+    patterns of float64, which keeps the compiled forest bit-exact with sklearn
+    even at split boundaries.
+    """
+    def goes_left(x):
+        with np.errstate(over="ignore", invalid="ignore"):
+            return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    lo = np.full(threshold.shape, _ordered(np.array(-np.inf))[()], dtype=np.int64)
+    hi = np.full(threshold.shape, _ordered(np.array(np.inf))[()], dtype=np.int64)
+    # Invariant: goes_left(lo) is True (-inf) and goes_left(hi) is False (+inf)
+    for _ in range(64):
+        mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+        left = goes_left(_unordered(mid))
+        lo = np.where(left, mid, lo)
+        hi = np.where(left, hi, mid)
+    return _unordered(lo)
+
+
+class CompiledForest:
+    """A random forest flattened into contiguous arrays.
+
+    All trees share one node table: `feature`, `threshold`, `left` and `right`
+    index into it and `roots` holds each tree's first node. Leaves point to
+    themselves, so `predict_proba` walks every row through every tree with a
+    fixed number (`depth`) of vectorized steps. `value` holds per-node class
+    probabilities, averaged over trees like `RandomForestClassifier`.
+    Thresholds apply to unscaled features (any StandardScaler is folded in).
+
+    `shap` holds the same trees in the dense per-tree layout of SHAP's
+    TreeExplainer (see `_shap_layout`), so explanations can run on the mapped
+    file too instead of on a private copy of the sklearn forest.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, n_features: int, depth: int, shap=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features)
+        self.depth = int(depth)
+        self.shap: Dict[str, np.ndarray] = shap or {}
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the compiled forest expects {self.n_features_in_}")
+        node = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        for _ in range(self.depth):
+            go_left = np.take_along_axis(X, self.feature[node], axis=1) <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        proba = self.value[node[:, 0]].copy()
+        for t in range(1, self.n_trees):
+            proba += self.value[node[:, t]]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, path: str, source_stamp: Optional[Tuple[int, int]] = None):
+        """Write the arrays to `path` (npz), replacing any existing file atomically.
+
+        The npz is uncompressed and every array's data is 64-byte aligned in
+        the file, so `load` can map it instead of reading it.
+        """
+        buf = io.BytesIO()
+        _save_aligned_npz(
+            buf,
+            format_version=np.int64(FORMAT_VERSION),
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            classes=self.classes_,
+            meta=np.array([self.n_features_in_, self.depth], dtype=np.int64),
+            source_stamp=np.array(source_stamp if source_stamp is not None else (-1, -1), dtype=np.int64),
+            **{"shap_" + k: v for k, v in self.shap.items()},
+        )
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(buf.getvalue())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = "r") -> Tuple["CompiledForest", Optional[Tuple[int, int]]]:
+        """Return `(forest, source_stamp)` read from `path`.
+
+        With `mmap_mode="r"` the node arrays are mapped read-only, so every
+        process scoring with the same file shares one copy in the page cache.
+        `mmap_mode=None` reads them into private memory.
+        """
+        data = _map_npz(path) if mmap_mode else _read_npz(path)
+        if int(data["format_version"]) != FORMAT_VERSION:
+            raise ValueError(f"unsupported compiled forest format in {path}")
+        n_features, depth = (int(v) for v in data["meta"])
+        forest = cls(
+            data["feature"], data["threshold"], data["left"], data["right"],
+            data["value"], data["roots"], data["classes"], n_features, depth,
+            {k[5:]: v for k, v in data.items() if k.startswith("shap_")},
+        )
+        stamp = tuple(int(v) for v in data["source_stamp"])
+        return forest, (stamp if stamp != (-1, -1) else None)
+
+
+def _save_aligned_npz(f, **arrays: np.ndarray):
+    # Like np.savez, but each member's local header is padded with an extra
+    # field so the .npy stream (whose header is itself padded to 64 bytes) and
+    # therefore the array data start on an _ALIGN boundary.
+    with zipfile.ZipFile(f, "w", zipfile.ZIP_STORED) as zf:
+        for name, arr in arrays.items():
+            npy = io.BytesIO()
+            np.lib.format.write_array(npy, np.asanyarray(arr), allow_pickle=False)
+            info = zipfile.ZipInfo(name + ".npy", date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_STORED
+            fixed = 30 + len(info.filename.encode())
+            pad = -(f.tell() + fixed) % _ALIGN
+            if pad < 4:
+                pad += _ALIGN
+            info.extra = struct.pack("<HH", 0xA11E, pad - 4) + bytes(pad - 4)
+            zf.writestr(info, npy.getvalue())
+
+
+def _read_npz(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as data:
+        return {k: data[k] for k in data.files}
+
+
+def _map_npz(path: str) -> Dict[str, np.ndarray]:
+    """Map each array of an uncompressed npz read-only (small arrays are read)."""
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                return _read_npz(path)
+            f.seek(info.header_offset)
+            local = f.read(30)
+            if local[:4] != b"PK\x03\x04":
+                raise ValueError(f"corrupt compiled forest {path}")
+            name_len, extra_len = struct.unpack("<HH", local[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+            shape, fortran, dtype = read_header(f)
+            if dtype.hasobject:
+                raise ValueError(f"object arrays in compiled forest {path}")
+            order = "F" if fortran else "C"
+            nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+            key = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if nbytes < _MMAP_MIN_BYTES:
+                arrays[key] = np.frombuffer(f.read(nbytes), dtype=dtype).reshape(shape, order=order).copy()
+            else:
+                mapped = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape, order=order)
+                arrays[key] = mapped.view(np.ndarray)
+    return arrays
+
+
+def compile_model(model: Any) -> Optional[CompiledForest]:
+    """Compile a fitted RandomForestClassifier (optionally behind a StandardScaler).
+
+    Returns None for any other model, which callers should score with sklearn.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = None
+    clf = model
+    if isinstance(model, Pipeline):
+        steps = [est for _, est in model.steps if est is not None and est != "passthrough"]
+        if len(steps) == 2 and isinstance(steps[0], StandardScaler):
+            scaler, clf = steps
+        elif len(steps) == 1:
+            clf = steps[0]
+        else:
+            return None
+    if not isinstance(clf, RandomForestClassifier) or not hasattr(clf, "estimators_"):
+        return None
+    if getattr(clf, "n_outputs_", 1) != 1:
+        return None
+
+    n_features = clf.n_features_in_
+    mean = np.zeros(n_features)
+    scale = np.ones(n_features)
+    if scaler is not None:
+        # mean_ is fitted even with with_mean=False, but transform() does not subtract it
+        if scaler.with_mean and getattr(scaler, "mean_", None) is not None:
+            mean = np.asarray(scaler.mean_, dtype=np.float64)
+        if scaler.with_std and getattr(scaler, "scale_", None) is not None:
+            scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+    features, thresholds, lefts, rights, values, roots, shap_trees = [], [], [], [], [], [], []
+    offset, depth = 0, 0
+    for est in clf.estimators_:
+        tree = est.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        own = np.arange(offset, offset + n)
+        feat = np.where(is_leaf, 0, tree.feature)
+        raw_thr = np.where(is_leaf, np.inf, tree.threshold)
+        thr = np.full(n, np.inf)
+        split = ~is_leaf
+        thr[split] = _fold_thresholds(raw_thr[split], mean[feat[split]], scale[feat[split]])
+        # Same normalisation as DecisionTreeClassifier.predict_proba
+        val = tree.value[:, 0, :].astype(np.float64)
+        norm = val.sum(axis=1, keepdims=True)
+        norm[norm == 0.0] = 1.0
+        features.append(feat)
+        thresholds.append(thr)
+        lefts.append(np.where(is_leaf, own, tree.children_left + offset))
+        rights.append(np.where(is_leaf, own, tree.children_right + offset))
+        prob = val / norm
+        values.append(prob)
+        shap_trees.append((tree, thr, prob))
+        roots.append(offset)
+        offset += n
+        depth = max(depth, tree.max_depth)
+
+    return CompiledForest(
+        np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+        np.ascontiguousarray(np.concatenate(thresholds)),
+        np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+        np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+        np.ascontiguousarray(np.concatenate(values)),
+        np.asarray(roots, dtype=np.intp),
+        np.asarray(clf.classes_),
+        n_features,
+        depth,
+        _shap_layout(shap_trees, depth),
+    )
+
+
+def _shap_layout(trees, depth: int) -> Dict[str, np.ndarray]:
+    """Dense `(trees, max_nodes)` arrays as SHAP's TreeEnsemble builds them for a forest.
+
+    Takes `(sklearn tree, folded thresholds, normalised values)` per tree. Values
+    are scaled by 1/trees (the forest averages), unused slots are -1/0 as in
+    SHAP, and thresholds are the folded raw-input ones (tree-path-dependent
+    SHAP only depends on which rows reach which node, so attributions equal
+    those of the scaled sklearn pipeline).
+    """
+    n_trees = len(trees)
+    max_nodes = max(t.node_count for t, _, _ in trees)
+    n_outputs = trees[0][2].shape[1]
+    out = {
+        "children_left": np.full((n_trees, max_nodes), -1, dtype=np.int32),
+        "children_right": np.full((n_trees, max_nodes), -1, dtype=np.int32),
+        "children_default": np.full((n_trees, max_nodes), -1, dtype=np.int32),
+        "features": np.full((n_trees, max_nodes), -1, dtype=np.int32),
+        "thresholds": np.zeros((n_trees, max_nodes)),
+        "threshold_types": np.zeros((n_trees, max_nodes), dtype=np.int32),
+        "values": np.zeros((n_trees, max_nodes, n_outputs)),
+        "node_sample_weight": np.zeros((n_trees, max_nodes)),
+        "num_nodes": np.array([t.node_count for t, _, _ in trees], dtype=np.int32),
+        "max_depth": np.array(depth, dtype=np.int64),
+    }
+    for i, (tree, thr, val) in enumerate(trees):
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        out["children_left"][i, :n] = tree.children_left
+        out["children_right"][i, :n] = tree.children_right
+        default = tree.children_left
+        if hasattr(tree, "missing_go_to_left"):
+            default = np.where(tree.missing_go_to_left, tree.children_left, tree.children_right)
+        out["children_default"][i, :n] = default
+        out["features"][i, :n] = tree.feature
+        out["thresholds"][i, :n] = np.where(is_leaf, tree.threshold, thr)
+        out["values"][i, :n] = val / n_trees
+        out["node_sample_weight"][i, :n] = tree.weighted_n_node_samples
+    return out
+
+
+def export_compiled(model: Any, model_path: str) -> Optional[str]:
+    """Compile `model` and save it next to `model_path`; return the path written.
+
+    The pickled model's current mtime/size is stored so loaders can tell the
+    export belongs to that artifact. Unsupported models remove any stale export.
+    """
+    out = compiled_path(model_path)
+    forest = compile_model(model)
+    if forest is None:
+        if os.path.exists(out):
+            os.remove(out)
+        return None
+    st = os.stat(model_path)
+    forest.save(out, source_stamp=(st.st_mtime_ns, st.st_size))
+    return out
+
+
+def load_compiled(
+    model_path: str, expected_stamp: Optional[Tuple[int, int]] = None, mmap_mode: Optional[str] = "r"
+) -> Optional[CompiledForest]:
+    """Load the export for `model_path` (mapped read-only by default), or None if missing, unreadable or stale."""
+    path = compiled_path(model_path)
+    try:
+        forest, stamp = CompiledForest.load(path, mmap_mode=mmap_mode)
+    except (OSError, ValueError, KeyError):
+        return None
+    if expected_stamp is not None and stamp != tuple(expected_stamp):
+        return None
+    return forest
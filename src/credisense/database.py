@@ -1,132 +1,529 @@
+import base64
+import binascii
 import sqlite3
 import os
 import json
-from typing import Optional, Dict, Any
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
+import numpy as np
 
 DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "credisense.db"))
 
+# Pragmas applied to every pooled connection. WAL lets readers run alongside the
+# writer and, with synchronous=NORMAL, commits no longer fsync on every insert
+# (the WAL is synced at checkpoints instead).
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
 
-def _ensure_db_dir():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+# Size of sqlite3's per-connection prepared statement cache
+STATEMENT_CACHE_SIZE = 256
 
+# Typed applicant columns shared by `applicants` and `training_data`; fields not
+# listed here are kept as a JSON object in the `extra` column.
+APPLICANT_COLUMNS = (
+    ("income", "REAL"),
+    ("loan_amount", "REAL"),
+    ("cibil_score", "REAL"),
+    ("previous_loans", "INTEGER"),
+    ("missed_emis", "INTEGER"),
+    ("employment_type", "TEXT"),
+    ("debt_to_income", "REAL"),
+    ("age", "INTEGER"),
+    ("dependents", "INTEGER"),
+)
+APPLICANT_FIELDS = tuple(name for name, _ in APPLICANT_COLUMNS)
+NUMERIC_FIELDS = tuple(name for name, kind in APPLICANT_COLUMNS if kind != "TEXT")
+_FIELD_SQL = ", ".join(APPLICANT_FIELDS)
 
-def init_db(db_path: Optional[str] = None):
+# Created by init_db; each matches the ORDER BY of a paginated query below
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_predictions_applicant ON predictions (applicant_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_predictions_created ON predictions (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_applicants_created ON applicants (created_at, id)",
+)
+
+# Largest page the paginated queries return
+MAX_PAGE_SIZE = 1000
+
+_local = threading.local()
+_initialized = set()
+_init_lock = threading.Lock()
+
+
+def _ensure_db_dir(db: Optional[str] = None):
+    db = db or DB_PATH
+    if db != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(db)), exist_ok=True)
+
+
+def _connect(db: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db, cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def get_connection(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """Return this thread's persistent connection to `db_path`.
+
+    Connections are opened once per thread and database and reused, so the
+    pragmas and prepared statements survive across calls. A forked child
+    process gets fresh connections.
+    """
     db = db_path or DB_PATH
-    _ensure_db_dir()
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS applicants (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            payload TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS predictions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            applicant_id INTEGER,
-            label TEXT,
-            probability REAL,
-            shap_summary TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
+    pid = os.getpid()
+    if getattr(_local, "pid", None) != pid:
+        _local.pid = pid
+        _local.conns = {}
+        _local.depth = {}
+    conn = _local.conns.get(db)
+    if conn is None:
+        conn = _connect(db)
+        _local.conns[db] = conn
+    return conn
+
+
+def close_connections():
+    """Close the calling thread's pooled connections."""
+    conns = getattr(_local, "conns", None) or {}
+    for conn in conns.values():
+        try:
+            conn.close()
+        except Exception:
+            pass
+    conns.clear()
+
+
+@contextmanager
+def transaction(db_path: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+    """Run several statements in one transaction on the pooled connection.
+
+    Commits when the outermost block exits normally and rolls back on error;
+    nested blocks join the enclosing transaction.
+    """
+    db = db_path or DB_PATH
+    conn = get_connection(db)
+    depth = _local.depth.get(db, 0)
+    _local.depth[db] = depth + 1
+    try:
+        yield conn
+        if depth == 0:
+            conn.commit()
+    except BaseException:
+        if depth == 0:
+            conn.rollback()
+        raise
+    finally:
+        _local.depth[db] = depth
+
+
+def _typed_table_sql(table: str, with_label: bool = False) -> str:
+    cols = ",\n".join(f"    {name} {kind}" for name, kind in APPLICANT_COLUMNS)
+    label = "    label INTEGER,\n" if with_label else ""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table} (\n"
+        "    id INTEGER PRIMARY KEY AUTOINCREMENT,\n"
+        f"{cols},\n"
+        f"{label}"
+        "    extra TEXT,\n"
+        "    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP\n"
+        ")"
     )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS training_data (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            payload TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def migrate_db(db_path: Optional[str] = None) -> Dict[str, int]:
+    """Convert legacy JSON `payload` tables to the typed column schema.
+
+    `applicants` and `training_data` tables that still have a `payload` column
+    are rebuilt in one transaction: known fields are extracted into their typed
+    columns with SQLite's JSON functions, remaining keys go to `extra`, and ids
+    and timestamps are preserved. Returns the number of rows migrated per table;
+    tables already in the typed schema are skipped.
+    """
+    db = db_path or DB_PATH
+    migrated = {}
+    with transaction(db) as conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        for table, with_label in (("applicants", False), ("training_data", True)):
+            if "payload" not in _table_columns(conn, table):
+                continue
+            fields = APPLICANT_FIELDS + (("label",) if with_label else ())
+            extracts = ", ".join(f"CASE WHEN json_valid(payload) THEN json_extract(payload, '$.{f}') END" for f in fields)
+            paths = ", ".join(f"'$.{f}'" for f in fields)
+            legacy = f"{table}_legacy"
+            conn.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+            conn.execute(_typed_table_sql(table, with_label))
+            cur = conn.execute(
+                f"INSERT INTO {table} (id, {', '.join(fields)}, extra, created_at) "
+                f"SELECT id, {extracts}, "
+                f"CASE WHEN json_valid(payload) THEN NULLIF(json_remove(payload, {paths}), '{{}}') ELSE payload END, "
+                f"created_at FROM {legacy} ORDER BY id"
+            )
+            migrated[table] = cur.rowcount
+            conn.execute(f"DROP TABLE {legacy}")
+    return migrated
+
+
+def init_db(db_path: Optional[str] = None):
+    db = db_path or DB_PATH
+    # Schema creation only needs to happen once per process and database file
+    if db != ":memory:" and db in _initialized and os.path.exists(db):
+        return
+    _ensure_db_dir(db)
+    with _init_lock:
+        migrate_db(db)
+        _create_tables(db)
+    _initialized.add(db)
+
+
+def _create_tables(db: str):
+    with transaction(db) as conn:
+        cur = conn.cursor()
+        cur.execute(_typed_table_sql("applicants"))
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS predictions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                applicant_id INTEGER,
+                label TEXT,
+                probability REAL,
+                shap_summary TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
         )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS batch_tracker (
-            id INTEGER PRIMARY KEY CHECK (id = 1),
-            count INTEGER DEFAULT 0
+        cur.execute(_typed_table_sql("training_data", with_label=True))
+        # Keyset pagination of history and time-window queries walks these in order
+        for sql in INDEXES:
+            cur.execute(sql)
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS batch_tracker (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                count INTEGER DEFAULT 0
+            )
+            """
         )
-        """
-    )
-    # ensure a single row in batch_tracker
-    cur.execute("INSERT OR IGNORE INTO batch_tracker (id, count) VALUES (1, 0)")
-
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS retraining_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            num_records INTEGER,
-            model_version TEXT
+        # ensure a single row in batch_tracker
+        cur.execute("INSERT OR IGNORE INTO batch_tracker (id, count) VALUES (1, 0)")
+
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS retraining_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                num_records INTEGER,
+                model_version TEXT,
+                mode TEXT,
+                wall_seconds REAL,
+                trees_added INTEGER
+            )
+            """
         )
-        """
-    )
+        # columns added after the first release of the table
+        existing = _table_columns(conn, "retraining_logs")
+        for col, kind in (("mode", "TEXT"), ("wall_seconds", "REAL"), ("trees_added", "INTEGER")):
+            if col not in existing:
+                cur.execute(f"ALTER TABLE retraining_logs ADD COLUMN {col} {kind}")
+
+
+def _column_value(v):
+    # SQLite cannot bind containers; keep them as JSON text like the old payload did
+    if v is None or isinstance(v, (int, float, str)):
+        return v
+    return json.dumps(v)
+
+
+def applicant_row(payload: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Split a payload into typed column values followed by the `extra` JSON (or None)."""
+    values = tuple(_column_value(payload.get(f)) for f in APPLICANT_FIELDS)
+    extra = {k: v for k, v in payload.items() if k not in APPLICANT_FIELDS}
+    return values + (json.dumps(extra) if extra else None,)
+
 
-    conn.commit()
-    conn.close()
+def row_to_payload(values: Iterable[Any], extra: Optional[str]) -> Dict[str, Any]:
+    """Rebuild a payload dict from typed column values (in `APPLICANT_FIELDS` order) and `extra`."""
+    payload = {f: v for f, v in zip(APPLICANT_FIELDS, values) if v is not None}
+    if extra:
+        try:
+            payload.update(json.loads(extra))
+        except ValueError:
+            payload["extra"] = extra
+    return payload
+
+
+_INSERT_APPLICANT = f"INSERT INTO applicants ({_FIELD_SQL}, extra) VALUES ({', '.join('?' * (len(APPLICANT_FIELDS) + 1))})"
+_INSERT_APPLICANT_WITH_ID = f"INSERT INTO applicants (id, {_FIELD_SQL}, extra) VALUES ({', '.join('?' * (len(APPLICANT_FIELDS) + 2))})"
+_INSERT_TRAINING = f"INSERT INTO training_data ({_FIELD_SQL}, label, extra) VALUES ({', '.join('?' * (len(APPLICANT_FIELDS) + 2))})"
 
 
 def insert_applicant(payload: Dict[str, Any], db_path: Optional[str] = None) -> int:
-    db = db_path or DB_PATH
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute("INSERT INTO applicants (payload) VALUES (?)", (json.dumps(payload),))
-    id_ = cur.lastrowid
-    conn.commit()
-    conn.close()
-    return id_
+    with transaction(db_path) as conn:
+        cur = conn.execute(_INSERT_APPLICANT, applicant_row(payload))
+        return cur.lastrowid
 
 
 def insert_prediction(applicant_id: int, label: str, prob: float, shap_summary: Dict, db_path: Optional[str] = None):
-    db = db_path or DB_PATH
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO predictions (applicant_id, label, probability, shap_summary) VALUES (?, ?, ?, ?)",
-        (applicant_id, label, float(prob), json.dumps(shap_summary)),
-    )
-    conn.commit()
-    conn.close()
+    with transaction(db_path) as conn:
+        conn.execute(
+            "INSERT INTO predictions (applicant_id, label, probability, shap_summary) VALUES (?, ?, ?, ?)",
+            (applicant_id, label, float(prob), json.dumps(shap_summary)),
+        )
+
+
+def insert_scored_applicants(records: Iterable[Tuple[Dict[str, Any], str, float, Dict]], db_path: Optional[str] = None) -> List[int]:
+    """Insert applicants and their predictions in a single transaction.
+
+    `records` yields `(payload, label, prob, shap_summary)` tuples. Returns the
+    new applicant ids in input order.
+    """
+    ids = []
+    with transaction(db_path) as conn:
+        cur = conn.cursor()
+        for payload, label, prob, shap_summary in records:
+            cur.execute(_INSERT_APPLICANT, applicant_row(payload))
+            aid = cur.lastrowid
+            cur.execute(
+                "INSERT INTO predictions (applicant_id, label, probability, shap_summary) VALUES (?, ?, ?, ?)",
+                (aid, label, float(prob), json.dumps(shap_summary)),
+            )
+            ids.append(aid)
+    return ids
 
 
 def add_training_record(payload: Dict[str, Any], db_path: Optional[str] = None):
-    db = db_path or DB_PATH
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute("INSERT INTO training_data (payload) VALUES (?)", (json.dumps(payload),))
-    cur.execute("UPDATE batch_tracker SET count = count + 1 WHERE id = 1")
-    conn.commit()
-    conn.close()
+    row = applicant_row({k: v for k, v in payload.items() if k != "label"})
+    with transaction(db_path) as conn:
+        conn.execute(_INSERT_TRAINING, row[:-1] + (_column_value(payload.get("label")), row[-1]))
+        conn.execute("UPDATE batch_tracker SET count = count + 1 WHERE id = 1")
 
 
 def get_batch_count(db_path: Optional[str] = None) -> int:
-    db = db_path or DB_PATH
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute("SELECT count FROM batch_tracker WHERE id = 1")
-    row = cur.fetchone()
-    conn.close()
+    row = get_connection(db_path).execute("SELECT count FROM batch_tracker WHERE id = 1").fetchone()
     return int(row[0]) if row else 0
 
 
 def reset_batch_count(db_path: Optional[str] = None):
-    db = db_path or DB_PATH
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute("UPDATE batch_tracker SET count = 0 WHERE id = 1")
-    conn.commit()
-    conn.close()
+    with transaction(db_path) as conn:
+        conn.execute("UPDATE batch_tracker SET count = 0 WHERE id = 1")
 
 
-def log_retraining(num_records: int, model_version: str = "unknown", db_path: Optional[str] = None):
-    db = db_path or DB_PATH
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute("INSERT INTO retraining_logs (num_records, model_version) VALUES (?, ?)", (num_records, model_version))
-    conn.commit()
-    conn.close()
+def claim_batch(batch_threshold: int, db_path: Optional[str] = None) -> Optional[int]:
+    """Take the pending record count and reset it to 0 if it reached `batch_threshold`.
+
+    Read and reset happen in one write transaction, so when several processes
+    race past the threshold exactly one of them gets the batch; the others
+    get None. Records added after the claim count towards the next batch.
+    """
+    with transaction(db_path) as conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT count FROM batch_tracker WHERE id = 1").fetchone()
+        count = int(row[0]) if row else 0
+        if count < batch_threshold:
+            return None
+        conn.execute("UPDATE batch_tracker SET count = 0 WHERE id = 1")
+    return count
+
+
+def release_batch(count: int, db_path: Optional[str] = None):
+    """Give back a claimed count (e.g. when the retrain that claimed it failed)."""
+    with transaction(db_path) as conn:
+        conn.execute("UPDATE batch_tracker SET count = count + ? WHERE id = 1", (int(count),))
+
+
+def log_retraining(
+    num_records: int,
+    model_version: str = "unknown",
+    db_path: Optional[str] = None,
+    mode: Optional[str] = None,
+    wall_seconds: Optional[float] = None,
+    trees_added: Optional[int] = None,
+):
+    with transaction(db_path) as conn:
+        conn.execute(
+            "INSERT INTO retraining_logs (num_records, model_version, mode, wall_seconds, trees_added) VALUES (?, ?, ?, ?, ?)",
+            (num_records, model_version, mode, wall_seconds, trees_added),
+        )
+
+
+def reserve_applicant_ids(n: int, db_path: Optional[str] = None) -> int:
+    """Reserve `n` consecutive applicant ids and return the first one.
+
+    The AUTOINCREMENT sequence is advanced past the block inside one write
+    transaction, so regular `insert_applicant` calls (from any process) never
+    reuse a reserved id.
+    """
+    with transaction(db_path) as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO sqlite_sequence (name, seq) "
+            "SELECT 'applicants', COALESCE(MAX(id), 0) FROM applicants "
+            "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'applicants')"
+        )
+        conn.execute("UPDATE sqlite_sequence SET seq = seq + ? WHERE name = 'applicants'", (int(n),))
+        end = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'applicants'").fetchone()[0]
+    return int(end) - int(n) + 1
+
+
+def insert_scored_applicants_with_ids(rows: List[Tuple[int, Tuple[Any, ...], str, float, str]], db_path: Optional[str] = None):
+    """Group-commit pre-serialized `(applicant_id, applicant_row, label, prob, shap_json)` rows."""
+    with transaction(db_path) as conn:
+        conn.executemany(_INSERT_APPLICANT_WITH_ID, [(r[0],) + r[1] for r in rows])
+        conn.executemany(
+            "INSERT INTO predictions (applicant_id, label, probability, shap_summary) VALUES (?, ?, ?, ?)",
+            [(r[0], r[2], r[3], r[4]) for r in rows],
+        )
+
+
+def fetch_training_columns(db_path: Optional[str] = None, after_id: int = 0, chunk_rows: int = 50000) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield `training_data` rows with `id > after_id` as NumPy columns.
+
+    Each chunk maps `id` (int64), every numeric field and `label` (float64,
+    NaN for NULL or non-numeric values) and `employment_type` (object) to an
+    array of up to `chunk_rows` entries, filled straight from the cursor.
+    """
+    numeric = NUMERIC_FIELDS + ("label",)
+    select = ", ".join(f"CASE WHEN typeof({c}) IN ('integer', 'real') THEN {c} END" for c in numeric)
+    cur = get_connection(db_path).execute(
+        f"SELECT id, {select}, employment_type FROM training_data WHERE id > ? ORDER BY id", (int(after_id),)
+    )
+    while True:
+        rows = cur.fetchmany(chunk_rows)
+        if not rows:
+            break
+        cols = list(zip(*rows))
+        chunk = {"id": np.array(cols[0], dtype=np.int64)}
+        for i, name in enumerate(numeric, start=1):
+            chunk[name] = np.array(cols[i], dtype=np.float64)
+        chunk["employment_type"] = np.array(cols[-1], dtype=object)
+        yield chunk
+
+
+_PREDICTION_RECORD_SQL = (
+    f"SELECT p.id, p.label, p.probability, p.shap_summary, p.created_at, "
+    f"{', '.join('a.' + f for f in APPLICANT_FIELDS)}, a.extra "
+    "FROM predictions p LEFT JOIN applicants a ON a.id = p.applicant_id"
+)
+
+
+def _prediction_record(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    try:
+        shap_summary = json.loads(row[3]) if row[3] else {}
+    except ValueError:
+        shap_summary = {}
+    return {
+        "prediction_id": row[0],
+        "label": row[1],
+        "probability": row[2],
+        "shap_summary": shap_summary,
+        "created_at": row[4],
+        "applicant": row_to_payload(row[5:-1], row[-1]),
+    }
+
+
+def fetch_prediction_record(prediction_id: int, db_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Return a prediction joined with its applicant payload, or None if it does not exist."""
+    row = get_connection(db_path).execute(_PREDICTION_RECORD_SQL + " WHERE p.id = ?", (int(prediction_id),)).fetchone()
+    return _prediction_record(row) if row else None
+
+
+def fetch_applicant_predictions(
+    applicant_id: int, after_id: int = 0, limit: int = 100, db_path: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Return one page of an applicant's predictions (id order) and the `after_id` of the next page.
+
+    Keyset pagination on `(applicant_id, id)`: each page is an index range
+    scan, however deep into the history it is. The next cursor is None on the
+    last page.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    rows = get_connection(db_path).execute(
+        _PREDICTION_RECORD_SQL + " WHERE p.applicant_id = ? AND p.id > ? ORDER BY p.id LIMIT ?",
+        (int(applicant_id), int(after_id), limit + 1),
+    ).fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return [_prediction_record(r) for r in rows], (rows[-1][0] if more else None)
+
+
+def _window_page(start: Optional[str], end: Optional[str], after: Optional[Tuple[str, int]], limit: int, db_path: Optional[str]):
+    # Rows strictly after the (created_at, id) cursor, served from idx_predictions_created
+    # (bounds are only added when given: "? IS NULL OR ..." would keep SQLite from seeking the index)
+    where, params = [], []
+    if after is not None:
+        where.append("(p.created_at, p.id) > (?, ?)")
+        params += [after[0], int(after[1])]
+    elif start is not None:
+        where.append("p.created_at >= ?")
+        params.append(start)
+    if end is not None:
+        where.append("p.created_at < ?")
+        params.append(end)
+    sql = _PREDICTION_RECORD_SQL + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY p.created_at, p.id LIMIT ?"
+    return get_connection(db_path).execute(sql, params + [limit]).fetchall()
+
+
+def encode_cursor(created_at: str, prediction_id: int) -> str:
+    """Opaque page cursor for `fetch_predictions_page`."""
+    return base64.urlsafe_b64encode(json.dumps([created_at, prediction_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of `encode_cursor`; raises ValueError for malformed cursors."""
+    try:
+        created_at, prediction_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), int(prediction_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f"invalid cursor: {cursor!r}") from e
+
+
+def fetch_predictions_page(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db_path: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return one page of predictions with `start <= created_at < end` and the cursor of the next page.
+
+    Pages are ordered by `(created_at, id)` and continue strictly after
+    `cursor`, so the cost of a page does not grow with its offset. The next
+    cursor is None on the last page.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    after = decode_cursor(cursor) if cursor else None
+    rows = _window_page(start, end, after, limit + 1, db_path)
+    more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1][4], rows[-1][0]) if more else None
+    return [_prediction_record(r) for r in rows], next_cursor
+
+
+def iter_prediction_records(
+    start: Optional[str] = None, end: Optional[str] = None, db_path: Optional[str] = None, chunk_rows: int = 1000
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield lists of prediction records with `start <= created_at < end`, in `(created_at, id)` order.
+
+    `start`/`end` are `YYYY-MM-DD[ HH:MM:SS]` strings (UTC, like `created_at`);
+    either may be None for an open range. Rows are read in `chunk_rows` pages
+    by keyset; no cursor stays open between pages, so the consumer may resume
+    the generator from another thread.
+    """
+    after = None
+    while True:
+        rows = _window_page(start, end, after, int(chunk_rows), db_path)
+        if not rows:
+            break
+        after = (rows[-1][4], rows[-1][0])
+        yield [_prediction_record(r) for r in rows]
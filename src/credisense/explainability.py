@@ -1,56 +1,170 @@
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List, Optional
 import numpy as np
 
+# Lazily imported `shap` module; False once an import attempt has failed
+_shap = None
 
-def explain_model(model, X, feature_names=None) -> Dict[str, Any]:
-    """Return a lightweight explanation dict for a single sample X.
+_explainer_lock = threading.Lock()
+# (model, version, explainer) for the most recently explained model
+_explainer_cache = (None, None, None)
 
-    If SHAP is available and the model supports it, it will be used. Otherwise
-    feature importances or coefficients are used as a fallback.
+
+def _get_shap():
+    global _shap
+    if _shap is None:
+        try:
+            import shap
+
+            _shap = shap
+        except Exception:
+            _shap = False
+    return _shap or None
+
+
+def _split_model(model):
+    """Return `(transform, estimator)`.
+
+    For a Pipeline the final step is explained on inputs passed through the
+    preceding steps; any other model is explained directly.
     """
-    try:
-        import shap
-    except Exception:
-        shap = None
+    steps = getattr(model, "steps", None)
+    if steps and len(steps) > 1:
+        return model[:-1], steps[-1][1]
+    return None, model
+
+
+def get_explainer(model, version: Optional[str] = None):
+    """Return a cached `(transform, shap_explainer)` pair for `model`.
+
+    The explainer is built once per model/version and replaced when a different
+    model is passed in. Returns None if SHAP is unavailable or does not support
+    the model (the failure is cached too, so it is not retried per request).
+    """
+    global _explainer_cache
+    cached = _explainer_cache
+    if model is not None and cached[0] is model and cached[1] == version:
+        return cached[2]
+
+    with _explainer_lock:
+        cached = _explainer_cache
+        if model is not None and cached[0] is model and cached[1] == version:
+            return cached[2]
+        explainer = None
+        shap = _get_shap()
+        if shap is not None and model is not None:
+            transform, estimator = _split_model(model)
+            try:
+                if getattr(estimator, "shap", None):
+                    # a CompiledForest: explain from its (memory-mapped) arrays
+                    explainer = (transform, _mapped_tree_explainer(shap, estimator.shap))
+                else:
+                    explainer = (transform, shap.Explainer(estimator))
+            except Exception:
+                explainer = None
+        _explainer_cache = (model, version, explainer)
+        return explainer
+
+
+def _mapped_tree_explainer(shap, arrays):
+    """A TreeExplainer that reads the compiled forest's dense SHAP arrays in place.
 
+    TreeExplainer copies any model it is given into padded arrays; building it
+    for a one-leaf stub and pointing its ensemble at `arrays` (already in that
+    layout, see `compiled_forest._shap_layout`) keeps those arrays shared
+    between processes instead.
+    """
+    n_outputs = arrays["values"].shape[2]
+    stub = {
+        "children_left": np.array([-1]),
+        "children_right": np.array([-1]),
+        "children_default": np.array([-1]),
+        "features": np.array([-2]),
+        "thresholds": np.array([-2.0]),
+        "values": np.zeros((1, n_outputs)),
+        "node_sample_weight": np.ones(1),
+    }
+    # float64 inputs: the compiled thresholds are exact for unrounded features
+    explainer = shap.TreeExplainer(
+        {"trees": [stub], "input_dtype": np.float64, "internal_dtype": np.float64, "tree_output": "probability"}
+    )
+    ensemble = explainer.model
+    for name in (
+        "children_left", "children_right", "children_default", "features", "thresholds",
+        "threshold_types", "values", "node_sample_weight", "num_nodes",
+    ):
+        setattr(ensemble, name, arrays[name])
+    ensemble.max_depth = int(arrays["max_depth"])
+    explainer.expected_value = ensemble.values[:, 0].sum(0) + ensemble.base_offset
+    return explainer
+
+
+def clear_explainer_cache():
+    global _explainer_cache
+    with _explainer_lock:
+        _explainer_cache = (None, None, None)
+
+
+def _summarise(names, vals) -> Dict[str, Any]:
+    feat_imp = sorted(zip(names, (float(v) for v in vals)), key=lambda x: abs(x[1]), reverse=True)
+    return {"top_features": feat_imp[:10], "raw": vals.tolist()}
+
+
+def _names(feature_names, n):
+    return feature_names if feature_names is not None else [f"f{i}" for i in range(n)]
+
+
+def explain_batch(model, X, feature_names=None, version: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Return one explanation dict per row of X, computed in a single SHAP call.
+
+    Falls back to feature importances or coefficients (identical for every row)
+    when SHAP cannot explain the model.
+    """
     xp = X
     if hasattr(X, "values"):
         xp = X.values
+    xp = np.asarray(xp)
+    if xp.ndim == 1:
+        xp = xp.reshape(1, -1)
+    n_rows = xp.shape[0]
 
-    explanation = {"top_features": [], "raw": None}
-
-    if shap is not None:
+    explainer = get_explainer(model, version)
+    if explainer is not None:
         try:
-            explainer = shap.Explainer(model)
-            sv = explainer(xp)
-            # shap returns list-like; take first sample
-            vals = sv.values[0]
-            names = feature_names if feature_names is not None else [f"f{i}" for i in range(len(vals))]
-            feat_imp = sorted(zip(names, vals), key=lambda x: abs(x[1]), reverse=True)
-            explanation["top_features"] = feat_imp[:10]
-            explanation["raw"] = vals.tolist()
-            return explanation
+            transform, shap_explainer = explainer
+            xt = transform.transform(xp) if transform is not None else xp
+            vals = np.asarray(shap_explainer(xt).values)
+            if vals.ndim == 3:
+                # per-class attributions; explain the positive class as `predict` does
+                vals = vals[..., 1]
+            names = _names(feature_names, vals.shape[1])
+            return [_summarise(names, row) for row in vals]
         except Exception:
             # fall through to fallback
             pass
 
     # Fallback: use model feature_importances_ or coef_
+    _, estimator = _split_model(model)
     try:
-        if hasattr(model, "feature_importances_"):
-            importances = model.feature_importances_
-            names = feature_names if feature_names is not None else [f"f{i}" for i in range(len(importances))]
-            feat_imp = sorted(zip(names, importances), key=lambda x: abs(x[1]), reverse=True)
-            explanation["top_features"] = feat_imp[:10]
-            explanation["raw"] = importances.tolist()
-            return explanation
-        elif hasattr(model, "coef_"):
-            coefs = np.ravel(model.coef_)
-            names = feature_names if feature_names is not None else [f"f{i}" for i in range(len(coefs))]
-            feat_imp = sorted(zip(names, coefs), key=lambda x: abs(x[1]), reverse=True)
-            explanation["top_features"] = feat_imp[:10]
-            explanation["raw"] = coefs.tolist()
-            return explanation
+        if hasattr(estimator, "feature_importances_"):
+            importances = np.asarray(estimator.feature_importances_)
+            names = _names(feature_names, len(importances))
+            return [_summarise(names, importances) for _ in range(n_rows)]
+        elif hasattr(estimator, "coef_"):
+            coefs = np.ravel(estimator.coef_)
+            names = _names(feature_names, len(coefs))
+            return [_summarise(names, coefs) for _ in range(n_rows)]
     except Exception:
         pass
 
-    return explanation
+    return [{"top_features": [], "raw": None} for _ in range(n_rows)]
+
+
+def explain_model(model, X, feature_names=None, version: Optional[str] = None) -> Dict[str, Any]:
+    """Return a lightweight explanation dict for a single sample X.
+
+    If SHAP is available and the model supports it, it will be used. Otherwise
+    feature importances or coefficients are used as a fallback. The SHAP
+    explainer is cached per model `version` (see `get_explainer`).
+    """
+    return explain_batch(model, X, feature_names=feature_names, version=version)[0]
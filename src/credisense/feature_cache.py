@@ -0,0 +1,118 @@
+import hashlib
+import inspect
+import json
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import preprocessing
+from .database import DB_PATH, fetch_training_columns, get_connection
+
+# Rows fetched and featurized per step when catching up
+CHUNK_ROWS = 50000
+
+
+def feature_spec_hash() -> str:
+    """Fingerprint of the preprocessing feature spec.
+
+    Covers the column lists, the employment mapping and the source of
+    `preprocess_batch`, so any change to how rows are featurized invalidates
+    matrices built by an older version.
+    """
+    h = hashlib.sha256()
+    spec = {
+        "expected": preprocessing.EXPECTED_COLS,
+        "numeric": preprocessing.NUM_COLS,
+        "emp_map": preprocessing.EMP_MAP,
+        "cols_out": preprocessing.COLS_OUT,
+    }
+    h.update(json.dumps(spec, sort_keys=True).encode())
+    h.update(inspect.getsource(preprocessing.preprocess_batch).encode())
+    return h.hexdigest()
+
+
+class FeatureCache:
+    """Persistent featurized copy of `training_data` for incremental retraining.
+
+    Features are appended to a raw float64 file (`X.f64`, row-major with
+    `len(COLS_OUT)` columns) and labels to `labels.f64` (NaN where a record has
+    no label). `meta.json` records the row count and the highest
+    `training_data.id` already featurized, so `update()` only reads and
+    preprocesses rows added since the last run and then memory-maps the full
+    matrix. The cache is rebuilt from scratch when the feature spec, the
+    database path or the table contents no longer match (e.g. the table was
+    recreated). Rows deleted from `training_data` are not detected.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.x_path = os.path.join(cache_dir, "X.f64")
+        self.labels_path = os.path.join(cache_dir, "labels.f64")
+        self.meta_path = os.path.join(cache_dir, "meta.json")
+        self.n_features = len(preprocessing.COLS_OUT)
+        # Rows appended by the most recent `update()`; they are the tail of the matrix
+        self.new_rows = 0
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta: dict):
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.meta_path)
+
+    def _reset(self, db: str, spec: str) -> dict:
+        for p in (self.x_path, self.labels_path):
+            open(p, "wb").close()
+        meta = {"spec": spec, "db": db, "rows": 0, "high_water": 0}
+        self._write_meta(meta)
+        return meta
+
+    def update(self, db_path: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Featurize new `training_data` rows and return `(X, labels)` memory-mapped."""
+        db = os.path.abspath(db_path or DB_PATH)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        spec = feature_spec_hash()
+        conn = get_connection(db_path)
+
+        meta = self._read_meta()
+        if meta is None or meta.get("spec") != spec or meta.get("db") != db:
+            meta = self._reset(db, spec)
+        else:
+            max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM training_data").fetchone()[0]
+            if max_id < meta["high_water"]:
+                meta = self._reset(db, spec)
+
+        self.new_rows = 0
+        # Drop any tail written by a run that died before updating meta.json
+        row_bytes = self.n_features * 8
+        for path, width in ((self.x_path, row_bytes), (self.labels_path, 8)):
+            if os.path.getsize(path) != meta["rows"] * width:
+                with open(path, "r+b") as f:
+                    f.truncate(meta["rows"] * width)
+
+        for chunk in fetch_training_columns(db_path, after_id=meta["high_water"], chunk_rows=CHUNK_ROWS):
+            df = pd.DataFrame({c: chunk[c] for c in preprocessing.EXPECTED_COLS})
+            X = np.ascontiguousarray(preprocessing.preprocess_batch(df).to_numpy(dtype=np.float64))
+            with open(self.x_path, "ab") as f:
+                f.write(X.tobytes())
+            with open(self.labels_path, "ab") as f:
+                f.write(chunk["label"].tobytes())
+            meta["rows"] += len(X)
+            self.new_rows += len(X)
+            meta["high_water"] = int(chunk["id"][-1])
+            self._write_meta(meta)
+
+        n = meta["rows"]
+        if n == 0:
+            return np.empty((0, self.n_features)), np.empty(0)
+        X = np.memmap(self.x_path, dtype=np.float64, mode="r", shape=(n, self.n_features))
+        labels = np.memmap(self.labels_path, dtype=np.float64, mode="r", shape=(n,))
+        return X, labels
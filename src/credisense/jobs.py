@@ -0,0 +1,164 @@
+import itertools
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import record_retrain
+
+# Number of finished jobs kept for /retrain/jobs/{id}
+MAX_JOB_HISTORY = 100
+
+
+def _run_retrain_job(db_path: Optional[str], batch_threshold: int) -> Dict[str, Any]:
+    # Executed in the worker process; import there so the parent never needs sklearn
+    from .training import retrain
+
+    start = time.perf_counter()
+    result = retrain(db_path, batch_threshold)
+    return {
+        "retrained": result is not None,
+        "num_records": result["num_records"] if result else 0,
+        "mode": result["mode"] if result else None,
+        "trees_added": result["trees_added"] if result else 0,
+        "stages": result["stages"] if result else {},
+        "version": result["version"] if result else None,
+        "fit_seconds": time.perf_counter() - start,
+    }
+
+
+class RetrainJob:
+    def __init__(self, job_id: int, batch_threshold: int):
+        self.id = job_id
+        self.batch_threshold = batch_threshold
+        self.state = "running"
+        self.triggers = 1
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.retrained: Optional[bool] = None
+        self.num_records: Optional[int] = None
+        self.fit_seconds: Optional[float] = None
+        self.mode: Optional[str] = None
+        self.trees_added: Optional[int] = None
+        self.version: Optional[str] = None
+        self.error: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self.state == "running"
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at if self.finished_at is not None else time.time()
+        return {
+            "id": self.id,
+            "state": self.state,
+            "triggers": self.triggers,
+            "batch_threshold": self.batch_threshold,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": end - self.submitted_at,
+            "fit_seconds": self.fit_seconds,
+            "retrained": self.retrained,
+            "num_records": self.num_records,
+            "mode": self.mode,
+            "trees_added": self.trees_added,
+            "version": self.version,
+            "error": self.error,
+        }
+
+
+class RetrainManager:
+    """Run retraining off the request path, one job at a time.
+
+    Jobs execute in a single-worker executor (a spawned process by default, so
+    fitting never competes with request threads for the GIL). While a job is
+    running, further triggers are coalesced into it instead of queueing more
+    fits.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, executor: Optional[Executor] = None, job_fn: Callable = _run_retrain_job):
+        self.db_path = db_path
+        self._executor = executor
+        self._job_fn = job_fn
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs: "OrderedDict[int, RetrainJob]" = OrderedDict()
+        self._active: Optional[RetrainJob] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def submit(self, batch_threshold: int = 30) -> RetrainJob:
+        """Start a retrain job, or return the running one with its trigger count bumped."""
+        with self._lock:
+            if self._active is not None and self._active.active:
+                self._active.triggers += 1
+                return self._active
+            job = RetrainJob(next(self._ids), batch_threshold)
+            self._jobs[job.id] = job
+            while len(self._jobs) > MAX_JOB_HISTORY:
+                self._jobs.popitem(last=False)
+            self._active = job
+        try:
+            future = self._get_executor().submit(self._job_fn, self.db_path, batch_threshold)
+        except Exception as e:
+            # e.g. the pool broke since the last job; the next trigger gets a fresh one
+            with self._lock:
+                self._fail(job, e)
+                self._drop_executor()
+            return job
+        future.add_done_callback(lambda f, job=job: self._finish(job, f))
+        return job
+
+    def _drop_executor(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            # may run on the executor's own thread, so don't wait for it
+            executor.shutdown(wait=False)
+
+    def _fail(self, job: RetrainJob, error: BaseException):
+        job.finished_at = time.time()
+        job.state = "failed"
+        job.error = repr(error)
+        if self._active is job:
+            self._active = None
+
+    def _finish(self, job: RetrainJob, future):
+        with self._lock:
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                # the worker died mid-job (OOM kill, os._exit); the pool can't be reused
+                self._fail(job, e)
+                self._drop_executor()
+                return
+            except Exception as e:
+                self._fail(job, e)
+                return
+            job.finished_at = time.time()
+            job.state = "succeeded"
+            job.retrained = result["retrained"]
+            job.num_records = result["num_records"]
+            job.fit_seconds = result["fit_seconds"]
+            job.mode = result.get("mode")
+            job.trees_added = result.get("trees_added")
+            job.version = result.get("version")
+            # The job ran in another process; record its timings here
+            if job.retrained:
+                record_retrain(result)
+            if self._active is job:
+                self._active = None
+
+    def get(self, job_id: int) -> Optional[RetrainJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
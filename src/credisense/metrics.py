@@ -0,0 +1,173 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the stage latency histogram buckets
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_METRIC = "credisense_stage_seconds"
+
+# A sink receives (kind, metric name, labels, value) for every observation;
+# kind is "histogram", "counter" or "info".
+Sink = Callable[[str, str, Dict[str, str], float], None]
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, n_buckets: int):
+        self.counts = [0] * (n_buckets + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_endpoint", "_stage", "_start")
+
+    def __init__(self, metrics: "Metrics", endpoint: str, stage: str):
+        self._metrics = metrics
+        self._endpoint = endpoint
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.observe(self._endpoint, self._stage, time.perf_counter() - self._start)
+        return False
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(key: LabelKey, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(v: float) -> str:
+    return repr(float(v)) if v != int(v) or abs(v) >= 1e15 else str(int(v))
+
+
+class Metrics:
+    """In-process stage histograms, counters and info metrics.
+
+    `time(endpoint, stage)` is a context manager recording the elapsed time in
+    the `credisense_stage_seconds` histogram; an observation costs two
+    `perf_counter` calls, a bisect and a short lock, so it can stay on in
+    production. `render()` produces the Prometheus text exposition format.
+    Sinks added with `add_sink` are called synchronously with every
+    observation and must be cheap (e.g. push onto a queue).
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._histograms: Dict[LabelKey, _Histogram] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._info: Dict[str, LabelKey] = {}
+        self._help: Dict[str, str] = {STAGE_METRIC: "Time spent in each stage of a request or retrain, in seconds"}
+        self._sinks: List[Sink] = []
+
+    def add_sink(self, sink: Sink):
+        self._sinks.append(sink)
+
+    def remove_sink(self, sink: Sink):
+        self._sinks.remove(sink)
+
+    def time(self, endpoint: str, stage: str) -> _Timer:
+        return _Timer(self, endpoint, stage)
+
+    def observe(self, endpoint: str, stage: str, seconds: float):
+        key = (("endpoint", endpoint), ("stage", stage))
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            h = self._histograms.get(key)
+            if h is None:
+                h = self._histograms[key] = _Histogram(len(self.buckets))
+            h.counts[i] += 1
+            h.sum += seconds
+            h.count += 1
+        for sink in self._sinks:
+            sink("histogram", STAGE_METRIC, dict(key), seconds)
+
+    def inc(self, name: str, value: float = 1.0, help: Optional[str] = None, **labels: str):
+        """Add `value` to counter `name` (exported as `<name>_total`)."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+            if help:
+                self._help.setdefault(name, help)
+        for sink in self._sinks:
+            sink("counter", name, dict(key), value)
+
+    def set_info(self, name: str, help: Optional[str] = None, **labels: str):
+        """Set info metric `name` (exported as `<name>_info{labels} 1`), replacing previous labels."""
+        key = tuple(sorted((k, "" if v is None else str(v)) for k, v in labels.items()))
+        with self._lock:
+            changed = self._info.get(name) != key
+            self._info[name] = key
+            if help:
+                self._help.setdefault(name, help)
+        if changed:
+            for sink in self._sinks:
+                sink("info", name, dict(key), 1.0)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._info.clear()
+
+    def render(self) -> str:
+        """Return every metric in Prometheus text format (version 0.0.4)."""
+        with self._lock:
+            histograms = {k: (list(h.counts), h.sum, h.count) for k, h in self._histograms.items()}
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            info = dict(self._info)
+        lines = []
+        if histograms:
+            lines.append(f"# HELP {STAGE_METRIC} {self._help[STAGE_METRIC]}")
+            lines.append(f"# TYPE {STAGE_METRIC} histogram")
+            for key in sorted(histograms):
+                counts, total, count = histograms[key]
+                cumulative = 0
+                for bound, c in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += c
+                    le = 'le="+Inf"' if bound == float("inf") else 'le="%r"' % bound
+                    lines.append(f"{STAGE_METRIC}_bucket{_labels(key, le)} {cumulative}")
+                lines.append(f"{STAGE_METRIC}_sum{_labels(key)} {total!r}")
+                lines.append(f"{STAGE_METRIC}_count{_labels(key)} {count}")
+        for name in sorted(counters):
+            if name in self._help:
+                lines.append(f"# HELP {name}_total {self._help[name]}")
+            lines.append(f"# TYPE {name}_total counter")
+            for key in sorted(counters[name]):
+                lines.append(f"{name}_total{_labels(key)} {_fmt(counters[name][key])}")
+        for name in sorted(info):
+            if name in self._help:
+                lines.append(f"# HELP {name}_info {self._help[name]}")
+            lines.append(f"# TYPE {name}_info gauge")
+            lines.append(f"{name}_info{_labels(info[name])} 1")
+        return "\n".join(lines) + "\n"
+
+
+# Shared by the app, training and retrain jobs in this process
+metrics = Metrics()
+
+
+def record_retrain(result: Optional[Dict], source: str = "retrain"):
+    """Record the stage timings and counters of a `training.retrain` result (None = no retrain)."""
+    if not result:
+        return
+    for stage, seconds in (result.get("stages") or {}).items():
+        metrics.observe(source, stage, seconds)
+    metrics.inc("credisense_retrains", help="Completed model retrains", mode=str(result.get("mode")))
@@ -0,0 +1,19 @@
+import argparse
+
+from .database import DB_PATH, migrate_db
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="credisense migrate", description="Migrate a CrediSense database from JSON payload columns to the typed schema")
+    parser.add_argument("--db", default=DB_PATH, help="Path to SQLite DB")
+    args = parser.parse_args(argv)
+
+    migrated = migrate_db(args.db)
+    if not migrated:
+        print(f"{args.db} already uses the typed schema; nothing to do.")
+    for table, n in migrated.items():
+        print(f"Migrated {n} rows in {table}")
+
+
+if __name__ == "__main__":
+    main()
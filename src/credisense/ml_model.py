@@ -1,7 +1,9 @@
 import os
-import joblib
+import threading
 import numpy as np
-from typing import Tuple
+from typing import Any, List, Optional, Tuple
+from .compiled_forest import compile_model, load_compiled
+from .model_store import live_version
 
 MODEL_DIR = os.path.join(os.path.dirname(__file__), "..", "models")
 MODEL_PATH = os.path.abspath(os.path.join(MODEL_DIR, "model.joblib"))
@@ -11,41 +13,158 @@ def _ensure_model_dir():
     os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
 
 
-def load_model():
+def load_model(mmap_mode: Optional[str] = "r"):
     """Load a serialized model. If absent, return None.
     The training pipeline should create a model at `MODEL_PATH`.
+
+    NumPy arrays stored uncompressed in the pickle are memory-mapped read-only
+    (`mmap_mode=None` copies them into the process instead).
     """
     _ensure_model_dir()
     if os.path.exists(MODEL_PATH):
-        return joblib.load(MODEL_PATH)
+        import joblib
+
+        return joblib.load(MODEL_PATH, mmap_mode=mmap_mode)
     return None
 
 
+class ModelRegistry:
+    """Process-wide holder for the deployed model.
+
+    The model is unpickled once and reused across requests. Every `get()` does a
+    cheap `os.stat` on the artifact; when training writes a new file (different
+    mtime or size) the new model is loaded outside of any request's view and
+    swapped in with a single reference assignment, so callers only ever see a
+    fully loaded model. Its version is the name of the published version the
+    artifact came from (see `model_store`), or the stat stamp for a file
+    written some other way.
+
+    Alongside the sklearn model the registry keeps a `CompiledForest` used for
+    scoring: the flat-array export written by training when it matches the
+    artifact, otherwise one compiled in-process. Models that cannot be
+    compiled are scored with sklearn. The export is memory-mapped read-only,
+    so worker processes serving the same file share its pages.
+
+    With `explain=False` the sklearn model is not unpickled when a valid
+    export exists (`snapshot()` then returns None for it); such processes keep
+    no private copy of the forest and explain with the compiled forest
+    instead (see `explainable`).
+    """
+
+    def __init__(self, path: Optional[str] = None, explain: bool = True):
+        self._path = path
+        self._explain = explain
+        self._lock = threading.Lock()
+        # (model, version, stamp, scorer) is replaced as a whole on reload
+        self._current: Tuple[Any, Optional[str], Optional[Tuple[int, int]], Any] = (None, None, None, None)
+
+    @property
+    def path(self) -> str:
+        return self._path or MODEL_PATH
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, stamp):
+        if stamp is None:
+            return (None, None, None, None)
+        # joblib (and sklearn, when unpickling) load with the first model, not at import
+        import joblib
+
+        scorer = load_compiled(self.path, expected_stamp=stamp)
+        model = None
+        if scorer is None or self._explain:
+            model = joblib.load(self.path, mmap_mode="r")
+        if scorer is None:
+            scorer = compile_model(model)
+        # The stat stamp only detects changes; report the published version name when there is one
+        version = live_version(self.path) or f"{stamp[0]}-{stamp[1]}"
+        return (model, version, stamp, scorer if scorer is not None else model)
+
+    def _refresh(self):
+        stamp = self._stamp()
+        current = self._current
+        if stamp != current[2]:
+            with self._lock:
+                current = self._current
+                if stamp != current[2]:
+                    current = self._load(stamp)
+                    self._current = current
+        return current
+
+    def get_with_version(self) -> Tuple[Any, Optional[str]]:
+        """Return `(model, version)` for the current artifact, reloading if it changed."""
+        current = self._refresh()
+        return current[0], current[1]
+
+    def snapshot(self) -> Tuple[Any, Any, Optional[str]]:
+        """Return `(model, scorer, version)` from one load.
+
+        `scorer` is what `predict`/`predict_batch` should be given (the compiled
+        forest when available); `model` is the sklearn object for explanations.
+        """
+        current = self._refresh()
+        return current[0], current[3], current[1]
+
+    def get(self):
+        """Return the current model (or None if no artifact exists)."""
+        return self.get_with_version()[0]
+
+    @property
+    def version(self) -> Optional[str]:
+        """Version of the loaded model, or None if nothing is loaded."""
+        return self._current[1]
+
+    def clear(self):
+        with self._lock:
+            self._current = (None, None, None, None)
+
+
+# Shared by all requests in this process. Explanations run on the mapped
+# compiled forest, so API workers never unpickle a private copy of the sklearn forest
+registry = ModelRegistry(explain=False)
+
+
+def explainable(model, scorer):
+    """What to explain for a `snapshot()`: the sklearn model if loaded, else the compiled forest."""
+    return model if model is not None else scorer
+
+
 def predict(model, X) -> Tuple[str, float]:
     """Return label ('Eligible' or 'Not Eligible') and probability for applicant X.
 
     X may be a 2D array-like or DataFrame row.
     """
-    if model is None:
-        # fallback dummy behaviour
-        # No model available — return Not Eligible with zero confidence
-        return "Not Eligible", 0.0
+    return predict_batch(model, X)[0]
+
 
+def predict_batch(model, X) -> List[Tuple[str, float]]:
+    """Return `(label, probability)` for every row of X using a single model call."""
     # Ensure numpy array
     xp = np.asarray(X)
     if xp.ndim == 1:
         xp = xp.reshape(1, -1)
 
+    if model is None:
+        # fallback dummy behaviour
+        # No model available — return Not Eligible with zero confidence
+        return [("Not Eligible", 0.0)] * xp.shape[0]
+
     if hasattr(model, "predict_proba"):
-        proba = float(model.predict_proba(xp)[0, 1])
+        probas = model.predict_proba(xp)[:, 1]
     else:
         # fallback: use decision_function or predict
         try:
-            proba = float(model.decision_function(xp)[0])
+            scores = np.asarray(model.decision_function(xp), dtype=float)
+            if scores.ndim != 1:
+                raise ValueError("expected one decision score per row")
             # squash to 0-1
-            proba = 1 / (1 + np.exp(-proba))
+            probas = 1 / (1 + np.exp(-scores))
         except Exception:
-            proba = float(model.predict(xp)[0]) if hasattr(model, "predict") else 0.0
+            probas = np.asarray(model.predict(xp), dtype=float) if hasattr(model, "predict") else np.zeros(xp.shape[0])
 
-    label = "Eligible" if proba >= 0.5 else "Not Eligible"
-    return label, proba
+    return [("Eligible" if p >= 0.5 else "Not Eligible", float(p)) for p in probas]
@@ -0,0 +1,153 @@
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+
+from .compiled_forest import compiled_path, export_compiled
+
+try:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# Published versions kept under <model dir>/versions (older ones are pruned)
+KEEP_VERSIONS = 5
+
+
+def versions_dir(model_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(model_path)), "versions")
+
+
+def list_versions(model_path: str) -> List[str]:
+    """Published version names, oldest first."""
+    try:
+        names = os.listdir(versions_dir(model_path))
+    except FileNotFoundError:
+        return []
+    # staging directories are hidden until they are complete
+    return sorted(n for n in names if not n.startswith("."))
+
+
+def live_version(model_path: str) -> Optional[str]:
+    """Name of the published version the live `model_path` currently is, or None.
+
+    Live files are hard links or mtime-preserving copies of a version's file,
+    so they are matched on mtime and size.
+    """
+    try:
+        st = os.stat(model_path)
+    except OSError:
+        return None
+    name = os.path.basename(model_path)
+    for version in reversed(list_versions(model_path)):
+        try:
+            vst = os.stat(os.path.join(versions_dir(model_path), version, name))
+        except OSError:
+            continue
+        if (vst.st_mtime_ns, vst.st_size) == (st.st_mtime_ns, st.st_size):
+            return version
+    return None
+
+
+def _link_or_copy(src: str, dst: str):
+    try:
+        os.link(src, dst)
+    except OSError:
+        # copy2 keeps mtime, which the compiled forest's source stamp relies on
+        shutil.copy2(src, dst)
+
+
+def _swap_in(src: str, live: str):
+    tmp = f"{live}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    _link_or_copy(src, tmp)
+    os.replace(tmp, live)
+
+
+def activate(model_path: str, version: str):
+    """Point the live `model_path` (and its compiled copy) at a published version.
+
+    Each live file is replaced by a single rename, so readers in any process
+    see either the old or the new file, never a partial one. The compiled copy
+    goes first: its stamp names the new pickle, so a reader that catches the
+    new arrays next to the old pickle just compiles in-process instead.
+    """
+    src = os.path.join(versions_dir(model_path), version, os.path.basename(model_path))
+    if not os.path.exists(src):
+        raise FileNotFoundError(f"Unknown model version {version!r}")
+    if os.path.exists(compiled_path(src)):
+        _swap_in(compiled_path(src), compiled_path(model_path))
+    _swap_in(src, model_path)
+
+
+def publish_model(model: Any, model_path: str, keep: int = KEEP_VERSIONS) -> str:
+    """Write `model` as a new version directory, make it live and return the version name.
+
+    The pickle and its compiled forest are written and fsynced in a hidden
+    staging directory, which is renamed into `versions/` once complete;
+    `activate` then swaps the live files. Only the newest `keep` versions are
+    retained.
+    """
+    import joblib
+
+    root = versions_dir(model_path)
+    os.makedirs(root, exist_ok=True)
+    # sortable by publication time; the random suffix keeps concurrent publishers apart
+    now = time.time_ns()
+    version = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now // 10**9)) + f"{now % 10**9:09d}-{uuid.uuid4().hex[:8]}"
+    staging = os.path.join(root, f".{version}.tmp")
+    os.makedirs(staging)
+    staged = os.path.join(staging, os.path.basename(model_path))
+    with open(staged, "wb") as f:
+        joblib.dump(model, f)
+        f.flush()
+        os.fsync(f.fileno())
+    # Flat-array copy of the forest for fast scoring (see compiled_forest)
+    export_compiled(model, staged)
+    os.rename(staging, os.path.join(root, version))
+
+    activate(model_path, version)
+    for old in list_versions(model_path)[:-keep] if keep > 0 else []:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return version
+
+
+@contextmanager
+def try_lock(path: str) -> Iterator[bool]:
+    """Hold an exclusive lock on `path` across processes; yields False (without waiting) if it is taken.
+
+    The lock is released when the block exits or the holding process dies.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    f = open(path, "a+")
+    try:
+        try:
+            _lock_file(f)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            _unlock_file(f)
+    finally:
+        f.close()
@@ -1,32 +1,74 @@
-from fpdf import FPDF
-from typing import Dict, List
+import hashlib
+import json
+from typing import Any, Dict, List
 
+# Bump when the layout changes so content-addressed copies are re-rendered
+LAYOUT_VERSION = 1
+FONT_FAMILY = "Arial"
+FONT_SIZE = 12
+
+# FPDF's core fonts are latin-1 only
+_REPLACEMENTS = {"—": "-", "–": "-", "‘": "'", "’": "'", "“": '"', "”": '"', "₹": "Rs."}
+
+
+def _text(value: Any) -> str:
+    s = str(value)
+    for src, dst in _REPLACEMENTS.items():
+        s = s.replace(src, dst)
+    return s.encode("latin-1", "replace").decode("latin-1")
+
+
+def _new_document():
+    # fpdf is only needed where reports are rendered (report workers), not to import this module
+    from fpdf import FPDF
 
-def generate_pdf(applicant: Dict, prediction: Dict, shap_summary: Dict, advice: List[str], out_path: str):
     pdf = FPDF()
     pdf.add_page()
-    pdf.set_font("Arial", size=12)
+    pdf.set_font(FONT_FAMILY, size=FONT_SIZE)
+    return pdf
+
+
+def render_pdf(applicant: Dict, prediction: Dict, shap_summary: Dict, advice: List[str]) -> bytes:
+    """Lay out one report and return the PDF bytes."""
+    pdf = _new_document()
 
     pdf.cell(0, 10, "CrediSense - Loan Eligibility Report", ln=True)
     pdf.ln(4)
 
     pdf.cell(0, 8, "Applicant Details:", ln=True)
     for k, v in applicant.items():
-        pdf.cell(0, 6, f"{k}: {v}", ln=True)
+        pdf.cell(0, 6, _text(f"{k}: {v}"), ln=True)
 
     pdf.ln(4)
     pdf.cell(0, 8, "Model Output:", ln=True)
-    pdf.cell(0, 6, f"Decision: {prediction.get('label')}", ln=True)
+    pdf.cell(0, 6, _text(f"Decision: {prediction.get('label')}"), ln=True)
     pdf.cell(0, 6, f"Probability: {prediction.get('probability'):.3f}", ln=True)
 
     pdf.ln(4)
     pdf.cell(0, 8, "Top SHAP Features:", ln=True)
     for name, val in shap_summary.get("top_features", [])[:10]:
-        pdf.cell(0, 6, f"{name}: {val}", ln=True)
+        pdf.cell(0, 6, _text(f"{name}: {val}"), ln=True)
 
     pdf.ln(4)
     pdf.cell(0, 8, "Recommendations:", ln=True)
     for a in advice:
-        pdf.multi_cell(0, 6, f"- {a}")
+        pdf.multi_cell(0, 6, _text(f"- {a}"))
+
+    return pdf.output(dest="S").encode("latin-1")
+
 
-    pdf.output(out_path)
+def report_key(applicant: Dict, prediction: Dict, shap_summary: Dict, advice: List[str]) -> str:
+    """Content address of a report: identical inputs and layout give the same key."""
+    content = {
+        "layout": LAYOUT_VERSION,
+        "applicant": applicant,
+        "prediction": {"label": prediction.get("label"), "probability": prediction.get("probability")},
+        "top_features": shap_summary.get("top_features", [])[:10],
+        "advice": advice,
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def generate_pdf(applicant: Dict, prediction: Dict, shap_summary: Dict, advice: List[str], out_path: str):
+    with open(out_path, "wb") as f:
+        f.write(render_pdf(applicant, prediction, shap_summary, advice))
@@ -0,0 +1,166 @@
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .database import applicant_row, insert_scored_applicants_with_ids, reserve_applicant_ids
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ("sync", "async")
+
+
+class WriteBehindWriter:
+    """Move applicant/prediction inserts off the request path.
+
+    `record()` assigns the applicant id from a block reserved up front (one DB
+    round trip per `id_block` applicants), serializes the row and puts it on a
+    bounded queue. A background thread drains the queue in batches of up to
+    `batch_size` rows and writes each batch with `executemany` and one commit.
+
+    With `durability="async"` callers return as soon as the row is queued; rows
+    still queued when the process dies are lost. With `durability="sync"`
+    callers wait until the batch holding their row is committed, which still
+    shares one commit among all concurrent requests.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        durability: str = "async",
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval_ms: float = 20.0,
+        id_block: int = 1000,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}, got {durability!r}")
+        self.db_path = db_path
+        self.durability = durability
+        self.batch_size = max(int(batch_size), 1)
+        self.flush_interval = max(flush_interval_ms, 0.0) / 1000.0
+        self.id_block = max(int(id_block), 1)
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(int(max_queue), 1))
+        self._id_lock = threading.Lock()
+        self._next_id = 0
+        self._block_end = -1
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._max_depth = 0
+        self._batches = 0
+        self._rows = 0
+        self._errors = 0
+        self._last_batch_size = 0
+
+    def _allocate_id(self) -> int:
+        with self._id_lock:
+            if self._next_id > self._block_end:
+                self._next_id = reserve_applicant_ids(self.id_block, self.db_path)
+                self._block_end = self._next_id + self.id_block - 1
+            aid = self._next_id
+            self._next_id += 1
+            return aid
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    t = threading.Thread(target=self._run, name="credisense-write-behind", daemon=True)
+                    t.start()
+                    self._thread = t
+
+    def record(self, payload: Dict[str, Any], label: str, prob: float, shap_summary: Dict) -> int:
+        """Queue an applicant with its prediction and return the applicant id.
+
+        Blocks when the queue is full (back-pressure) and, in sync mode, until
+        the row is committed.
+        """
+        self._ensure_started()
+        aid = self._allocate_id()
+        row = (aid, applicant_row(payload), label, float(prob), json.dumps(shap_summary))
+        done = threading.Event() if self.durability == "sync" else None
+        item = [row, done, None]
+        self._queue.put(item)
+        depth = self._queue.qsize()
+        if depth > self._max_depth:
+            with self._stats_lock:
+                self._max_depth = max(self._max_depth, depth)
+        if done is not None:
+            done.wait()
+            if item[2] is not None:
+                raise item[2]
+        return aid
+
+    def flush(self):
+        """Block until every row queued so far has been written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Flush pending rows and stop the writer thread."""
+        t = self._thread
+        if t is not None:
+            self._queue.put(None)
+            t.join()
+            self._thread = None
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                self._queue.task_done()
+                break
+            batch = [first]
+            deadline = time.perf_counter() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.task_done()
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: List[Any]):
+        error = None
+        try:
+            insert_scored_applicants_with_ids([item[0] for item in batch], self.db_path)
+        except Exception as e:
+            error = e
+            logger.exception("write-behind batch of %d rows failed", len(batch))
+        with self._stats_lock:
+            self._batches += 1
+            self._last_batch_size = len(batch)
+            if error is None:
+                self._rows += len(batch)
+            else:
+                self._errors += len(batch)
+        for item in batch:
+            item[2] = error
+            if item[1] is not None:
+                item[1].set()
+            self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue-depth and write statistics."""
+        with self._stats_lock:
+            return {
+                "durability": self.durability,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "max_queue_depth": self._max_depth,
+                "batches_written": self._batches,
+                "rows_written": self._rows,
+                "rows_failed": self._errors,
+                "last_batch_size": self._last_batch_size,
+            }
@@ -0,0 +1,142 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+# Bytes charged per entry on top of the value itself (key, bookkeeping tuple, dict slot)
+_ENTRY_OVERHEAD = 200
+
+
+def feature_key(x) -> bytes:
+    """Digest of a preprocessed feature vector.
+
+    The vector is canonicalised to contiguous float64 (and -0.0 to 0.0) so the
+    single-row and batch paths produce the same key for the same applicant.
+    """
+    arr = np.ascontiguousarray(np.asarray(x, dtype=np.float64).ravel()) + 0.0
+    return hashlib.blake2b(arr.tobytes(), digest_size=16).digest()
+
+
+def _approx_size(obj: Any) -> int:
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_approx_size(k) + _approx_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_approx_size(v) for v in obj)
+    return size
+
+
+class PredictionCache:
+    """LRU/TTL cache of `(label, probability, shap_summary)` per feature vector.
+
+    Entries are keyed on `feature_key(x)` and only valid for the model version
+    they were computed with: a lookup with a different version drops every
+    entry first, so a model swap never serves stale scores, while a store for
+    any version but the current one is ignored (a request that scored with the
+    previous model must not wipe the new model's entries). With
+    `live_version` (returning the version being served now), lookups for any
+    other version are plain misses too, so only the live model resets it. The cache is
+    bounded by the approximate size of its entries (`max_bytes`); the least
+    recently used entries are evicted first. `ttl_seconds` (if set) expires
+    entries regardless of use. Cached values are shared, so callers must not
+    mutate them.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None,
+        live_version: Optional[Callable[[], Optional[str]]] = None,
+    ):
+        self.max_bytes = max(int(max_bytes), 0)
+        self.ttl = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self._live_version = live_version
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._version: Optional[str] = None
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def _check_version(self, version: Optional[str]):
+        # Caller holds the lock
+        if version != self._version:
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def get(self, key: bytes, version: Optional[str]) -> Optional[Any]:
+        """Return the cached value for `key` under `version`, or None."""
+        with self._lock:
+            if version != self._version and self._live_version is not None and version != self._live_version():
+                # a request still holding a superseded snapshot
+                self._misses += 1
+                return None
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= entry[1]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: bytes, version: Optional[str], value: Any):
+        """Store `value` for `key` under `version`, evicting LRU entries to stay in budget."""
+        size = _approx_size(value) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if self._version is None and not self._entries:
+                self._version = version
+            elif version != self._version:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size, expires)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._version = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit-rate and occupancy statistics."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "model_version": self._version,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
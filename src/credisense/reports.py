@@ -0,0 +1,175 @@
+import argparse
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from .advisory import generate_advice_batch
+from .database import DB_PATH, fetch_prediction_record, iter_prediction_records
+from .pdf_report import render_pdf, report_key
+
+REPORT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "reports"))
+
+# Reports handed to a worker per task in bulk mode
+CHUNK_SIZE = 64
+
+# (cache path, render_pdf args, optional export path)
+Job = Tuple[str, Tuple[Any, ...], Optional[str]]
+
+
+def _warm_worker():
+    # Import fpdf and load the core font metrics once per worker, not per report
+    render_pdf({}, {"label": "", "probability": 0.0}, {}, [])
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _export(path: str, dest: str):
+    if os.path.exists(dest):
+        os.remove(dest)
+    try:
+        os.link(path, dest)
+    except OSError:
+        shutil.copyfile(path, dest)
+
+
+def _render_jobs(jobs: List[Job]) -> int:
+    """Render every job whose cache file is missing; return how many were rendered."""
+    rendered = 0
+    for path, args, dest in jobs:
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomic(path, render_pdf(*args))
+            rendered += 1
+        if dest is not None:
+            _export(path, dest)
+    return rendered
+
+
+class ReportService:
+    """Render prediction reports in a process pool with a content-addressed cache.
+
+    A report is stored once under the SHA-256 of everything it shows (see
+    `pdf_report.report_key`), so repeated requests and identical reports are
+    served from disk, and any change in inputs or layout yields a new file.
+    Workers are spawned lazily and keep their fpdf state for their lifetime.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        db_path: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.cache_dir = cache_dir or REPORT_DIR
+        self.db_path = db_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = executor
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return self._executor
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".pdf")
+
+    def _jobs(self, records: List[Dict[str, Any]], out_dir: Optional[str] = None) -> List[Job]:
+        advice = generate_advice_batch([r["applicant"] for r in records])
+        jobs = []
+        for record, adv in zip(records, advice):
+            args = (
+                record["applicant"],
+                {"label": record["label"], "probability": record["probability"] or 0.0},
+                record["shap_summary"],
+                adv,
+            )
+            dest = os.path.join(out_dir, f"report-{record['prediction_id']}.pdf") if out_dir else None
+            jobs.append((self.path_for(report_key(*args)), args, dest))
+        return jobs
+
+    def report_for_prediction(self, prediction_id: int) -> Optional[str]:
+        """Return the cached PDF path for a prediction, rendering it first if needed.
+
+        Returns None if the prediction does not exist.
+        """
+        record = fetch_prediction_record(prediction_id, self.db_path)
+        if record is None:
+            return None
+        job = self._jobs([record])[0]
+        if not os.path.exists(job[0]):
+            self._get_executor().submit(_render_jobs, [job]).result()
+        return job[0]
+
+    def render_range(
+        self, start: Optional[str] = None, end: Optional[str] = None, out_dir: Optional[str] = None, chunk_size: int = CHUNK_SIZE
+    ) -> Dict[str, Any]:
+        """Render reports for predictions with `start <= created_at < end` in parallel.
+
+        With `out_dir`, each report is also exported there as
+        `report-<prediction_id>.pdf` (hard-linked to the cache where possible).
+        """
+        began = time.perf_counter()
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        executor = self._get_executor()
+        pending = set()
+        total = rendered = 0
+        # Bound the records held in memory: only a few chunks per worker are in flight
+        max_pending = self.max_workers * 4
+        for records in iter_prediction_records(start, end, self.db_path, chunk_rows=chunk_size):
+            total += len(records)
+            pending.add(executor.submit(_render_jobs, self._jobs(records, out_dir)))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                rendered += sum(f.result() for f in done)
+        rendered += sum(f.result() for f in pending)
+        return {
+            "reports": total,
+            "rendered": rendered,
+            "cached": total - rendered,
+            "seconds": time.perf_counter() - began,
+        }
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="credisense reports", description="Render CrediSense reports for a date range of predictions")
+    parser.add_argument("--db", default=DB_PATH, help="Path to SQLite DB")
+    parser.add_argument("--from", dest="start", help="First day included (YYYY-MM-DD, UTC)")
+    parser.add_argument("--to", dest="end", help="First day excluded (YYYY-MM-DD, UTC)")
+    parser.add_argument("--out", help="Directory to export report-<prediction_id>.pdf files into")
+    parser.add_argument("--cache-dir", default=REPORT_DIR, help="Content-addressed report cache")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    service = ReportService(cache_dir=args.cache_dir, db_path=args.db, max_workers=args.workers)
+    try:
+        summary = service.render_range(args.start, args.end, out_dir=args.out)
+    finally:
+        service.shutdown()
+    rate = summary["reports"] / summary["seconds"] if summary["seconds"] > 0 else 0.0
+    print(
+        f"{summary['reports']} reports ({summary['rendered']} rendered, {summary['cached']} from cache) "
+        f"in {summary['seconds']:.1f}s ({rate:.0f}/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class Applicant(BaseModel):
+    income: float = 0
+    loan_amount: float = 0
+    cibil_score: float = 0
+    previous_loans: int = 0
+    missed_emis: int = 0
+    employment_type: str = "salaried"
+    debt_to_income: float = 0
+    age: int = 30
+    dependents: int = 0
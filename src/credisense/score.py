@@ -0,0 +1,312 @@
+import argparse
+import csv
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from .advisory import generate_advice_batch
+from .explainability import explain_batch
+from .ml_model import MODEL_PATH, ModelRegistry, explainable, predict_batch
+from .preprocessing import COLS_OUT, EXPECTED_COLS, preprocess_batch
+from .schemas import Applicant
+
+# Input rows per chunk handed to a worker
+CHUNK_SIZE = 10000
+
+FORMATS = ("csv", "jsonl")
+RESULT_FIELDS = ["label", "probability", "advice", "error"]
+
+# Per-process model state, filled by `_init_worker`
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(model_path: Optional[str]):
+    # Only the (memory-mapped, shared) compiled forest is loaded; --explain runs SHAP on it too
+    model, scorer, version = ModelRegistry(model_path, explain=False).snapshot()
+    _worker.update(model=model, scorer=scorer, version=version)
+
+
+def _detect_format(path: str, fmt: Optional[str]) -> str:
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}, got {fmt!r}")
+    return fmt
+
+
+def _read_chunks(path: str, fmt: str, chunk_size: int, skip: int) -> Iterator[Tuple[Optional[List[str]], list]]:
+    """Yield `(csv_header, rows)` chunks after skipping `skip` rows; rows stay unparsed for the workers."""
+    with open(path, newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+        if fmt == "csv":
+            rows = csv.reader(f)
+            header = next(rows, None) or []
+        else:
+            rows = (line for line in f if line.strip())
+            header = None
+        for _ in itertools.islice(rows, skip):
+            pass
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield header, chunk
+
+
+def _output_header(in_fmt: str, header: Optional[List[str]], explain: bool) -> List[str]:
+    # JSONL input has no header; CSV output then carries the applicant fields
+    base = header if in_fmt == "csv" else EXPECTED_COLS
+    return [h for h in base if h not in RESULT_FIELDS] + RESULT_FIELDS + (["top_features"] if explain else [])
+
+
+def _csv_line(values: List[str]) -> str:
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerow(values)
+    return buf.getvalue()
+
+
+def _parse(in_fmt: str, header: Optional[List[str]], rows: list) -> List[Tuple[Optional[Dict[str, Any]], Optional[Any]]]:
+    """Return `(record, error)` per row; `record` is None for unparseable JSONL lines."""
+    parsed = []
+    for row in rows:
+        if in_fmt == "csv":
+            # Empty CSV cells mean "not provided", so the request defaults apply
+            parsed.append(({k: v for k, v in zip(header, row) if v != ""}, None))
+            continue
+        try:
+            record = json.loads(row)
+        except ValueError as e:
+            parsed.append((None, [{"msg": f"invalid JSON: {e}"}]))
+            continue
+        if not isinstance(record, dict):
+            parsed.append((None, [{"msg": "expected a JSON object"}]))
+        else:
+            parsed.append((record, None))
+    return parsed
+
+
+def _score_chunk(in_fmt: str, header: Optional[List[str]], rows: list, out_fmt: str, explain: bool) -> Tuple[str, int, int]:
+    """Score one chunk and return `(serialized output, rows, errors)`.
+
+    Runs in a worker: validation, preprocessing, model, advice (and optionally
+    SHAP) are exactly those of `/predict/batch`.
+    """
+    parsed = _parse(in_fmt, header, rows)
+    valid, results = [], []
+    for i, (record, error) in enumerate(parsed):
+        result = {"error": error}
+        if error is None:
+            try:
+                valid.append((i, Applicant.parse_obj(record).dict()))
+            except ValidationError as e:
+                result["error"] = json.loads(e.json())
+        results.append(result)
+
+    if valid:
+        app_dicts = [d for _, d in valid]
+        X = preprocess_batch(app_dicts)
+        scored = predict_batch(_worker.get("scorer"), X.values)
+        advice = generate_advice_batch(app_dicts)
+        shap = explain_batch(explainable(_worker.get("model"), _worker.get("scorer")), X, feature_names=COLS_OUT, version=_worker.get("version")) if explain else None
+        for j, (i, _) in enumerate(valid):
+            label, proba = scored[j]
+            results[i].update(label=label, probability=proba, advice=advice[j])
+            if shap is not None:
+                results[i]["top_features"] = shap[j]["top_features"]
+
+    buf = io.StringIO()
+    if out_fmt == "jsonl":
+        for (record, _), result, row in zip(parsed, results, rows):
+            out = dict(record) if record is not None else {"input": row.strip()}
+            out.update((k, v) for k, v in result.items() if v is not None)
+            buf.write(json.dumps(out, default=str))
+            buf.write("\n")
+    else:
+        fields = _output_header(in_fmt, header, explain)
+        writer = csv.DictWriter(buf, fieldnames=fields, extrasaction="ignore", lineterminator="\n")
+        for (record, _), result, row in zip(parsed, results, rows):
+            out = dict(zip(header, row)) if in_fmt == "csv" else dict(record or {})
+            out.update(result)
+            out["advice"] = " | ".join(out.get("advice") or [])
+            for k in ("error", "top_features"):
+                if out.get(k) is not None:
+                    out[k] = json.dumps(out[k], default=str)
+            writer.writerow(out)
+    return buf.getvalue(), len(rows), sum(r["error"] is not None for r in results)
+
+
+def _input_stamp(path: str) -> Dict[str, Any]:
+    st = os.stat(path)
+    return {"input": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _read_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_checkpoint(path: str, data: Dict[str, Any]):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def score_file(
+    input_path: str,
+    output_path: str,
+    chunk_size: int = CHUNK_SIZE,
+    workers: Optional[int] = None,
+    model_path: Optional[str] = None,
+    in_format: Optional[str] = None,
+    out_format: Optional[str] = None,
+    explain: bool = False,
+    resume: bool = True,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Score every applicant in `input_path` and write results to `output_path` in input order.
+
+    The input is read lazily in `chunk_size` rows and at most two chunks per
+    worker are in flight, so memory does not grow with the file. After each
+    chunk is written, `<output>.ckpt` records the rows, errors and output bytes done;
+    a later run on the same input resumes from there (unless `resume=False`).
+    `workers=0` scores in the calling process. Returns rows and errors
+    (including those before a resume), seconds and rows per second for this
+    run. Raises FileNotFoundError, before the output is touched, if there is
+    no model to score with.
+    """
+    in_fmt = _detect_format(input_path, in_format)
+    out_fmt = _detect_format(output_path, out_format)
+    chunk_size = max(int(chunk_size), 1)
+    ckpt_path = output_path + ".ckpt"
+    stamp = dict(_input_stamp(input_path), in_format=in_fmt, out_format=out_fmt, explain=explain)
+    # The API falls back to a dummy answer without a model; a batch job must not
+    if ModelRegistry(model_path, explain=False).snapshot()[1] is None:
+        raise FileNotFoundError(f"No model artifact at {model_path or MODEL_PATH}")
+
+    ckpt = _read_checkpoint(ckpt_path) if resume else None
+    if ckpt is not None and all(ckpt.get(k) == v for k, v in stamp.items()) and os.path.exists(output_path):
+        skip, out_bytes, skip_errors = ckpt["rows"], ckpt["output_bytes"], ckpt.get("errors", 0)
+        out = open(output_path, "r+b")
+        # Drop anything written after the last checkpoint
+        out.truncate(out_bytes)
+        out.seek(out_bytes)
+    else:
+        skip, out_bytes, skip_errors = 0, 0, 0
+        out = open(output_path, "wb")
+
+    workers = (os.cpu_count() or 1) if workers is None else max(int(workers), 0)
+    executor = None
+    if workers > 0:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_path,),
+        )
+    else:
+        _init_worker(model_path)
+
+    rows_done, errors = skip, skip_errors
+    started = time.perf_counter()
+
+    def write(text: str, n: int, n_err: int):
+        nonlocal rows_done, errors, out_bytes
+        data = text.encode("utf-8")
+        out.write(data)
+        out.flush()
+        os.fsync(out.fileno())
+        out_bytes += len(data)
+        rows_done += n
+        errors += n_err
+        _write_checkpoint(ckpt_path, dict(stamp, rows=rows_done, errors=errors, output_bytes=out_bytes))
+        if progress is not None:
+            elapsed = time.perf_counter() - started
+            progress({"rows": rows_done, "errors": errors, "rows_per_second": (rows_done - skip) / elapsed if elapsed else 0.0})
+
+    try:
+        pending: deque = deque()
+        header_written = out_bytes > 0
+        for header, rows in _read_chunks(input_path, in_fmt, chunk_size, skip):
+            if not header_written:
+                if out_fmt == "csv":
+                    write(_csv_line(_output_header(in_fmt, header, explain)), 0, 0)
+                header_written = True
+            if executor is None:
+                write(*_score_chunk(in_fmt, header, rows, out_fmt, explain))
+                continue
+            pending.append(executor.submit(_score_chunk, in_fmt, header, rows, out_fmt, explain))
+            # Results are written strictly in submission order
+            while len(pending) >= workers * 2:
+                write(*pending.popleft().result())
+        while pending:
+            write(*pending.popleft().result())
+    finally:
+        out.close()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    if os.path.exists(ckpt_path):
+        os.remove(ckpt_path)
+    elapsed = time.perf_counter() - started
+    scored = rows_done - skip
+    return {
+        "rows": rows_done,
+        "resumed_from": skip,
+        "errors": errors,
+        "seconds": elapsed,
+        "rows_per_second": scored / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="credisense score", description="Score a CSV/JSONL file of applicants")
+    parser.add_argument("input", help="Applicants, one per CSV row or JSONL line")
+    parser.add_argument("output", help="Results file (.csv or .jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per worker task")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count; 0 = in-process)")
+    parser.add_argument("--model", default=MODEL_PATH, help="Path to the model artifact")
+    parser.add_argument("--input-format", choices=FORMATS, help="Default: from the file extension")
+    parser.add_argument("--output-format", choices=FORMATS, help="Default: from the file extension")
+    parser.add_argument("--explain", action="store_true", help="Add SHAP top features (much slower)")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore an existing checkpoint and start over")
+    args = parser.parse_args(argv)
+
+    def report(p):
+        print(f"{p['rows']} rows ({p['errors']} errors), {p['rows_per_second']:.0f} rows/s", file=sys.stderr)
+
+    try:
+        summary = score_file(
+            args.input,
+            args.output,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            model_path=args.model,
+            in_format=args.input_format,
+            out_format=args.output_format,
+            explain=args.explain,
+            resume=not args.no_resume,
+            progress=report,
+        )
+    except FileNotFoundError as e:
+        # a missing input or model; exit non-zero without a traceback
+        sys.exit(f"credisense score: {e}")
+    resumed = f", resumed after {summary['resumed_from']}" if summary["resumed_from"] else ""
+    print(
+        f"Scored {summary['rows']} rows ({summary['errors']} errors{resumed}) in {summary['seconds']:.1f}s "
+        f"({summary['rows_per_second']:.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,31 @@
 import os
+import time
+from typing import Any, Dict, Optional
 import joblib
-import pandas as pd
+import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
-from .database import get_batch_count, reset_batch_count, init_db, DB_PATH, log_retraining
-from .preprocessing import preprocess
+from .database import claim_batch, release_batch, init_db, DB_PATH, log_retraining
+from .feature_cache import FeatureCache
+from .metrics import record_retrain
+from .model_store import publish_model, try_lock
+from .preprocessing import COLS_OUT
 
 MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "models"))
 MODEL_PATH = os.path.join(MODEL_DIR, "model.joblib")
 
+# Trees in a fully refitted forest and trees added per incremental batch
+N_ESTIMATORS = 50
+TREES_PER_BATCH = 10
+# Incremental runs fall back to a full refit once the forest would exceed this
+MAX_TREES = 500
+# Cores used to fit trees (-1 = all)
+N_JOBS = int(os.environ.get("CREDISENSE_TRAIN_N_JOBS", "-1"))
+# "full" refits every tree; "incremental" adds warm-started trees for new rows
+TRAIN_MODE = os.environ.get("CREDISENSE_TRAIN_MODE", "full")
+
 
 def _ensure_dirs():
     os.makedirs(MODEL_DIR, exist_ok=True)
@@ -21,53 +36,129 @@ def retrain_if_needed(db_path: str = None, batch_threshold: int = 30) -> bool:
 
     Returns True if retraining occurred.
     """
-    dbp = db_path or DB_PATH
-    init_db(dbp)
-    count = get_batch_count(dbp)
-    if count < batch_threshold:
-        return False
-
-    # Load training data rows
-    import sqlite3
-
-    conn = sqlite3.connect(dbp)
-    cur = conn.cursor()
-    cur.execute("SELECT payload FROM training_data")
-    rows = cur.fetchall()
-    conn.close()
-
-    # Convert JSON payloads into DataFrame
-    import json
-
-    payloads = [json.loads(r[0]) for r in rows]
-    if not payloads:
-        reset_batch_count(dbp)
-        return False
-
-    df = pd.DataFrame(payloads)
-    # Preprocess each row via preprocess (which returns a DataFrame)
-    Xs = []
-    for row in df.to_dict(orient="records"):
-        Xs.append(preprocess(row).iloc[0].values)
-
-    X = pd.DataFrame(Xs)
-
-    # Fake label if not present: here we'll try to use 'label' column if present
-    if "label" in df.columns:
-        y = df["label"].astype(int)
-    else:
-        # No labels: create proxy using cibil_score > 650
-        y = (df.get("cibil_score", pd.Series([0]*len(df))) > 650).astype(int)
-
-    # Train a simple pipeline
-    _ensure_dirs()
-    pipe = Pipeline([("scaler", StandardScaler()), ("clf", RandomForestClassifier(n_estimators=50, random_state=42))])
+    result = retrain(db_path, batch_threshold)
+    record_retrain(result)
+    return result is not None
+
+
+def _load_incremental_base():
+    """Return the deployed scaler/forest pipeline if it can be warm-started, else None."""
+    if not os.path.exists(MODEL_PATH):
+        return None
+    try:
+        pipe = joblib.load(MODEL_PATH)
+    except Exception:
+        return None
+    steps = dict(getattr(pipe, "steps", []))
+    if not isinstance(steps.get("clf"), RandomForestClassifier) or "scaler" not in steps:
+        return None
+    return pipe
+
+
+def _fit_full(X, y, n_jobs: int) -> Pipeline:
+    pipe = Pipeline(
+        [("scaler", StandardScaler()), ("clf", RandomForestClassifier(n_estimators=N_ESTIMATORS, random_state=42, n_jobs=n_jobs))]
+    )
     X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
     pipe.fit(X_train, y_train)
+    return pipe
+
 
-    joblib.dump(pipe, MODEL_PATH)
+def _fit_incremental(pipe: Pipeline, X_new, y_new, n_jobs: int) -> Optional[int]:
+    """Add warm-started trees fitted on the new rows only; return trees added or None if not possible.
 
-    # Reset batch counter and log
-    reset_batch_count(dbp)
-    log_retraining(len(payloads), model_version="v1", db_path=dbp)
-    return True
+    The fitted scaler is kept as is so existing trees keep seeing the same inputs.
+    """
+    clf = pipe.named_steps["clf"]
+    if len(X_new) < 2 or set(np.unique(y_new)) != set(clf.classes_):
+        return None
+    if clf.n_estimators + TREES_PER_BATCH > MAX_TREES:
+        return None
+    X_train, X_val, y_train, y_val = train_test_split(X_new, y_new, test_size=0.2, random_state=42)
+    if set(np.unique(y_train)) != set(clf.classes_):
+        return None
+    clf.set_params(warm_start=True, n_estimators=clf.n_estimators + TREES_PER_BATCH, n_jobs=n_jobs)
+    clf.fit(pipe.named_steps["scaler"].transform(X_train), y_train)
+    clf.set_params(warm_start=False)
+    return TREES_PER_BATCH
+
+
+def retrain(db_path: str = None, batch_threshold: int = 30, mode: Optional[str] = None, n_jobs: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Like `retrain_if_needed`, but return details of the run.
+
+    `mode` is "full" (refit every tree) or "incremental" (warm-start the
+    deployed forest with `TREES_PER_BATCH` trees fitted on rows added since the
+    last run; falls back to a full refit when that is not possible). Returns
+    `{"num_records", "mode", "wall_seconds", "trees_added", "stages", "version"}`
+    if a model was trained, otherwise None; `stages` maps featurize/fit/save to
+    seconds (see `metrics.record_retrain`).
+
+    Safe to call from several processes: a lock file in `MODEL_DIR` lets one
+    retrain run at a time (others return None at once), the batch count is
+    claimed atomically, and the model is published as a new version (see
+    `model_store.publish_model`).
+    """
+    mode = mode or TRAIN_MODE
+    n_jobs = N_JOBS if n_jobs is None else n_jobs
+    dbp = db_path or DB_PATH
+    init_db(dbp)
+    _ensure_dirs()
+    with try_lock(os.path.join(MODEL_DIR, "retrain.lock")) as locked:
+        if not locked:
+            return None
+        claimed = claim_batch(batch_threshold, dbp)
+        if claimed is None:
+            return None
+        try:
+            result = _retrain_claimed(dbp, mode, n_jobs)
+        except BaseException:
+            release_batch(claimed, dbp)
+            raise
+        if result is None:
+            # nothing was trained; the claimed records still count toward the next run
+            release_batch(claimed, dbp)
+        return result
+
+
+def _retrain_claimed(dbp: str, mode: str, n_jobs: int) -> Optional[Dict[str, Any]]:
+    # Featurize only rows added since the last run; the full matrix is memory-mapped
+    t0 = time.perf_counter()
+    cache = FeatureCache(os.path.join(MODEL_DIR, "feature_cache"))
+    X, labels = cache.update(dbp)
+    stages = {"featurize": time.perf_counter() - t0}
+    if len(X) == 0:
+        return None
+
+    # Use 'label' where records carry one; otherwise a proxy of cibil_score > 650
+    proxy = (X[:, COLS_OUT.index("cibil_score")] > 650).astype(int)
+    has_label = ~np.isnan(labels)
+    y = np.where(has_label, labels, proxy).astype(int) if has_label.any() else proxy
+
+    start = time.perf_counter()
+    pipe, trees_added, used_mode = None, None, "full"
+    if mode == "incremental" and cache.new_rows < len(X):
+        pipe = _load_incremental_base()
+        if pipe is not None:
+            new = slice(len(X) - cache.new_rows, len(X))
+            trees_added = _fit_incremental(pipe, X[new], y[new], n_jobs)
+            used_mode = "incremental"
+    if trees_added is None:
+        pipe = _fit_full(X, y, n_jobs)
+        trees_added = pipe.named_steps["clf"].n_estimators
+        used_mode = "full"
+    stages["fit"] = time.perf_counter() - start
+
+    t0 = time.perf_counter()
+    version = publish_model(pipe, MODEL_PATH)
+    stages["save"] = time.perf_counter() - t0
+    wall = time.perf_counter() - start
+
+    log_retraining(len(X), model_version=version, db_path=dbp, mode=used_mode, wall_seconds=wall, trees_added=trees_added)
+    return {
+        "num_records": len(X),
+        "mode": used_mode,
+        "wall_seconds": wall,
+        "trees_added": trees_added,
+        "stages": stages,
+        "version": version,
+    }
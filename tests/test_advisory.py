@@ -21,3 +21,33 @@ def test_advice_high_dti_and_missed():
     adv = generate_advice(applicant)
     assert any("debt-to-income" in a for a in adv)
     assert any("missed EMIs" in a for a in adv)
+
+
+def test_batch_matches_single_and_accepts_dataframes():
+    import pandas as pd
+    from credisense.advisory import generate_advice_batch
+
+    applicants = [
+        {"cibil_score": 680, "debt_to_income": 0.5, "income": 10000, "loan_amount": 600000},
+        {"cibil_score": 780, "income": 90000, "loan_amount": 10000},
+        {"cibil_score": "", "missed_emis": None},
+        {"cibil_score": 720, "debt_to_income_ratio": 0.7},
+    ]
+    batch = generate_advice_batch(applicants)
+    assert batch == [generate_advice(a) for a in applicants]
+    assert generate_advice_batch(pd.DataFrame(applicants)) == batch
+    assert batch[1] == ["No major issues detected — maintain current profile and repayment discipline."]
+    # the server's field name is accepted as an alias
+    assert any("debt-to-income" in a for a in batch[3])
+
+
+def test_rule_table_loaded_from_json(tmp_path):
+    from credisense.advisory import DEFAULT_RULES, generate_advice_batch, load_rules
+
+    table = json.loads(json.dumps(DEFAULT_RULES))
+    table["rules"][0]["when"] = [["cibil_score", "<", 750]]
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(table))
+    rules = load_rules(str(path))
+    adv = generate_advice_batch([{"cibil_score": 720, "income": 50000}], rules=rules)[0]
+    assert any("Improve your CIBIL" in a for a in adv)
@@ -0,0 +1,67 @@
+import os
+import sys
+import threading
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense.batching import MicroBatcher
+from credisense.ml_model import predict_batch
+
+
+class _SumModel:
+    def predict_proba(self, X):
+        p = np.clip(X.sum(axis=1) / 10.0, 0, 1)
+        return np.column_stack([1 - p, p])
+
+
+def test_concurrent_requests_are_coalesced():
+    calls = []
+
+    def predict_fn(model, X):
+        calls.append(len(X))
+        return predict_batch(model, X)
+
+    batcher = MicroBatcher(window_ms=100, max_batch_size=8, predict_fn=predict_fn)
+    model = _SumModel()
+    results = {}
+    barrier = threading.Barrier(8)
+
+    def worker(i):
+        barrier.wait()
+        results[i] = batcher.submit(model, [i * 0.1, 0.0])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert sum(calls) == 8
+    assert len(calls) < 8
+    for i in range(8):
+        assert abs(results[i][1] - i * 0.01) < 1e-12
+
+    stats = batcher.stats()
+    assert stats["items"] == 8
+    assert stats["batches"] == len(calls)
+    assert stats["max_queue_wait_ms"] >= 0.0
+
+
+def test_errors_are_returned_to_waiting_callers():
+    def predict_fn(model, X):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(window_ms=0, predict_fn=predict_fn)
+    try:
+        batcher.submit(None, [1.0])
+    except RuntimeError as e:
+        assert "boom" in str(e)
+    else:
+        raise AssertionError("expected RuntimeError")
+    finally:
+        batcher.close()
@@ -0,0 +1,43 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import bench_pipeline
+
+
+def test_benchmark_report_and_baseline_comparison(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench_pipeline, "TRAIN_ROWS", 60)
+    paths = (bench_pipeline.training.MODEL_DIR, bench_pipeline.training.MODEL_PATH, bench_pipeline.ml_model.MODEL_PATH)
+    for _ in range(2):
+        # a second run in the same workdir reuses its directories
+        report = bench_pipeline.run_benchmarks(
+            sizes=[1, 5], only=["preprocess", "predict", "generate_advice", "load_model"], min_time=0.001, repeat=1, workdir=str(tmp_path)
+        )
+    # the bench's scratch model paths do not leak into later tests
+    assert (bench_pipeline.training.MODEL_DIR, bench_pipeline.training.MODEL_PATH, bench_pipeline.ml_model.MODEL_PATH) == paths
+    assert set(report["results"]) == {
+        "preprocess[n=1]", "predict[n=1]", "generate_advice[n=1]", "load_model[n=1]",
+        "preprocess[n=5]", "predict[n=5]", "generate_advice[n=5]",
+    }
+    assert all(r["median_s"] > 0 for r in report["results"].values())
+
+    slower = {"results": {k: dict(v, median_s=v["median_s"] / 2) for k, v in report["results"].items()}}
+    rows = bench_pipeline.compare(report, slower, threshold=0.2)
+    assert len(rows) == 7 and all(r["regressed"] for r in rows)
+    assert not any(r["regressed"] for r in bench_pipeline.compare(report, report, threshold=0.2))
+
+
+def test_server_inference_benchmark(tmp_path):
+    import bench_server_inference
+
+    res = bench_server_inference.run(train_rows=60, min_time=0.001, repeat=1, workdir=str(tmp_path))
+    assert res["before_ms"] > 0 and res["after_ms"] > 0 and res["speedup"] > 0
+
+
+def test_model_memory_benchmark(tmp_path):
+    import bench_model_memory
+
+    report = bench_model_memory.run(workers=2, trees=3, train_rows=200, score_rows=50, modes=["mmap", "server"], workdir=str(tmp_path))
+    assert report["compiled_mb"] > 0 and all(report["modes"][m]["load_seconds"] > 0 for m in ("mmap", "server"))
@@ -0,0 +1,142 @@
+import os
+import sys
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense.compiled_forest import CompiledForest, compile_model, compiled_path, export_compiled, load_compiled
+from credisense.ml_model import ModelRegistry, predict_batch
+
+
+def _data(n, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4)) * [50000.0, 80.0, 2.0, 0.2] + [400000.0, 680.0, 1.0, 0.3]
+    y = (X[:, 1] + rng.normal(scale=30.0, size=n) > 690).astype(int)
+    return X, y
+
+
+def _pipeline():
+    X, y = _data(500, 0)
+    return Pipeline(
+        [("scaler", StandardScaler()), ("clf", RandomForestClassifier(n_estimators=15, random_state=0, n_jobs=1))]
+    ).fit(X, y)
+
+
+def test_probability_parity_with_sklearn():
+    pipe = _pipeline()
+    forest = compile_model(pipe)
+    X, _ = _data(2000, 1)
+    np.testing.assert_allclose(forest.predict_proba(X), pipe.predict_proba(X), rtol=0, atol=1e-12)
+    assert (forest.predict(X) == pipe.predict(X)).all()
+
+
+def test_parity_when_scaler_skips_mean_or_std():
+    X, y = _data(500, 0)
+    Xt, _ = _data(1000, 1)
+    for scaler in (StandardScaler(with_mean=False), StandardScaler(with_std=False), StandardScaler(with_mean=False, with_std=False)):
+        pipe = Pipeline([("scaler", scaler), ("clf", RandomForestClassifier(n_estimators=10, random_state=0, n_jobs=1))]).fit(X, y)
+        np.testing.assert_allclose(compile_model(pipe).predict_proba(Xt), pipe.predict_proba(Xt), rtol=0, atol=1e-12)
+
+
+def test_parity_at_split_boundaries():
+    # Rows sitting exactly on (and one ulp either side of) each unscaled split point
+    pipe = _pipeline()
+    scaler, clf = pipe.named_steps["scaler"], pipe.named_steps["clf"]
+    forest = compile_model(pipe)
+    base, _ = _data(1, 2)
+    rows = []
+    for est in clf.estimators_[:3]:
+        tree = est.tree_
+        for node in np.flatnonzero(tree.children_left != -1):
+            f = tree.feature[node]
+            edge = tree.threshold[node] * scaler.scale_[f] + scaler.mean_[f]
+            for v in (np.nextafter(edge, -np.inf), edge, np.nextafter(edge, np.inf)):
+                row = base[0].copy()
+                row[f] = v
+                rows.append(row)
+    X = np.array(rows)
+    np.testing.assert_allclose(forest.predict_proba(X), pipe.predict_proba(X), rtol=0, atol=1e-12)
+
+
+def test_unsupported_models_are_not_compiled():
+    X, y = _data(50, 3)
+    assert compile_model(LogisticRegression().fit(X, y)) is None
+    assert compile_model(RandomForestClassifier(n_estimators=2)) is None
+
+
+def test_export_round_trip_and_stale_detection(tmp_path):
+    pipe = _pipeline()
+    model_path = str(tmp_path / "model.joblib")
+    joblib.dump(pipe, model_path)
+    assert export_compiled(pipe, model_path) == compiled_path(model_path)
+
+    st = os.stat(model_path)
+    loaded = load_compiled(model_path, expected_stamp=(st.st_mtime_ns, st.st_size))
+    assert isinstance(loaded, CompiledForest)
+    X, _ = _data(100, 4)
+    np.testing.assert_allclose(loaded.predict_proba(X), pipe.predict_proba(X), rtol=0, atol=1e-12)
+    # An export written for a different artifact is ignored
+    assert load_compiled(model_path, expected_stamp=(st.st_mtime_ns + 1, st.st_size)) is None
+
+
+def test_registry_scores_with_compiled_forest(tmp_path):
+    pipe = _pipeline()
+    model_path = str(tmp_path / "model.joblib")
+    joblib.dump(pipe, model_path)
+    export_compiled(pipe, model_path)
+
+    model, scorer, version = ModelRegistry(model_path).snapshot()
+    assert isinstance(scorer, CompiledForest)
+    assert isinstance(model, Pipeline) and version is not None
+    X, _ = _data(20, 5)
+    assert predict_batch(scorer, X) == predict_batch(model, X)
+
+
+def test_compiled_forest_is_memory_mapped_read_only(tmp_path):
+    pipe = _pipeline()
+    model_path = str(tmp_path / "model.joblib")
+    joblib.dump(pipe, model_path)
+    export_compiled(pipe, model_path)
+
+    mapped, _ = CompiledForest.load(compiled_path(model_path))
+    in_memory, _ = CompiledForest.load(compiled_path(model_path), mmap_mode=None)
+    # large arrays share the page cache; writes to them would be rejected
+    assert any(isinstance(a.base, np.memmap) for a in vars(mapped).values() if isinstance(a, np.ndarray))
+    assert not any(a.flags.writeable for a in vars(mapped).values() if isinstance(a, np.ndarray) and isinstance(a.base, np.memmap))
+    X, _ = _data(200, 6)
+    np.testing.assert_array_equal(mapped.predict_proba(X), in_memory.predict_proba(X))
+
+    # scoring-only registries never unpickle the sklearn model
+    model, scorer, version = ModelRegistry(model_path, explain=False).snapshot()
+    assert model is None and isinstance(scorer, CompiledForest) and version is not None
+
+
+def test_shap_on_compiled_forest_matches_sklearn(tmp_path):
+    from credisense.explainability import clear_explainer_cache, explain_batch, get_explainer
+    from credisense.ml_model import explainable
+
+    pipe = _pipeline()
+    model_path = str(tmp_path / "model.joblib")
+    joblib.dump(pipe, model_path)
+    export_compiled(pipe, model_path)
+    model, scorer, version = ModelRegistry(model_path, explain=False).snapshot()
+    assert explainable(model, scorer) is scorer
+
+    X, _ = _data(30, 7)
+    clear_explainer_cache()
+    expected = explain_batch(pipe, X)
+    clear_explainer_cache()
+    got = explain_batch(scorer, X, version=version)
+    np.testing.assert_allclose([r["raw"] for r in got], [r["raw"] for r in expected], rtol=0, atol=1e-12)
+    # the explainer reads the mapped file rather than a private copy of the trees
+    _, shap_explainer = get_explainer(scorer, version)
+    assert isinstance(shap_explainer.model.values.base, np.memmap)
+    clear_explainer_cache()
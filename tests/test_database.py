@@ -0,0 +1,44 @@
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import database
+
+
+def test_pooled_connection_is_reused_and_uses_wal(tmp_path):
+    db_file = str(tmp_path / "pool.db")
+    database.init_db(db_file)
+    conn = database.get_connection(db_file)
+    assert database.get_connection(db_file) is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(database.get_connection(db_file)))
+    t.start()
+    t.join()
+    assert other[0] is not conn
+
+
+def test_transaction_rolls_back_on_error(tmp_path):
+    db_file = str(tmp_path / "tx.db")
+    database.init_db(db_file)
+
+    with pytest.raises(RuntimeError):
+        with database.transaction(db_file) as conn:
+            conn.execute("INSERT INTO applicants (income) VALUES (1)")
+            with database.transaction(db_file) as inner:
+                inner.execute("INSERT INTO applicants (income) VALUES (1)")
+            raise RuntimeError("abort")
+
+    count = database.get_connection(db_file).execute("SELECT count(*) FROM applicants").fetchone()[0]
+    assert count == 0
+
+    database.insert_applicant({"income": 1}, db_path=db_file)
+    database.add_training_record({"income": 1}, db_path=db_file)
+    assert database.get_batch_count(db_file) == 1
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import explainability
+
+
+def _pipeline(seed=0):
+    rng = np.random.RandomState(seed)
+    X = rng.rand(60, 4)
+    y = (X[:, 0] > 0.5).astype(int)
+    pipe = Pipeline([("scaler", StandardScaler()), ("clf", RandomForestClassifier(n_estimators=5, random_state=seed))])
+    return pipe.fit(X, y), X
+
+
+def test_explainer_cached_per_model_version():
+    explainability.clear_explainer_cache()
+    model, _ = _pipeline()
+    e1 = explainability.get_explainer(model, version="a")
+    assert e1 is not None
+    assert explainability.get_explainer(model, version="a") is e1
+    # a new version (model swap) drops the old explainer
+    assert explainability.get_explainer(model, version="b") is not e1
+
+
+def test_explain_batch_matches_single_row():
+    explainability.clear_explainer_cache()
+    model, X = _pipeline()
+    names = ["a", "b", "c", "d"]
+    batch = explainability.explain_batch(model, X[:5], feature_names=names, version="v")
+    assert len(batch) == 5
+    for i, expl in enumerate(batch):
+        single = explainability.explain_model(model, X[i : i + 1], feature_names=names, version="v")
+        np.testing.assert_allclose(expl["raw"], single["raw"])
+        assert len(expl["top_features"]) == 4
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import database, feature_cache
+from credisense.preprocessing import preprocess_batch
+
+
+def _records(start, n):
+    return [{"income": 20000 + i * 1000, "loan_amount": 100000 + i, "cibil_score": 600 + i, "label": i % 2} for i in range(start, start + n)]
+
+
+def test_incremental_update_featurizes_only_new_rows(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "fc.db")
+    database.init_db(db_file)
+    for r in _records(0, 5):
+        database.add_training_record(r, db_path=db_file)
+
+    cache = feature_cache.FeatureCache(str(tmp_path / "cache"))
+    X, labels = cache.update(db_file)
+    assert X.shape == (5, 11)
+
+    # count featurized rows; keep the spec hash of the unpatched code
+    spec = feature_cache.feature_spec_hash()
+    monkeypatch.setattr(feature_cache, "feature_spec_hash", lambda: spec)
+    seen = []
+    real = feature_cache.preprocessing.preprocess_batch
+    monkeypatch.setattr(feature_cache.preprocessing, "preprocess_batch", lambda df: seen.append(len(df)) or real(df))
+    for r in _records(5, 3):
+        database.add_training_record(r, db_path=db_file)
+    X, labels = cache.update(db_file)
+
+    assert seen == [3]
+    assert isinstance(X, np.memmap)
+    expected = preprocess_batch(_records(0, 8)).to_numpy(dtype=float)
+    np.testing.assert_array_equal(np.asarray(X), expected)
+    np.testing.assert_array_equal(np.asarray(labels), [i % 2 for i in range(8)])
+
+
+def test_spec_change_rebuilds_cache(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "fc_spec.db")
+    database.init_db(db_file)
+    for r in _records(0, 4):
+        database.add_training_record(r, db_path=db_file)
+    cache = feature_cache.FeatureCache(str(tmp_path / "cache"))
+    cache.update(db_file)
+
+    seen = []
+    real = feature_cache.preprocessing.preprocess_batch
+    monkeypatch.setattr(feature_cache.preprocessing, "preprocess_batch", lambda df: seen.append(len(df)) or real(df))
+    monkeypatch.setattr(feature_cache, "feature_spec_hash", lambda: "changed")
+    X, _ = cache.update(db_file)
+    assert seen == [4]
+    assert X.shape == (4, 11)
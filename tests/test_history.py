@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import app as app_module, database
+
+
+def _seed(db_file):
+    database.init_db(db_file)
+    aid = database.insert_applicant({"income": 1000}, db_file)
+    with database.transaction(db_file) as conn:
+        for i in range(7):
+            # two predictions share a timestamp, so pages must break ties by id
+            created = "2026-01-0%d 00:00:00" % (1 + min(i, 5))
+            conn.execute(
+                "INSERT INTO predictions (applicant_id, label, probability, shap_summary, created_at) VALUES (?, ?, ?, ?, ?)",
+                (aid if i % 2 == 0 else aid + 1, "Eligible", i / 10, "{}", created),
+            )
+    return aid
+
+
+def test_keyset_pages_use_indexes_and_cover_window(tmp_path):
+    db_file = str(tmp_path / "history.db")
+    aid = _seed(db_file)
+    names = {r[1] for r in database.get_connection(db_file).execute("PRAGMA index_list(predictions)")}
+    assert {"idx_predictions_applicant", "idx_predictions_created"} <= names
+
+    items, after = database.fetch_applicant_predictions(aid, limit=3, db_path=db_file)
+    assert [r["prediction_id"] for r in items] == [1, 3, 5] and after == 5
+    items, after = database.fetch_applicant_predictions(aid, after_id=after, limit=3, db_path=db_file)
+    assert [r["prediction_id"] for r in items] == [7] and after is None
+    assert items[0]["applicant"] == {"income": 1000}
+
+    seen, cursor = [], None
+    while True:
+        items, cursor = database.fetch_predictions_page("2026-01-02", "2026-01-07", cursor=cursor, limit=2, db_path=db_file)
+        seen += [r["prediction_id"] for r in items]
+        if cursor is None:
+            break
+    assert seen == [2, 3, 4, 5, 6, 7]
+    assert [r["prediction_id"] for chunk in database.iter_prediction_records("2026-01-02", "2026-01-07", db_file, chunk_rows=4) for r in chunk] == seen
+    with pytest.raises(ValueError):
+        database.fetch_predictions_page(cursor="not-a-cursor", db_path=db_file)
+
+
+def test_history_endpoints_and_ndjson_export(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "history.db")
+    aid = _seed(db_file)
+    monkeypatch.setattr(database, "DB_PATH", db_file)
+    client = TestClient(app_module.app)
+
+    body = client.get(f"/applicants/{aid}/predictions", params={"limit": 2}).json()
+    assert [r["prediction_id"] for r in body["items"]] == [1, 3] and body["next_after"] == 3
+
+    page = client.get("/predictions", params={"start": "2026-01-03", "limit": 3}).json()
+    assert [r["prediction_id"] for r in page["items"]] == [3, 4, 5]
+    page = client.get("/predictions", params={"start": "2026-01-03", "cursor": page["next_cursor"]}).json()
+    assert [r["prediction_id"] for r in page["items"]] == [6, 7] and page["next_cursor"] is None
+    assert client.get("/predictions", params={"cursor": "bogus"}).status_code == 400
+
+    resp = client.get("/predictions/export", params={"end": "2026-01-03"})
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["prediction_id"] for line in resp.text.splitlines()] == [1, 2]
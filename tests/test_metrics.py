@@ -0,0 +1,74 @@
+import os
+import sys
+
+import joblib
+import numpy as np
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import app as app_module, database
+from credisense.metrics import Metrics, metrics, record_retrain
+from credisense.ml_model import ModelRegistry
+
+
+def test_histogram_buckets_and_text_format():
+    m = Metrics(buckets=(0.01, 0.1, 1.0))
+    m.observe("predict", "inference", 0.005)
+    m.observe("predict", "inference", 0.05)
+    m.observe("predict", "inference", 5.0)
+    m.inc("credisense_records_ingested", help="Records", source="api")
+    m.set_info("credisense_model", help="Model", version="abc")
+
+    lines = m.render().splitlines()
+    assert "# TYPE credisense_stage_seconds histogram" in lines
+    prefix = 'credisense_stage_seconds_bucket{endpoint="predict",stage="inference",'
+    assert prefix + 'le="0.01"} 1' in lines
+    assert prefix + 'le="0.1"} 2' in lines
+    assert prefix + 'le="1.0"} 2' in lines
+    assert prefix + 'le="+Inf"} 3' in lines
+    assert 'credisense_stage_seconds_count{endpoint="predict",stage="inference"} 3' in lines
+    assert 'credisense_records_ingested_total{source="api"} 1' in lines
+    assert 'credisense_model_info{version="abc"} 1' in lines
+
+
+def test_timer_sinks_and_record_retrain():
+    m = Metrics()
+    seen = []
+    m.add_sink(lambda kind, name, labels, value: seen.append((kind, name, labels)))
+    with m.time("predict", "explain"):
+        pass
+    assert seen == [("histogram", "credisense_stage_seconds", {"endpoint": "predict", "stage": "explain"})]
+
+    metrics.reset()
+    record_retrain({"mode": "incremental", "stages": {"featurize": 0.2, "fit": 1.5, "save": 0.1}})
+    record_retrain(None)
+    text = metrics.render()
+    assert 'credisense_stage_seconds_count{endpoint="retrain",stage="fit"} 1' in text
+    assert 'credisense_retrains_total{mode="incremental"} 1' in text
+
+
+def test_metrics_endpoint_reports_predict_stages(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "credisense.db")
+    database.init_db(db_file)
+    monkeypatch.setattr(database, "DB_PATH", db_file)
+    rng = np.random.RandomState(0)
+    X = rng.rand(80, 11) * 1000
+    pipe = Pipeline([("scaler", StandardScaler()), ("clf", RandomForestClassifier(n_estimators=5, random_state=0))])
+    model_path = str(tmp_path / "model.joblib")
+    joblib.dump(pipe.fit(X, (X[:, 2] > 500).astype(int)), model_path)
+    monkeypatch.setattr(app_module, "registry", ModelRegistry(model_path))
+    metrics.reset()
+
+    client = TestClient(app_module.app)
+    assert client.post("/predict", json={"income": 50000, "loan_amount": 200000, "cibil_score": 680}).status_code == 200
+    resp = client.get("/metrics")
+    assert resp.status_code == 200 and resp.headers["content-type"].startswith("text/plain")
+    for stage in ("db_insert", "preprocess", "model_load", "inference", "explain", "advice", "db_write"):
+        assert f'credisense_stage_seconds_count{{endpoint="predict",stage="{stage}"}} 1' in resp.text
+    assert "credisense_model_info{version=" in resp.text
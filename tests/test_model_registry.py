@@ -0,0 +1,42 @@
+import os
+import sys
+
+import joblib
+from sklearn.linear_model import LogisticRegression
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense.ml_model import ModelRegistry
+
+
+def _dump(path, C=1.0):
+    model = LogisticRegression(C=C).fit([[0.0], [1.0], [2.0], [3.0]], [0, 0, 1, 1])
+    joblib.dump(model, path)
+
+
+def test_registry_missing_artifact(tmp_path):
+    reg = ModelRegistry(str(tmp_path / "model.joblib"))
+    assert reg.get_with_version() == (None, None)
+
+
+def test_registry_loads_once_and_reloads_on_change(tmp_path):
+    path = str(tmp_path / "model.joblib")
+    _dump(path)
+    reg = ModelRegistry(path)
+
+    m1, v1 = reg.get_with_version()
+    assert m1 is not None and v1 is not None
+    # same artifact -> same object, no reload
+    assert reg.get() is m1
+
+    _dump(path, C=0.5)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    m2, v2 = reg.get_with_version()
+    assert m2 is not m1
+    assert v2 != v1
+    assert m2.C == 0.5
+    assert reg.version == v2
@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+import sys
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import database, model_store, training
+from credisense.compiled_forest import compiled_path, load_compiled
+from credisense.ml_model import ModelRegistry
+
+
+def _pipe(seed):
+    rng = np.random.RandomState(seed)
+    X = rng.rand(60, 11)
+    return Pipeline([("scaler", StandardScaler()), ("clf", RandomForestClassifier(n_estimators=3, random_state=seed))]).fit(X, X[:, 2] > 0.5)
+
+
+def test_publish_swaps_live_files_and_prunes_versions(tmp_path):
+    live = str(tmp_path / "models" / "model.joblib")
+    registry = ModelRegistry(live)
+    versions = [model_store.publish_model(_pipe(i), live, keep=2) for i in range(3)]
+
+    assert model_store.list_versions(live) == versions[1:]
+    assert not [n for n in os.listdir(tmp_path / "models") if n.endswith(".tmp")]
+    # the live pickle is the newest version and its compiled copy still matches it
+    assert joblib.load(live).named_steps["clf"].random_state == 2
+    st = os.stat(live)
+    assert load_compiled(live, expected_stamp=(st.st_mtime_ns, st.st_size)) is not None
+    assert os.path.exists(compiled_path(live))
+
+    # the registry reports the published name, including after a rollback
+    assert registry.get_with_version()[1] == versions[2] == model_store.live_version(live)
+    model_store.activate(live, versions[1])
+    assert registry.get().named_steps["clf"].random_state == 1
+    assert registry.version == versions[1]
+
+
+def _hold_lock(path, ready, release):
+    with model_store.try_lock(path) as locked:
+        assert locked
+        ready.set()
+        release.wait(10)
+
+
+def test_retrain_lock_is_exclusive_across_processes(tmp_path):
+    path = str(tmp_path / "retrain.lock")
+    ctx = multiprocessing.get_context("spawn")
+    ready, release = ctx.Event(), ctx.Event()
+    holder = ctx.Process(target=_hold_lock, args=(path, ready, release))
+    holder.start()
+    try:
+        assert ready.wait(30)
+        with model_store.try_lock(path) as locked:
+            assert locked is False
+    finally:
+        release.set()
+        holder.join(30)
+    with model_store.try_lock(path) as locked:
+        assert locked is True
+
+
+def test_claim_batch_is_taken_once_and_survives_failed_retrain(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "claim.db")
+    database.init_db(db_file)
+    for i in range(5):
+        database.add_training_record({"cibil_score": 600 + 20 * i, "income": 30000}, db_path=db_file)
+
+    assert database.claim_batch(10, db_file) is None
+    assert database.claim_batch(5, db_file) == 5
+    assert database.claim_batch(5, db_file) is None
+    assert database.get_batch_count(db_file) == 0
+    database.release_batch(5, db_file)
+
+    monkeypatch.setattr(training, "MODEL_DIR", str(tmp_path / "models"))
+    monkeypatch.setattr(training, "MODEL_PATH", str(tmp_path / "models" / "model.joblib"))
+
+    def boom(*args):
+        raise RuntimeError("fit failed")
+
+    with monkeypatch.context() as m:
+        m.setattr(training, "_retrain_claimed", boom)
+        with pytest.raises(RuntimeError):
+            training.retrain(db_file, batch_threshold=5)
+    # the claimed records go back to the counter for the next attempt
+    assert database.get_batch_count(db_file) == 5
+    with monkeypatch.context() as m:
+        # ... also when there turned out to be nothing to train on
+        m.setattr(training, "_retrain_claimed", lambda *args: None)
+        assert training.retrain(db_file, batch_threshold=5) is None
+    assert database.get_batch_count(db_file) == 5
+
+    # while another process holds the lock, a retrain is skipped and claims nothing
+    with model_store.try_lock(os.path.join(training.MODEL_DIR, "retrain.lock")) as locked:
+        assert locked
+        assert training.retrain(db_file, batch_threshold=5) is None
+    assert database.get_batch_count(db_file) == 5
+
+    result = training.retrain(db_file, batch_threshold=5)
+    assert result["version"] == model_store.list_versions(training.MODEL_PATH)[-1]
+    assert database.get_batch_count(db_file) == 0
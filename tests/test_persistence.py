@@ -0,0 +1,69 @@
+import os
+import sys
+import threading
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import database
+from credisense.persistence import WriteBehindWriter
+
+
+def _counts(db_file):
+    conn = database.get_connection(db_file)
+    return (
+        conn.execute("SELECT count(*) FROM applicants").fetchone()[0],
+        conn.execute("SELECT count(*) FROM predictions").fetchone()[0],
+    )
+
+
+def test_async_writer_group_commits_and_flushes_on_close(tmp_path):
+    db_file = str(tmp_path / "wb.db")
+    database.init_db(db_file)
+    writer = WriteBehindWriter(db_path=db_file, durability="async", batch_size=16, id_block=10)
+
+    ids = []
+    lock = threading.Lock()
+
+    def worker(n):
+        for i in range(n):
+            aid = writer.record({"income": i}, "Eligible", 0.9, {"top_features": [], "raw": None})
+            with lock:
+                ids.append(aid)
+
+    threads = [threading.Thread(target=worker, args=(25,)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.close()
+
+    assert len(set(ids)) == 100
+    assert _counts(db_file) == (100, 100)
+    stats = writer.stats()
+    assert stats["rows_written"] == 100
+    assert stats["queue_depth"] == 0
+    assert stats["batches_written"] <= 100
+
+    linked = database.get_connection(db_file).execute(
+        "SELECT count(*) FROM predictions p JOIN applicants a ON a.id = p.applicant_id"
+    ).fetchone()[0]
+    assert linked == 100
+
+
+def test_sync_writer_commits_before_returning_and_ids_do_not_collide(tmp_path):
+    db_file = str(tmp_path / "wb_sync.db")
+    database.init_db(db_file)
+    writer = WriteBehindWriter(db_path=db_file, durability="sync", id_block=5)
+    try:
+        aid = writer.record({"income": 1}, "Not Eligible", 0.1, {})
+        assert _counts(db_file) == (1, 1)
+        # a regular insert lands after the reserved block
+        other = database.insert_applicant({"income": 2}, db_path=db_file)
+        assert other > aid + 4
+        for _ in range(6):
+            writer.record({"income": 3}, "Eligible", 0.7, {})
+    finally:
+        writer.close()
+    assert _counts(db_file) == (8, 7)
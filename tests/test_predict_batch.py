@@ -0,0 +1,78 @@
+import os
+import sys
+import sqlite3
+
+import joblib
+import numpy as np
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import app as app_module, database
+from credisense.ml_model import ModelRegistry
+from credisense.prediction_cache import PredictionCache
+
+
+def _setup(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "credisense.db")
+    database.init_db(db_file)
+    monkeypatch.setattr(database, "DB_PATH", db_file)
+
+    rng = np.random.RandomState(0)
+    X = rng.rand(80, 11) * 1000
+    y = (X[:, 2] > 500).astype(int)
+    pipe = Pipeline([("scaler", StandardScaler()), ("clf", RandomForestClassifier(n_estimators=5, random_state=0))])
+    model_path = str(tmp_path / "model.joblib")
+    joblib.dump(pipe.fit(X, y), model_path)
+    monkeypatch.setattr(app_module, "registry", ModelRegistry(model_path))
+    return db_file
+
+
+def test_predict_batch_matches_single_and_keeps_order(tmp_path, monkeypatch):
+    db_file = _setup(tmp_path, monkeypatch)
+    client = TestClient(app_module.app)
+
+    items = [
+        {"income": 50000, "loan_amount": 200000, "cibil_score": 680},
+        {"income": "not-a-number"},
+        {"income": 15000, "loan_amount": 900000, "cibil_score": 610, "missed_emis": 1},
+    ]
+    resp = client.post("/predict/batch", json=items)
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert len(results) == 3
+    assert "error" in results[1]
+
+    for idx in (0, 2):
+        single = client.post("/predict", json=items[idx]).json()
+        assert results[idx]["label"] == single["label"]
+        assert abs(results[idx]["probability"] - single["probability"]) < 1e-12
+        assert results[idx]["advice"] == single["advice"]
+        np.testing.assert_allclose(results[idx]["shap"]["raw"], single["shap"]["raw"])
+
+    conn = sqlite3.connect(db_file)
+    n_pred = conn.execute("SELECT count(*) FROM predictions").fetchone()[0]
+    conn.close()
+    # two valid batch items plus the two single /predict calls
+    assert n_pred == 4
+
+
+def test_prediction_cache_serves_repeats_unchanged(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    client = TestClient(app_module.app)
+    item = {"income": 42000, "loan_amount": 300000, "cibil_score": 720}
+
+    uncached = client.post("/predict", json=item).json()
+    monkeypatch.setattr(app_module, "prediction_cache", PredictionCache())
+    first = client.post("/predict", json=item).json()
+    second = client.post("/predict", json=item).json()
+    batch = client.post("/predict/batch", json=[item, {"income": 1000}]).json()["results"]
+
+    assert first == uncached and second == uncached and batch[0] == uncached
+    stats = client.get("/prediction-cache/stats").json()
+    assert stats["enabled"] and stats["hits"] == 2 and stats["misses"] == 2
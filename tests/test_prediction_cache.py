@@ -0,0 +1,81 @@
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import prediction_cache as pc
+from credisense.prediction_cache import PredictionCache, feature_key
+
+
+def _value(i):
+    return ("Eligible", 0.5 + i / 1000, {"top_features": [("income", 0.1)], "raw": [0.1] * 11})
+
+
+def test_key_is_canonical():
+    assert feature_key([1, 2, 0]) == feature_key(np.array([[1.0, 2.0, -0.0]]))
+    assert feature_key([1.0, 2.0]) != feature_key([1.0, 2.5])
+
+
+def test_hits_misses_and_model_swap():
+    cache = PredictionCache(max_bytes=1 << 20)
+    k = feature_key([1.0, 2.0])
+    assert cache.get(k, "v1") is None
+    cache.put(k, "v1", _value(1))
+    assert cache.get(k, "v1") == _value(1)
+    # a different model version invalidates everything
+    assert cache.get(k, "v2") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["invalidations"]) == (1, 2, 0, 1)
+    assert stats["hit_rate"] == 1 / 3
+
+    # a request still scoring with v1 cannot evict v2 entries or flip the version back
+    cache.put(k, "v2", _value(2))
+    cache.put(feature_key([3.0]), "v1", _value(3))
+    assert cache.get(k, "v2") == _value(2)
+    assert cache.stats()["entries"] == 1 and cache.stats()["model_version"] == "v2"
+
+
+def test_lookups_for_superseded_version_do_not_reset():
+    live = ["v2"]
+    cache = PredictionCache(max_bytes=1 << 20, live_version=lambda: live[0])
+    k = feature_key([1.0, 2.0])
+    assert cache.get(k, "v2") is None
+    cache.put(k, "v2", _value(2))
+    # an in-flight request that snapshotted v1 just misses
+    assert cache.get(k, "v1") is None
+    assert cache.get(k, "v2") == _value(2)
+    # a rollback to v1 makes it live, and then it resets the cache
+    live[0] = "v1"
+    assert cache.get(k, "v1") is None
+    assert cache.stats()["model_version"] == "v1" and cache.stats()["invalidations"] == 1
+
+
+def test_evicts_least_recently_used_within_byte_budget():
+    entry = pc._approx_size(_value(0)) + pc._ENTRY_OVERHEAD
+    cache = PredictionCache(max_bytes=entry * 3)
+    keys = [feature_key([float(i)]) for i in range(4)]
+    for i in range(3):
+        cache.put(keys[i], "v", _value(i))
+    cache.get(keys[0], "v")  # keys[1] is now the least recently used
+    cache.put(keys[3], "v", _value(3))
+    assert cache.get(keys[1], "v") is None
+    assert cache.get(keys[0], "v") is not None and cache.get(keys[3], "v") is not None
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] <= stats["max_bytes"]
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(pc.time, "monotonic", lambda: now[0])
+    cache = PredictionCache(ttl_seconds=5)
+    k = feature_key([3.0])
+    cache.put(k, "v", _value(0))
+    now[0] += 4
+    assert cache.get(k, "v") is not None
+    now[0] += 2
+    assert cache.get(k, "v") is None
+    assert cache.stats()["expirations"] == 1
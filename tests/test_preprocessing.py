@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense.app import Applicant
+from credisense.preprocessing import encode_features, preprocess, preprocess_batch
+
+APPLICANTS = [
+    {"income": 50000, "loan_amount": 200000, "cibil_score": 680},
+    {"income": 0, "loan_amount": 0, "employment_type": "Self-Employed"},
+    {"income": "42000", "loan_amount": None, "employment_type": "unknown", "age": "abc"},
+    {"income": 12000.5, "loan_amount": 750000, "debt_to_income": 0.55, "missed_emis": 2, "dependents": 3},
+    {},
+]
+
+
+def test_preprocess_batch_matches_single_row():
+    batch = preprocess_batch(APPLICANTS)
+    assert list(batch.columns) == list(preprocess(APPLICANTS[0]).columns)
+    assert len(batch) == len(APPLICANTS)
+    for i, applicant in enumerate(APPLICANTS):
+        single = preprocess(applicant).to_numpy(dtype=float)[0]
+        np.testing.assert_array_equal(batch.to_numpy(dtype=float)[i], single)
+
+
+def test_preprocess_batch_accepts_dataframe():
+    df = pd.DataFrame(APPLICANTS)
+    np.testing.assert_array_equal(preprocess_batch(df).to_numpy(dtype=float), preprocess_batch(APPLICANTS).to_numpy(dtype=float))
+
+
+def test_encode_features_bit_identical_to_preprocess():
+    models = [
+        Applicant(),
+        Applicant(income=50000, loan_amount=200000, cibil_score=680),
+        Applicant(income=12000.5, loan_amount=750000, debt_to_income=0.55, missed_emis=2, employment_type="Self-Employed"),
+        Applicant(income=0, loan_amount=0, employment_type="retired", age=61, dependents=4),
+    ]
+    for applicant in models:
+        expected = preprocess(applicant.dict()).to_numpy(dtype=float)[0]
+        assert encode_features(applicant).tobytes() == expected.tobytes()
+
+    for applicant in APPLICANTS:
+        expected = preprocess(applicant).to_numpy(dtype=float)[0]
+        assert encode_features(applicant).tobytes() == expected.tobytes()
+
+
+def test_encode_features_fills_preallocated_row():
+    out = np.zeros((2, 11))
+    encode_features(APPLICANTS[0], out=out[1])
+    assert not out[0].any()
+    np.testing.assert_array_equal(out[1], preprocess(APPLICANTS[0]).to_numpy(dtype=float)[0])
+
+
+def test_numpy_scalars_are_numeric():
+    native = {"income": 50000, "loan_amount": 200000.0, "cibil_score": 680, "missed_emis": 2}
+    numpy_typed = {"income": np.int64(50000), "loan_amount": np.float64(200000.0), "cibil_score": np.int32(680), "missed_emis": np.int64(2)}
+    expected = preprocess_batch([native]).to_numpy(dtype=float)
+    np.testing.assert_array_equal(preprocess_batch([numpy_typed]).to_numpy(dtype=float), expected)
+    np.testing.assert_array_equal(encode_features(numpy_typed), expected[0])
@@ -0,0 +1,75 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import app as app_module, database
+from credisense.pdf_report import render_pdf
+from credisense.reports import ReportService
+
+SHAP = {"top_features": [["cibil_score", 0.21], ["income", -0.05]], "raw": []}
+
+
+def _seed(db_file, dates):
+    database.init_db(db_file)
+    for i, day in enumerate(dates):
+        aid = database.insert_applicant({"income": 30000 + i, "cibil_score": 640 + i, "loan_amount": 100000}, db_file)
+        database.insert_prediction(aid, "Eligible", 0.6 + i / 100, SHAP, db_file)
+        with database.transaction(db_file) as conn:
+            conn.execute("UPDATE predictions SET created_at = ? WHERE applicant_id = ?", (f"{day} 12:00:00", aid))
+
+
+def test_render_pdf_handles_non_latin1_advice():
+    data = render_pdf({"income": 1}, {"label": "Eligible", "probability": 0.9}, SHAP, ["No major issues — keep it up"])
+    assert data.startswith(b"%PDF")
+
+
+def test_report_rendered_once_then_served_from_cache(tmp_path):
+    db_file = str(tmp_path / "reports.db")
+    _seed(db_file, ["2026-01-10"])
+    service = ReportService(cache_dir=str(tmp_path / "cache"), db_path=db_file, executor=ThreadPoolExecutor(2))
+
+    path = service.report_for_prediction(1)
+    assert path.startswith(str(tmp_path / "cache")) and open(path, "rb").read(4) == b"%PDF"
+    mtime = os.stat(path).st_mtime_ns
+    assert service.report_for_prediction(1) == path
+    assert os.stat(path).st_mtime_ns == mtime
+    assert service.report_for_prediction(999) is None
+    service.shutdown()
+
+
+def test_bulk_range_in_process_pool(tmp_path):
+    db_file = str(tmp_path / "reports.db")
+    _seed(db_file, ["2025-12-31", "2026-01-01", "2026-01-20", "2026-01-31", "2026-02-01"])
+    out = tmp_path / "export"
+    service = ReportService(cache_dir=str(tmp_path / "cache"), db_path=db_file, max_workers=2)
+    try:
+        first = service.render_range("2026-01-01", "2026-02-01", out_dir=str(out), chunk_size=2)
+        again = service.render_range("2026-01-01", "2026-02-01", chunk_size=2)
+    finally:
+        service.shutdown()
+
+    assert (first["reports"], first["rendered"]) == (3, 3)
+    assert (again["reports"], again["cached"]) == (3, 3)
+    assert sorted(os.listdir(out)) == ["report-2.pdf", "report-3.pdf", "report-4.pdf"]
+
+
+def test_reports_endpoint(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "reports.db")
+    _seed(db_file, ["2026-01-10"])
+    monkeypatch.setattr(database, "DB_PATH", db_file)
+    service = ReportService(cache_dir=str(tmp_path / "cache"), executor=ThreadPoolExecutor(1))
+    monkeypatch.setattr(app_module, "report_service", service)
+    client = TestClient(app_module.app)
+
+    resp = client.get("/reports/1")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/pdf"
+    assert resp.content.startswith(b"%PDF")
+    assert client.get("/reports/42").status_code == 404
+    service.shutdown()
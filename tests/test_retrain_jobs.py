@@ -0,0 +1,98 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import database, training
+from credisense.jobs import RetrainManager
+
+
+def test_triggers_coalesce_into_running_job():
+    release = threading.Event()
+    calls = []
+
+    def job_fn(db_path, batch_threshold):
+        calls.append(batch_threshold)
+        release.wait(5)
+        return {"retrained": True, "num_records": 7, "fit_seconds": 0.01}
+
+    manager = RetrainManager(executor=ThreadPoolExecutor(max_workers=1), job_fn=job_fn)
+    first = manager.submit(batch_threshold=30)
+    second = manager.submit(batch_threshold=0)
+    assert second is first
+    assert first.triggers == 2
+    assert manager.get(first.id).state == "running"
+
+    release.set()
+    manager.shutdown(wait=True)
+    status = manager.get(first.id).to_dict()
+    assert status["state"] == "succeeded"
+    assert status["num_records"] == 7
+    assert status["duration_seconds"] >= 0
+    assert calls == [30]
+
+    # once finished, a new trigger starts a new job
+    manager = RetrainManager(executor=ThreadPoolExecutor(max_workers=1), job_fn=job_fn)
+    assert manager.submit().id == 1
+    manager.shutdown(wait=True)
+
+
+def _die(db_path, batch_threshold):
+    os._exit(1)
+
+
+def _ok(db_path, batch_threshold):
+    return {"retrained": False, "num_records": 0, "fit_seconds": 0.0}
+
+
+def _wait(job, timeout=60):
+    deadline = time.time() + timeout
+    while job.active and time.time() < deadline:
+        time.sleep(0.05)
+
+
+def test_dead_worker_fails_job_and_next_trigger_gets_new_pool():
+    manager = RetrainManager(job_fn=_die)
+    job = manager.submit()
+    _wait(job)
+    assert job.state == "failed" and "BrokenProcessPool" in job.error
+
+    manager._job_fn = _ok
+    retry = manager.submit()
+    assert retry is not job
+    _wait(retry)
+    assert retry.state == "succeeded"
+    manager.shutdown()
+
+    # a submit that raises fails its job instead of leaving it running
+    broken = ThreadPoolExecutor(max_workers=1)
+    broken.shutdown()
+    manager = RetrainManager(executor=broken, job_fn=_ok)
+    job = manager.submit()
+    assert job.state == "failed" and not job.active
+    retry = manager.submit()
+    _wait(retry)
+    assert retry.state == "succeeded"
+    manager.shutdown()
+
+
+def test_retrain_job_runs_training(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "jobs.db")
+    database.init_db(db_file)
+    for i in range(30):
+        database.add_training_record({"cibil_score": 600 + i, "income": 30000 + i * 100}, db_path=db_file)
+    monkeypatch.setattr(training, "MODEL_DIR", str(tmp_path / "models"))
+    monkeypatch.setattr(training, "MODEL_PATH", os.path.join(training.MODEL_DIR, "model.joblib"))
+
+    manager = RetrainManager(db_path=db_file, executor=ThreadPoolExecutor(max_workers=1))
+    job = manager.submit(batch_threshold=30)
+    manager.shutdown(wait=True)
+    assert job.state == "succeeded", job.error
+    assert job.retrained is True
+    assert job.num_records == 30
+    assert os.path.exists(training.MODEL_PATH)
@@ -0,0 +1,129 @@
+import csv
+import json
+import os
+import sys
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense.advisory import generate_advice
+from credisense.ml_model import ModelRegistry, predict
+from credisense.preprocessing import encode_features
+from credisense.score import main as score_main, score_file
+
+
+def _model(tmp_path):
+    rng = np.random.RandomState(0)
+    X = rng.rand(200, 11) * [90000, 900000, 900, 5, 3, 3, 1, 60, 4, 2, 1]
+    y = (X[:, 2] > 450).astype(int)
+    pipe = Pipeline([("scaler", StandardScaler()), ("clf", RandomForestClassifier(n_estimators=5, random_state=0))])
+    path = str(tmp_path / "model.joblib")
+    joblib.dump(pipe.fit(X, y), path)
+    return path
+
+
+def _applicants(n):
+    return [
+        {"income": 20000 + 1500 * i, "loan_amount": 50000 * (i % 7), "cibil_score": 550 + 13 * i % 350, "missed_emis": i % 3}
+        for i in range(n)
+    ]
+
+
+def _write_jsonl(path, rows, extra_lines=()):
+    with open(path, "w") as f:
+        for r in rows:
+            f.write(json.dumps(r) + "\n")
+        for line in extra_lines:
+            f.write(line + "\n")
+
+
+def test_jsonl_scoring_matches_api_path(tmp_path):
+    model_path = _model(tmp_path)
+    rows = _applicants(10)
+    src = str(tmp_path / "in.jsonl")
+    _write_jsonl(src, rows, ["not json", json.dumps({"income": "lots"})])
+    dst = str(tmp_path / "out.jsonl")
+
+    summary = score_file(src, dst, chunk_size=3, workers=0, model_path=model_path)
+    assert (summary["rows"], summary["errors"]) == (12, 2)
+    assert not os.path.exists(dst + ".ckpt")
+
+    out = [json.loads(line) for line in open(dst)]
+    _, scorer, _ = ModelRegistry(model_path).snapshot()
+    for row, res in zip(rows, out):
+        label, proba = predict(scorer, encode_features(row))
+        assert res["income"] == row["income"]
+        assert (res["label"], res["probability"]) == (label, proba)
+        assert res["advice"] == generate_advice(row)
+    assert out[10]["input"] == "not json" and "error" in out[10]
+    assert out[11]["error"][0]["loc"] == ["income"]
+
+
+def test_csv_in_process_pool_keeps_input_order(tmp_path):
+    model_path = _model(tmp_path)
+    rows = _applicants(23)
+    src = str(tmp_path / "in.csv")
+    with open(src, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "income", "loan_amount", "cibil_score", "missed_emis"])
+        writer.writeheader()
+        for i, r in enumerate(rows):
+            writer.writerow(dict(r, id=i))
+    dst = str(tmp_path / "out.csv")
+
+    summary = score_file(src, dst, chunk_size=4, workers=2, model_path=model_path)
+    assert summary["rows"] == 23 and summary["rows_per_second"] > 0
+
+    with open(dst, newline="") as f:
+        out = list(csv.DictReader(f))
+    assert [int(r["id"]) for r in out] == list(range(23))
+    assert set(out[0]) >= {"label", "probability", "advice", "error"}
+    assert all(r["label"] in ("Eligible", "Not Eligible") and r["error"] == "" for r in out)
+
+
+def test_resumes_from_checkpoint(tmp_path):
+    model_path = _model(tmp_path)
+    src = str(tmp_path / "in.jsonl")
+    rows = _applicants(20)
+    # invalid rows before and after the interruption point
+    rows[2]["income"] = rows[15]["income"] = "lots"
+    _write_jsonl(src, rows)
+    full = str(tmp_path / "full.jsonl")
+    expected = score_file(src, full, chunk_size=4, workers=0, model_path=model_path)
+    assert expected["errors"] == 2
+
+    dst = str(tmp_path / "out.jsonl")
+
+    def interrupt(p):
+        if p["rows"] >= 8:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        score_file(src, dst, chunk_size=4, workers=0, model_path=model_path, progress=interrupt)
+    # a partially written chunk after the checkpoint is discarded on resume
+    with open(dst, "a") as f:
+        f.write('{"partial": ')
+
+    summary = score_file(src, dst, chunk_size=4, workers=0, model_path=model_path)
+    assert summary["resumed_from"] == 8 and summary["rows"] == 20
+    assert summary["errors"] == expected["errors"]
+    assert open(dst).read() == open(full).read()
+
+
+def test_missing_model_fails_before_writing(tmp_path):
+    src = str(tmp_path / "in.jsonl")
+    _write_jsonl(src, _applicants(3))
+    dst = str(tmp_path / "out.jsonl")
+    with pytest.raises(FileNotFoundError):
+        score_file(src, dst, workers=0, model_path=str(tmp_path / "missing.joblib"))
+    assert not os.path.exists(dst)
+    with pytest.raises(SystemExit) as exc:
+        score_main([src, dst, "--workers", "0", "--model", str(tmp_path / "missing.joblib")])
+    assert exc.value.code != 0
@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import app as app_module, database, explainability
+from credisense.metrics import metrics
+from credisense.ml_model import ModelRegistry
+
+# Budget for `import credisense.app` in a fresh interpreter; about 0.3s on a dev laptop
+IMPORT_BUDGET_SECONDS = float(os.environ.get("CREDISENSE_IMPORT_BUDGET", "1.5"))
+
+# Only needed for training, reporting or explanations; must not load at import time
+LAZY_MODULES = ("sklearn", "shap", "fpdf", "joblib", "credisense.training", "credisense.feature_cache")
+
+
+def _import_app():
+    code = (
+        "import sys, time\n"
+        "t = time.perf_counter()\n"
+        "import credisense.app\n"
+        "print(time.perf_counter() - t)\n"
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True).stdout
+    seconds, loaded = out.splitlines()
+    return float(seconds), loaded
+
+
+def test_app_import_stays_lazy_and_within_budget():
+    # Best of three, so a busy machine does not fail the budget by itself
+    runs = [_import_app() for _ in range(3)]
+    assert all(loaded == "" for _, loaded in runs), runs[0][1]
+    assert min(s for s, _ in runs) < IMPORT_BUDGET_SECONDS
+
+
+def test_warm_up_runs_before_ready(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "credisense.db")
+    monkeypatch.setattr(database, "DB_PATH", db_file)
+    rng = np.random.RandomState(0)
+    X = rng.rand(80, 11) * 1000
+    pipe = Pipeline([("scaler", StandardScaler()), ("clf", RandomForestClassifier(n_estimators=5, random_state=0))])
+    model_path = str(tmp_path / "model.joblib")
+    joblib.dump(pipe.fit(X, (X[:, 2] > 500).astype(int)), model_path)
+    registry = ModelRegistry(model_path)
+    monkeypatch.setattr(app_module, "registry", registry)
+    monkeypatch.setattr(app_module, "ready", False)
+    explainability.clear_explainer_cache()
+    metrics.reset()
+
+    client = TestClient(app_module.app)
+    assert client.get("/ready").status_code == 503
+
+    app_module.startup()
+    resp = client.get("/ready")
+    assert resp.status_code == 200 and resp.json()["model_version"] == registry.version
+    # the model and explainer are loaded, but nothing was stored or measured
+    assert explainability._explainer_cache[0] is registry.get()
+    assert sqlite3.connect(db_file).execute("SELECT COUNT(*) FROM predictions").fetchone()[0] == 0
+    assert "credisense_stage_seconds" not in metrics.render()
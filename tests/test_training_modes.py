@@ -0,0 +1,42 @@
+import os
+import sys
+
+import joblib
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import database, training
+
+
+def _add(db_file, start, n):
+    for i in range(start, start + n):
+        database.add_training_record({"cibil_score": 550 + (i * 37) % 300, "income": 20000 + i * 500}, db_path=db_file)
+
+
+def test_incremental_mode_warm_starts_existing_forest(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "modes.db")
+    database.init_db(db_file)
+    monkeypatch.setattr(training, "MODEL_DIR", str(tmp_path / "models"))
+    monkeypatch.setattr(training, "MODEL_PATH", str(tmp_path / "models" / "model.joblib"))
+
+    _add(db_file, 0, 40)
+    first = training.retrain(db_file, batch_threshold=30, mode="incremental", n_jobs=2)
+    # nothing to warm-start from yet
+    assert first["mode"] == "full"
+    assert first["trees_added"] == training.N_ESTIMATORS
+
+    _add(db_file, 40, 30)
+    second = training.retrain(db_file, batch_threshold=30, mode="incremental", n_jobs=2)
+    assert second["mode"] == "incremental"
+    assert second["trees_added"] == training.TREES_PER_BATCH
+    assert second["num_records"] == 70
+    model = joblib.load(training.MODEL_PATH)
+    assert len(model.named_steps["clf"].estimators_) == training.N_ESTIMATORS + training.TREES_PER_BATCH
+
+    logs = database.get_connection(db_file).execute(
+        "SELECT mode, trees_added, wall_seconds FROM retraining_logs ORDER BY id"
+    ).fetchall()
+    assert [(m, t) for m, t, _ in logs] == [("full", training.N_ESTIMATORS), ("incremental", training.TREES_PER_BATCH)]
+    assert all(w > 0 for _, _, w in logs)
@@ -0,0 +1,71 @@
+import json
+import os
+import sqlite3
+import sys
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from credisense import database
+from credisense.feature_cache import FeatureCache
+from credisense.preprocessing import preprocess_batch
+
+LEGACY_PAYLOADS = [
+    {"income": 50000, "loan_amount": 200000, "cibil_score": 680, "label": 1},
+    {"income": "42000", "age": "abc", "employment_type": "Self-Employed", "label": 0, "co_applicant": True},
+    {"cibil_score": 610, "property_area": "Urban"},
+]
+
+
+def _legacy_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE applicants (id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+    conn.execute("CREATE TABLE training_data (id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+    for p in LEGACY_PAYLOADS:
+        conn.execute("INSERT INTO applicants (payload) VALUES (?)", (json.dumps(p),))
+        conn.execute("INSERT INTO training_data (payload) VALUES (?)", (json.dumps(p),))
+    conn.execute("INSERT INTO applicants (payload) VALUES ('not json')")
+    conn.commit()
+    conn.close()
+
+
+def test_init_db_migrates_legacy_payload_tables(tmp_path):
+    db_file = str(tmp_path / "legacy.db")
+    _legacy_db(db_file)
+    database.init_db(db_file)
+
+    conn = database.get_connection(db_file)
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(applicants)")]
+    assert "payload" not in cols and "income" in cols and "extra" in cols
+
+    rows = conn.execute(f"SELECT id, {', '.join(database.APPLICANT_FIELDS)}, extra FROM applicants ORDER BY id").fetchall()
+    assert [r[0] for r in rows] == [1, 2, 3, 4]
+    assert database.row_to_payload(rows[1][1:-1], rows[1][-1]) == {
+        "income": 42000.0,
+        "age": "abc",
+        "employment_type": "Self-Employed",
+        "label": 0,
+        "co_applicant": True,
+    }
+    assert rows[3][-1] == "not json"
+
+    # new inserts continue after the migrated ids
+    assert database.insert_applicant({"income": 1}, db_path=db_file) == 5
+    assert database.migrate_db(db_file) == {}
+
+
+def test_typed_reader_features_match_json_payloads(tmp_path):
+    db_file = str(tmp_path / "legacy_train.db")
+    _legacy_db(db_file)
+    database.init_db(db_file)
+
+    chunks = list(database.fetch_training_columns(db_file, chunk_rows=2))
+    assert [len(c["id"]) for c in chunks] == [2, 1]
+    assert np.isnan(chunks[0]["label"]).sum() == 0 and np.isnan(chunks[1]["label"][0])
+
+    X, labels = FeatureCache(str(tmp_path / "cache")).update(db_file)
+    expected = preprocess_batch(LEGACY_PAYLOADS).to_numpy(dtype=float)
+    np.testing.assert_array_equal(np.asarray(X), expected)